@@ -1,42 +1,41 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from app.services.llm_scheduler import llm_scheduler
+from app.services.platform_stats import platform_stats
+from app.services.tracing import tracer
+from app.services.trending import trending_index
+from app.models.database import pool_metrics
 
 router = APIRouter()
 
 @router.get("/trending")
 async def get_trending_questions(limit: int = 10):
-    """Get trending questions"""
+    """Get trending questions (from the precomputed top-K index)"""
     
-    # Mock trending questions for demo
-    trending = [
-        {
-            "question": "Should I quit my 9-5 to start a business?",
-            "category": "career",
-            "run_count": 45,
-            "trending_score": 892.5
-        },
-        {
-            "question": "Is this product idea worth pursuing?",
-            "category": "business",
-            "run_count": 38,
-            "trending_score": 756.2
-        },
-        {
-            "question": "Should we add AI to our product?",
-            "category": "tech",
-            "run_count": 31,
-            "trending_score": 623.8
-        }
-    ]
-    
-    return {"trending": trending[:limit]}
+    return {"trending": trending_index.top(limit)}
 
 @router.get("/stats")
 async def get_stats():
-    """Get platform statistics"""
+    """Get platform statistics (streaming counters, refreshed every few seconds)"""
+    
+    return platform_stats.snapshot()
+
+@router.get("/llm-scheduler")
+async def get_llm_scheduler_stats():
+    """Get LLM queue depth, in-flight calls and wait times"""
+    
+    return llm_scheduler.stats()
+
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    """Get DB connection pool usage and checkout wait times"""
+    
+    return pool_metrics.stats()
+
+@router.get("/traces/{session_id}")
+async def get_debate_trace(session_id: str):
+    """Get a recent debate's spans as OTLP/JSON (postable to any OpenTelemetry collector)"""
     
-    return {
-        "total_debates": 1247,
-        "total_users": 523,
-        "debates_today": 89,
-        "most_popular_persona": "gen_z_teen"
-    }
+    trace = tracer.trace(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace for this session on this worker")
+    return trace
@@ -1,15 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import FocusGroupCreate, FocusGroupSession
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.models.schemas import FocusGroupCreate, FocusGroupList, FocusGroupSession, FocusGroupSessionPublic, SessionStatus
 from app.core.persona_engine import PersonaEngine
+from app.services.session_store import decode_cursor, session_store
 import uuid
 from datetime import datetime
 
 router = APIRouter()
 persona_engine = PersonaEngine()
 
-# In-memory storage for demo (replace with database in production)
-sessions_db = {}
-
 @router.post("/create", response_model=FocusGroupSession)
 async def create_focus_group(data: FocusGroupCreate):
     """Create a new focus group session"""
@@ -19,9 +18,9 @@ async def create_focus_group(data: FocusGroupCreate):
     session_key = str(uuid.uuid4())[:12]
     
     # Validate personas exist
-    available_personas = persona_engine.get_all_template_ids()
+    found = {persona.id for persona in await persona_engine.get_personas(data.persona_ids)}
     for pid in data.persona_ids:
-        if pid not in available_personas:
+        if pid not in found:
             raise HTTPException(status_code=400, detail=f"Invalid persona ID: {pid}")
     
     # Create session
@@ -31,33 +30,57 @@ async def create_focus_group(data: FocusGroupCreate):
         question=data.question,
         selected_persona_ids=data.persona_ids,
         status="pending",
+        is_public=data.is_public,
         created_at=datetime.utcnow()
     )
     
-    # Store session
-    sessions_db[session_id] = session
+    # Store session (shared with other workers now, persisted write-behind)
+    await session_store.create(session, mode=data.mode.value)
     
     return session
 
-@router.get("/{session_id}", response_model=FocusGroupSession)
+@router.get("/{session_id}", response_model=FocusGroupSessionPublic)
 async def get_focus_group(session_id: str):
-    """Get focus group session details"""
+    """Get focus group session details (the session key is only given out on create)"""
     
-    session = sessions_db.get(session_id)
+    session = await session_store.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     return session
 
-@router.get("/")
-async def list_focus_groups(limit: int = 10, offset: int = 0):
-    """List recent focus group sessions"""
+@router.get("/", response_model=FocusGroupList)
+async def list_focus_groups(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    is_featured: Optional[bool] = None,
+    user_id: Optional[str] = None,
+    status: Optional[SessionStatus] = None
+):
+    """
+    List public focus group sessions, newest first (pass next_cursor back
+    for the next page)
+
+    There are no accounts to prove who is asking, so private sessions are
+    never listed, whatever the filters.
+    """
     
-    all_sessions = list(sessions_db.values())
-    # Sort by created_at descending
-    sorted_sessions = sorted(all_sessions, key=lambda x: x.created_at, reverse=True)
+    try:
+        user_uuid = uuid.UUID(user_id) if user_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    sessions, next_cursor, total, estimated = await session_store.list_recent(
+        limit, after, (True, is_featured, user_uuid, status)
+    )
     
     return {
-        "sessions": sorted_sessions[offset:offset+limit],
-        "total": len(sorted_sessions)
+        "sessions": sessions,
+        "next_cursor": next_cursor,
+        "total": total,
+        "total_is_estimate": estimated
     }
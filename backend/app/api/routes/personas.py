@@ -1,64 +1,68 @@
-from fastapi import APIRouter
-from app.core.persona_engine import PersonaEngine
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from app.core.persona_engine import persona_registry
+from app.core.persona_registry import PersonaRecord
+from app.models.schemas import PersonaCreate
+from app.services.persona_store import persona_store
+import asyncio
 
 router = APIRouter()
-persona_engine = PersonaEngine()
+
+# Persona storage being unreachable, as opposed to a bug
+STORAGE_ERRORS = (DBAPIError, OSError, ConnectionError, asyncio.TimeoutError)
+
+def _json(request: Request, body: bytes, etag: str) -> Response:
+    """Pre-serialized persona JSON, tagged with the registry version it was resolved against"""
+    headers = {"ETag": etag, "X-Persona-Registry-Version": str(persona_registry.current.version)}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _detail(request: Request, record: PersonaRecord) -> Response:
+    return _json(request, record.detail_json, record.etag)
 
 @router.get("/")
-async def get_all_personas():
+async def get_all_personas(request: Request):
     """Get all available personas"""
-    
-    personas = []
-    for pid, template in persona_engine.PERSONA_TEMPLATES.items():
-        personas.append({
-            "id": pid,
-            "name": template["name"],
-            "category": template["category"],
-            "description": template["description"],
-            "speaking_style": template["speaking_style"],
-            "avatar_url": f"/personas/{pid}.png",
-            "is_premium": False
-        })
-    
-    return {"personas": personas, "total": len(personas)}
+    snapshot = persona_registry.current
+    return _json(request, snapshot.list_json, snapshot.etag)
+
+@router.post("/")
+async def create_persona(data: PersonaCreate, request: Request):
+    """Create a custom persona"""
+    if persona_registry.get(data.slug) is not None:
+        raise HTTPException(status_code=409, detail="Slug is taken by a built-in persona")
+    try:
+        record = await persona_store.create(data)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Slug already exists")
+    except STORAGE_ERRORS as e:
+        print(f"Persona create failed: {e}")
+        raise HTTPException(status_code=503, detail="Persona storage unavailable")
+    return _detail(request, record)
 
 @router.get("/categories")
-async def get_persona_categories():
+async def get_persona_categories(request: Request):
     """Get personas grouped by category"""
-    
-    categories = {
-        "demographic": [],
-        "professional": [],
-        "personality": []
-    }
-    
-    for pid, template in persona_engine.PERSONA_TEMPLATES.items():
-        category = template["category"]
-        if category in categories:
-            categories[category].append({
-                "id": pid,
-                "name": template["name"],
-                "description": template["description"],
-                "avatar_url": f"/personas/{pid}.png"
-            })
-    
-    return categories
+    snapshot = persona_registry.current
+    return _json(request, snapshot.categories_json, snapshot.etag)
 
 @router.get("/{persona_id}")
-async def get_persona(persona_id: str):
+async def get_persona(persona_id: str, request: Request):
     """Get details for a specific persona"""
-    
-    template = persona_engine.PERSONA_TEMPLATES.get(persona_id)
-    if not template:
-        return {"error": "Persona not found"}, 404
-    
-    return {
-        "id": persona_id,
-        "name": template["name"],
-        "category": template["category"],
-        "description": template["description"],
-        "speaking_style": template["speaking_style"],
-        "avatar_url": f"/personas/{persona_id}.png",
-        "system_prompt": template["system_prompt"]
-    }
+    record = persona_registry.get(persona_id) or await persona_store.get(persona_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Persona not found")
+    return _detail(request, record)
+
+@router.put("/{persona_id}")
+async def update_persona(persona_id: str, data: PersonaCreate, request: Request):
+    """Edit a custom persona (built-ins are edited through the template file)"""
+    try:
+        record = await persona_store.update(persona_id, data)
+    except STORAGE_ERRORS as e:
+        print(f"Persona update failed: {e}")
+        raise HTTPException(status_code=503, detail="Persona storage unavailable")
+    if record is None:
+        raise HTTPException(status_code=404, detail="Custom persona not found")
+    return _detail(request, record)
@@ -1,17 +1,74 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.services.event_log import event_log_store
+from app.services.session_store import may_view, session_store
+from typing import Optional
+import os
+import re
 
 router = APIRouter()
 
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
 @router.get("/{session_id}")
-async def get_replay(session_id: str):
-    """Get replay data for a completed debate"""
-    
-    # TODO: Implement replay retrieval from database
-    
-    return {
-        "session_id": session_id,
-        "question": "Example question",
-        "timeline": [],
-        "total_duration": 0,
-        "summary": "Debate summary coming soon"
+async def get_replay(session_id: str, request: Request, from_ms: int = 0, key: Optional[str] = None):
+    """
+    Replay a debate from its event log (NDJSON, one event per line)
+
+    - key: the session key, required for private sessions
+    - from_ms: start from this point in the debate, seeking via the log index
+    - Completed replays support ETag / If-None-Match and byte Range requests
+    - Debates still running are streamed as far as they've been recorded
+    """
+
+    session = await session_store.get(session_id)
+    if not may_view(session, key):
+        raise HTTPException(status_code=403, detail="This replay is private")
+    # Shared caches must not keep a private replay for whoever asks next
+    private = session is not None and not session.is_public
+
+    located = event_log_store.locate(session_id)
+    if located is None:
+        raise HTTPException(status_code=404, detail="Replay not found")
+    path, complete = located
+
+    if not complete:
+        offset = event_log_store.seek_offset(session_id, from_ms)
+        return StreamingResponse(
+            event_log_store.iter_events(path, offset, from_ms),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "private, no-cache" if private else "no-cache"}
+        )
+
+    # Completed logs never change, so they're cacheable by size + mtime
+    stat = os.stat(path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}-{max(from_ms, 0):x}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"{'private' if private else 'public'}, max-age=86400, immutable"
     }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    data = await event_log_store.load_complete(session_id, path, from_ms)
+
+    range_header = request.headers.get("range")
+    if not range_header:
+        return Response(data, media_type="application/x-ndjson", headers=headers)
+
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        raise HTTPException(status_code=416, detail="Invalid range")
+
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, len(data) - int(last)), len(data) - 1
+    else:
+        start, end = int(first), min(int(last) if last else len(data) - 1, len(data) - 1)
+    if start > end or start >= len(data):
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{len(data)}"})
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    return Response(data[start:end + 1], status_code=206, media_type="application/x-ndjson", headers=headers)
@@ -1,104 +1,419 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict
+from pydantic import ValidationError
+from typing import Dict, Optional, Set
+import asyncio
+import ipaddress
 import json
+import time
+from app.config import settings
 from app.core.debate_orchestrator import DebateOrchestrator
+from app.models.schemas import DebateDelta, DebateRounds, SessionStatus, WSDebateStart
+from app.services.broadcast import broadcast_hub, Subscriber
+from app.services.debate_registry import debate_registry
+from app.services.metrics import metrics
+from app.services.platform_stats import platform_stats
+from app.services.session_store import may_view, session_store
+from app.services.event_log import event_log_store
+from app.services.tracing import tracer
+from app.services.trending import trending_index
 import uuid
 
 router = APIRouter()
 
+debates_total = metrics.counter("fg_debates_total", "Debates run on this worker by outcome", ["mode", "outcome"])
+debate_seconds = metrics.histogram("fg_debate_duration_seconds", "Wall-clock time of a debate run", ["mode", "outcome"])
+
 class DebateStreamManager:
-    """Manages WebSocket connections for live debate streaming"""
+    """Runs debates and fans their frames out to every connected viewer"""
     
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
         self.orchestrator = DebateOrchestrator()
+        # Debates running on this worker, by session
+        self.running: Dict[str, asyncio.Task] = {}
+        # Debates being claimed, and debates stopped here for another worker to resume
+        self._claiming: Set[str] = set()
+        self._handed_off: Set[str] = set()
+        self._watchdog: Optional[asyncio.Task] = None
     
-    async def connect(self, websocket: WebSocket, session_id: str):
-        """Accept new WebSocket connection"""
+    async def connect(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        key: Optional[str] = None,
+        last_seq: Optional[int] = None
+    ) -> Optional[Subscriber]:
+        """Accept a viewer; private debates only take viewers who have the session key"""
         await websocket.accept()
-        self.active_connections[session_id] = websocket
-        print(f"WebSocket connected: {session_id}")
+        
+        if not await self._may_watch(session_id, key):
+            await websocket.send_json({"type": "error", "message": "This debate is private"})
+            await websocket.close(code=1008)
+            return None
+        
+        subscriber = await broadcast_hub.subscribe(session_id, websocket, last_seq)
+        print(f"WebSocket connected: {session_id} ({broadcast_hub.viewer_count(session_id)} viewers)")
+        return subscriber
+    
+    async def disconnect(self, session_id: str, subscriber: Subscriber):
+        """Remove a viewer (the debate keeps running for everyone else)"""
+        await broadcast_hub.unsubscribe(session_id, subscriber)
+        print(f"WebSocket disconnected: {session_id}")
     
-    def disconnect(self, session_id: str):
-        """Remove WebSocket connection"""
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
-            print(f"WebSocket disconnected: {session_id}")
+    async def start(self):
+        """Start renewing leases and watching for debates orphaned by dead workers"""
+        self._watchdog = asyncio.create_task(self._watch_leases())
+    
+    async def start_debate(
+        self,
+        session_id: str,
+        question: str,
+        persona_ids: list,
+        mode: str = "hybrid",
+        stream: bool = False,
+        rounds: Optional[DebateRounds] = None,
+        client: Optional[str] = None
+    ) -> bool:
+        """
+        Start a debate in the background; False if it's already running or has run,
+        ValueError if `rounds` names personas that aren't in it
+        
+        A created session is debated as it was created: its stored
+        question and personas win over the client's. `client` identifies
+        who started it, for the unique users stat and, when the session
+        has no owner, as the tenant its LLM calls are scheduled under.
+        """
+        task = self.running.get(session_id)
+        if session_id in self._claiming or (task is not None and not task.done()):
+            return False
+        
+        session = await session_store.get(session_id, fresh=True)
+        if session is not None:
+            if session.status != SessionStatus.PENDING:
+                # Running elsewhere, or finished: a rerun would pay for the LLM calls again
+                return False
+            question, persona_ids = session.question, session.selected_persona_ids
+            if rounds is not None:
+                # Checked against the client's personas already; these are the ones that speak
+                rounds.check_personas(persona_ids)
+        tenant = (session.user_id if session is not None else None) or client or session_id
+        spec = {
+            "question": question, "persona_ids": persona_ids, "mode": mode, "stream": stream,
+            "rounds": rounds.model_dump() if rounds is not None else None, "resumes": 0,
+            "tenant": tenant
+        }
+        self._claiming.add(session_id)
+        try:
+            if not await debate_registry.claim(session_id, spec):
+                # Owned by another worker; its frames reach our viewers via pub/sub
+                return False
+        finally:
+            self._claiming.discard(session_id)
+        
+        # This worker runs it now; don't trust a copy cached before the claim
+        session_store.invalidate(session_id)
+        self._launch(session_id, spec)
+        platform_stats.record_debate(persona_ids, client)
+        # Private questions must not show up on /trending
+        if session is not None and session.is_public:
+            trending_index.record(question)
+        return True
+    
+    async def shutdown(self):
+        """Hand debates still running here over to other workers (or cancel them)"""
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        
+        tasks = []
+        for session_id, task in list(self.running.items()):
+            if await debate_registry.abandon(session_id):
+                self._handed_off.add(session_id)
+            task.cancel()
+            tasks.append(task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _launch(self, session_id: str, spec: Dict):
+        rounds = spec.get("rounds")
+        task = asyncio.create_task(self.stream_debate(
+            session_id, spec["question"], spec["persona_ids"], spec["mode"], spec["stream"],
+            DebateRounds(**rounds) if rounds else None,
+            tenant=spec.get("tenant"), resumed=spec.get("resumes", 0) > 0
+        ))
+        self.running[session_id] = task
+        task.add_done_callback(lambda t: self._forget(session_id, t))
+    
+    def _forget(self, session_id: str, task: asyncio.Task):
+        if self.running.get(session_id) is task:
+            del self.running[session_id]
+            self._handed_off.discard(session_id)
+    
+    async def _watch_leases(self):
+        interval = settings.DEBATE_LEASE_TTL_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                for session_id in await debate_registry.renew():
+                    # Lease expired under us (e.g. Redis was unreachable); another worker may own it now
+                    task = self.running.get(session_id)
+                    if task is not None:
+                        print(f"Lost lease on debate {session_id}, stopping it here")
+                        self._handed_off.add(session_id)
+                        task.cancel()
+                
+                for session_id, spec in await debate_registry.orphans():
+                    await self._take_over(session_id, spec)
+            except Exception as e:
+                print(f"Debate lease watchdog error: {e}")
+    
+    async def _take_over(self, session_id: str, spec: Dict):
+        """Resume (or, past DEBATE_MAX_RESUMES, fail) a debate whose worker died"""
+        if session_id in self.running or session_id in self._claiming:
+            return
+        
+        resumes = spec.get("resumes", 0) + 1
+        if not await debate_registry.claim(session_id, {**spec, "resumes": resumes}):
+            return  # another worker got there first
+        
+        session_store.invalidate(session_id)
+        session = await session_store.get(session_id, fresh=True)
+        if session is not None and session.status in (SessionStatus.COMPLETED, SessionStatus.FAILED):
+            # Finished, but its worker died before clearing the registry
+            await debate_registry.release(session_id)
+            return
+        
+        if resumes > settings.DEBATE_MAX_RESUMES:
+            print(f"Debate {session_id} lost its worker {resumes} times, failing it")
+            session_store.mark_failed(session_id)
+            await broadcast_hub.publish(session_id, {"type": "error", "message": "Debate was interrupted"})
+            await debate_registry.release(session_id)
+            return
+        
+        print(f"Resuming debate {session_id} from a failed worker")
+        await broadcast_hub.publish(session_id, {"type": "debate_resumed", "data": {"session_id": session_id}})
+        self._launch(session_id, {**spec, "resumes": resumes})
+    
+    async def _may_watch(self, session_id: str, key: Optional[str]) -> bool:
+        """A session that doesn't exist yet belongs to whoever connects to start it"""
+        return may_view(await session_store.get(session_id), key)
     
     async def stream_debate(
         self,
         session_id: str,
         question: str,
         persona_ids: list,
-        mode: str = "hybrid"
+        mode: str = "hybrid",
+        stream: bool = False,
+        rounds: Optional[DebateRounds] = None,
+        tenant: Optional[str] = None,
+        resumed: bool = False
     ):
-        """Stream debate responses to connected client"""
+        """Run one debate, publishing every frame to the session's viewers"""
         
-        websocket = self.active_connections.get(session_id)
-        if not websocket:
-            print(f"No websocket found for session: {session_id}")
-            return
+        start = time.perf_counter()
+        outcome = "cancelled"
+        attributes = {"session.id": session_id, "debate.mode": mode, "debate.personas": len(persona_ids), "debate.stream": stream}
+        with tracer.span("debate", attributes, key=session_id) as span:
+            try:
+                outcome = await self._run_debate(session_id, question, persona_ids, mode, stream, rounds, start, tenant, resumed)
+            finally:
+                if outcome == "cancelled" and session_id in self._handed_off:
+                    outcome = "handed_off"
+                span.set_attribute("debate.outcome", outcome)
+                debates_total.inc(mode=mode, outcome=outcome)
+                debate_seconds.observe(time.perf_counter() - start, mode=mode, outcome=outcome)
+    
+    async def _run_debate(
+        self,
+        session_id: str,
+        question: str,
+        persona_ids: list,
+        mode: str,
+        stream: bool,
+        rounds: Optional[DebateRounds],
+        start: float,
+        tenant: Optional[str] = None,
+        resumed: bool = False
+    ) -> str:
+        """Body of stream_debate; returns "completed" or "failed" (cancellation propagates)"""
+        
+        # Persistence is queued write-behind; nothing below waits on the DB
+        persist = await session_store.ensure(session_id, question, persona_ids, mode)
+        transcript = []
+        
+        # Replay log: every frame we send, timestamped (kept across worker take-overs)
+        event_log = event_log_store.open(session_id, resume=resumed)
+        event_log.append("resume" if resumed else "start", {"question": question, "persona_ids": persona_ids, "mode": mode})
+        current_wave = 0
+        completed = False
         
         try:
             print(f"Starting debate for session: {session_id}")
+            if persist:
+                session_store.mark_running(session_id, mode)
             
             # Start debate
             async for response in self.orchestrator.run_debate(
                 session_id=session_id,
                 question=question,
                 persona_ids=persona_ids,
-                mode=mode
+                mode=mode,
+                stream=stream,
+                rounds=rounds,
+                tenant=tenant
             ):
-                # Send to client
-                await websocket.send_json({
-                    "type": "debate_response",
-                    "data": {
+                if response.wave > current_wave:
+                    current_wave = response.wave
+                    event_log.append("wave", {"wave": current_wave})
+                
+                # Token chunk of a response still being generated
+                if isinstance(response, DebateDelta):
+                    data = {
                         "session_id": response.session_id,
                         "persona_id": response.persona_id,
                         "persona_name": response.persona_name,
-                        "text": response.text,
+                        "delta": response.delta,
                         "wave": response.wave,
                         "sentiment": response.sentiment.value if response.sentiment else None,
                         "confidence_score": response.confidence_score,
                         "is_rebuttal": response.is_rebuttal,
-                        "is_complete": response.is_complete,
                         "timestamp": response.timestamp.isoformat()
                     }
+                    event_log.append("delta", data)
+                    await broadcast_hub.publish(session_id, {
+                        "type": "debate_delta",
+                        "data": data
+                    })
+                    continue
+                
+                data = {
+                    "session_id": response.session_id,
+                    "persona_id": response.persona_id,
+                    "persona_name": response.persona_name,
+                    "text": response.text,
+                    "wave": response.wave,
+                    "sentiment": response.sentiment.value if response.sentiment else None,
+                    "confidence_score": response.confidence_score,
+                    "is_rebuttal": response.is_rebuttal,
+                    "is_complete": response.is_complete,
+                    "time_to_first_token_ms": response.time_to_first_token_ms,
+                    "timestamp": response.timestamp.isoformat()
+                }
+                
+                if not response.is_complete:
+                    event_log.append("response", data)
+                    event_log.schedule_flush()
+                    if persist:
+                        session_store.record_response(response, order=len(transcript))
+                        transcript.append(data)
+                
+                # Send to viewers
+                await broadcast_hub.publish(session_id, {
+                    "type": "debate_response",
+                    "data": data
                 })
                 
                 # If complete, send summary
                 if response.is_complete:
-                    await websocket.send_json({
+                    completed = True
+                    summary = response.summary
+                    token_usage = sum((response.stats or {}).get("tokens", {}).values())
+                    tracer.current_span().set_attribute("gen_ai.usage.total_tokens", token_usage)
+                    if persist:
+                        session_store.complete(session_id, transcript, summary, {
+                            "token_usage": token_usage,
+                            "duration_seconds": round(time.perf_counter() - start)
+                        })
+                    complete_data = {
+                        "summary": summary.summary_text,
+                        "sentiment_breakdown": summary.sentiment_breakdown.model_dump(),
+                        "key_insights": summary.key_insights,
+                        "consensus_points": summary.consensus_points,
+                        "most_controversial_take": summary.most_controversial_take,
+                        "share_url": summary.share_url,
+                        "stats": response.stats
+                    }
+                    event_log.append("complete", complete_data)
+                    await broadcast_hub.publish(session_id, {
                         "type": "debate_complete",
-                        "data": {
-                            "summary": "Debate completed successfully",
-                            "share_url": f"/replay/{session_id}"
-                        }
+                        "data": complete_data
                     })
             
             print(f"Debate completed for session: {session_id}")
+            return "completed" if completed else "failed"
             
-        except WebSocketDisconnect:
-            print(f"Client disconnected during debate: {session_id}")
-            self.disconnect(session_id)
+        except asyncio.CancelledError:
+            print(f"Debate cancelled: {session_id}")
+            event_log.append("error", {"message": "cancelled"})
+            if persist and not completed and session_id not in self._handed_off:
+                session_store.mark_failed(session_id)
+            raise
         except Exception as e:
             print(f"Error in debate stream: {e}")
-            try:
-                await websocket.send_json({
-                    "type": "error",
-                    "message": str(e)
-                })
-            except:
-                pass
-            self.disconnect(session_id)
+            tracer.current_span().record_error(e)
+            event_log.append("error", {"message": str(e)})
+            if persist:
+                session_store.mark_failed(session_id)
+            await broadcast_hub.publish(session_id, {
+                "type": "error",
+                "message": str(e)
+            })
+            return "failed"
+        finally:
+            broadcast_hub.end(session_id)
+            await event_log.close()
+            if session_id not in self._handed_off:
+                await debate_registry.release(session_id)
 
 # Global manager instance
 manager = DebateStreamManager()
 
+metrics.gauge("fg_debates_running", "Debates running on this worker", fn=lambda: len(manager.running))
+
+TRUSTED_PROXIES = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+def _trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def _client_id(websocket: WebSocket) -> Optional[str]:
+    """
+    Who is connected: the peer address, or behind trusted proxies the
+    last X-Forwarded-For hop they didn't add (anything before it is
+    client-supplied and can't be believed)
+    """
+    client = websocket.client.host if websocket.client else None
+    if client is None or not _trusted(client):
+        return client
+    for hop in reversed(websocket.headers.get("x-forwarded-for", "").split(",")):
+        hop = hop.strip()
+        if hop:
+            client = hop
+            if not _trusted(hop):
+                break
+    return client
+
 @router.websocket("/debate/{session_id}")
-async def debate_websocket(websocket: WebSocket, session_id: str):
-    """WebSocket endpoint for debate streaming"""
-    await manager.connect(websocket, session_id)
+async def debate_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    key: Optional[str] = None,
+    last_seq: Optional[int] = None
+):
+    """
+    WebSocket endpoint for debate streaming
+
+    Any number of viewers can connect to a session; the first "start"
+    runs the debate and every viewer receives its frames. Debates keep
+    running when viewers drop: reconnect with ?last_seq=<seq of the last
+    frame received> to get the missed frames (deltas aside), then carry on live.
+    """
+    subscriber = await manager.connect(websocket, session_id, key, last_seq)
+    if subscriber is None:
+        return
+    sender = asyncio.create_task(subscriber.run())
     
     try:
         while True:
@@ -107,15 +422,31 @@ async def debate_websocket(websocket: WebSocket, session_id: str):
             print(f"Received WebSocket message: {data}")
             
             if data.get("action") == "start":
-                await manager.stream_debate(
-                    session_id=session_id,
-                    question=data["question"],
-                    persona_ids=data["persona_ids"],
-                    mode=data.get("mode", "hybrid")
-                )
+                try:
+                    command = WSDebateStart.model_validate(data)
+                except ValidationError as e:
+                    subscriber.offer({"type": "error", "message": f"Invalid start command: {e.errors()[0]['msg']}"})
+                    continue
+                try:
+                    started = await manager.start_debate(
+                        session_id=session_id,
+                        question=command.question,
+                        persona_ids=command.persona_ids,
+                        mode=command.mode.value,
+                        stream=command.stream,
+                        rounds=command.rounds,
+                        client=_client_id(websocket)
+                    )
+                except ValueError as e:
+                    subscriber.offer({"type": "error", "message": f"Invalid start command: {e}"})
+                    continue
+                if not started:
+                    print(f"Debate already started for session: {session_id}")
                 
     except WebSocketDisconnect:
-        manager.disconnect(session_id)
+        pass
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.disconnect(session_id)
+    finally:
+        await manager.disconnect(session_id, subscriber)
+        sender.cancel()
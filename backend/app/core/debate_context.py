@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.config import settings
+from app.models.schemas import SentimentType
+from app.services.metrics import metrics
+from app.utils.text import first_sentence
+
+CONTEXT_HEADER = "Other panel members have said:"
+
+context_tokens = metrics.histogram(
+    "fg_context_tokens", "Estimated tokens of prior-response context per persona call",
+    buckets=(50, 100, 250, 500, 1000, 2000, 4000, 8000)
+)
+context_compacted = metrics.counter("fg_context_compacted_total", "Prior responses sent as key points or left out", ["form"])
+
+def estimate_tokens(text: str) -> int:
+    # Same ~4 chars per token estimate as the LLM scheduler
+    return len(text) // 4 + 1
+
+class ContextTurn:
+    """One prior response, pre-rendered verbatim and as key points"""
+    __slots__ = ("full", "brief", "full_tokens", "brief_tokens")
+
+    def __init__(self, persona_name: str, text: str, sentiment: Optional[SentimentType]):
+        self.full = f"{persona_name}: {text}"
+        stance = f" ({sentiment.value})" if sentiment is not None else ""
+        self.brief = f"{persona_name}{stance}, in short: {first_sentence(text, settings.CONTEXT_BRIEF_MAX_WORDS)}"
+        self.full_tokens = estimate_tokens(self.full)
+        self.brief_tokens = estimate_tokens(self.brief)
+
+class DebateContext:
+    """
+    Prior responses formatted for later persona calls, under a token budget
+
+    One per debate. Each response is rendered once when it arrives, both
+    verbatim and as key points (stance plus first sentence). A call's
+    context keeps everything verbatim if that fits the budget. Otherwise
+    the most recent turns stay verbatim, older ones shrink to key points,
+    and the oldest are left out once even those don't fit. Contexts are
+    memoized by the responses they cover, so every call in a wave shares
+    one string (and one response cache key).
+    """
+
+    def __init__(self, token_budget: int = settings.CONTEXT_TOKEN_BUDGET, recent_turns: int = settings.CONTEXT_RECENT_TURNS):
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self._turns: Dict[str, ContextTurn] = {}
+        self._rendered: Dict[Tuple[str, ...], str] = {}
+
+    def add(self, key: str, persona_name: str, text: str, sentiment: Optional[SentimentType] = None):
+        self._turns[key] = ContextTurn(persona_name, text, sentiment)
+
+    def render(self, keys: Sequence[str]) -> str:
+        """Context covering the responses under `keys`, oldest first"""
+        if not keys:
+            return ""
+
+        keys = tuple(keys)
+        context = self._rendered.get(keys)
+        if context is None:
+            context = self._rendered[keys] = self._render([self._turns[key] for key in keys])
+        return context
+
+    def _render(self, turns: List[ContextTurn]) -> str:
+        budget = self.token_budget - estimate_tokens(CONTEXT_HEADER)
+        total = sum(turn.full_tokens for turn in turns)
+
+        if total <= budget:
+            parts = [turn.full for turn in turns]
+        else:
+            # Newest first: verbatim while recent and affordable, then key points
+            parts = []
+            for age, turn in enumerate(reversed(turns)):
+                if age < self.recent_turns and turn.full_tokens <= budget:
+                    parts.append(turn.full)
+                    budget -= turn.full_tokens
+                elif turn.brief_tokens <= budget:
+                    parts.append(turn.brief)
+                    budget -= turn.brief_tokens
+                    context_compacted.inc(form="brief")
+                else:
+                    break
+            omitted = len(turns) - len(parts)
+            if omitted:
+                context_compacted.inc(omitted, form="omitted")
+                parts.append(f"({omitted} earlier response{'s' if omitted > 1 else ''} not shown)")
+            parts.reverse()
+            total = sum(estimate_tokens(part) for part in parts)
+
+        context_tokens.observe(total)
+        return "\n\n".join([CONTEXT_HEADER, *parts]) + "\n\n"
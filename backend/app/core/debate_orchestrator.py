@@ -1,18 +1,96 @@
-from typing import List, AsyncGenerator
+from typing import List, AsyncGenerator, Callable, Dict, Optional, Tuple, Union
 import asyncio
+import time
 from datetime import datetime
-from app.core.llm_client import ClaudeClient
+from app.core.debate_context import DebateContext
+from app.core.llm_client import ClaudeClient, SystemPrompt, TokenUsage
 from app.core.persona_engine import PersonaEngine
-from app.models.schemas import DebateResponse, SentimentType
+from app.core.sentiment import SentimentAccumulator, sentiment_scorer
+from app.core.summary import SummaryBuilder
+from app.models.schemas import DebateResponse, DebateDelta, DebateRounds, DebateSummary, SentimentType
+from app.services.llm_scheduler import llm_scheduler
+from app.services.metrics import metrics
+from app.services.persona_store import persona_store
+from app.services.response_cache import response_cache, CacheKey
+from app.services.tracing import tracer
+
+# Receives each token chunk of a streamed completion
+DeltaCallback = Callable[[str], None]
+
+# Receives each DebateDelta produced while a debate is streaming
+DeltaEmitter = Callable[[DebateDelta], None]
+
+wave_seconds = metrics.histogram("fg_debate_wave_seconds", "Time from a wave's first call starting to its last response", ["wave"])
+rounds_total = metrics.counter("fg_debate_rounds_total", "Round-mode debates by why they stopped", ["stopped"])
+step_seconds = metrics.histogram("fg_debate_step_seconds", "Time to produce one persona response, cache and queueing included", ["cached"])
 
 class PersonaResponseData:
     """Simple data class for persona responses"""
-    def __init__(self, persona_id, persona_name, text, sentiment, confidence_score):
+    def __init__(self, persona_id, persona_name, text, sentiment, confidence_score, time_to_first_token_ms=None, usage=None):
         self.persona_id = persona_id
         self.persona_name = persona_name
         self.text = text
         self.sentiment = sentiment
         self.confidence_score = confidence_score
+        self.time_to_first_token_ms = time_to_first_token_ms
+        self.usage = usage
+
+class DebateRun:
+    """Per-debate state shared by every LLM call in one run"""
+    def __init__(self, session_id: str, question: str, tenant: str, emit: Optional[DeltaEmitter] = None):
+        self.session_id = session_id
+        self.question = question
+        self.tenant = tenant
+        self.emit = emit
+        # Prior responses for later calls, and the summary stage; both fed every response as it arrives
+        self.context = DebateContext()
+        self.summary: Optional[SummaryBuilder] = None
+        
+        # Response cache accounting
+        self.cache_hits = 0
+        self.cache_similar_hits = 0
+        self.cache_misses = 0
+        self.cache_saved_ms = 0.0
+        
+        # Provider token usage across every call in the debate
+        self.usage = TokenUsage()
+        
+        # Round engine outcome (mode=rounds): rounds run and why it stopped
+        self.rounds: Optional[Dict] = None
+    
+    def tokens_used(self) -> int:
+        return self.usage.total_input_tokens + self.usage.output_tokens
+    
+    def stats(self) -> Dict:
+        """Per-debate stats reported on the completion frame"""
+        lookups = self.cache_hits + self.cache_misses
+        stats = {
+            "cache": {
+                "hits": self.cache_hits,
+                "similar_hits": self.cache_similar_hits,
+                "misses": self.cache_misses,
+                "hit_rate": round(self.cache_hits / lookups, 3) if lookups else 0.0,
+                "latency_saved_ms": round(self.cache_saved_ms, 1)
+            },
+            "tokens": self.usage.to_dict()
+        }
+        if self.rounds is not None:
+            stats["rounds"] = self.rounds
+        return stats
+
+class DebateStep:
+    """One LLM call in a debate graph, with the responses it needs first"""
+    __slots__ = ("key", "persona", "wave", "depends_on", "is_rebuttal")
+    
+    def __init__(self, key: str, persona, wave: int, depends_on: Optional[List[str]] = None, is_rebuttal: bool = False):
+        self.key = key
+        self.persona = persona
+        self.wave = wave
+        self.depends_on = frozenset(depends_on or ())
+        self.is_rebuttal = is_rebuttal
+
+class StreamInterruptedError(Exception):
+    """A streamed completion failed after tokens were already sent"""
 
 class DebateOrchestrator:
     """Manages the flow of AI debate between personas"""
@@ -20,14 +98,20 @@ class DebateOrchestrator:
     def __init__(self):
         self.claude = ClaudeClient()
         self.persona_engine = PersonaEngine()
+        self.scheduler = llm_scheduler
+        self.cache = response_cache
+        self.sentiment = sentiment_scorer
     
     async def run_debate(
         self,
         session_id: str,
         question: str,
         persona_ids: List[str],
-        mode: str = "hybrid"
-    ) -> AsyncGenerator[DebateResponse, None]:
+        mode: str = "hybrid",
+        stream: bool = False,
+        tenant: Optional[str] = None,
+        rounds: Optional[DebateRounds] = None
+    ) -> AsyncGenerator[Union[DebateResponse, DebateDelta], None]:
         """
         Orchestrates the debate and streams responses
         
@@ -35,257 +119,543 @@ class DebateOrchestrator:
         - sequential: One at a time (safest)
         - parallel: All at once (fastest)
         - hybrid: Waves of responses (best UX)
+        - rounds: Configurable rounds (`rounds`), each run concurrently,
+          stopping early on convergence or at the token budget
+        
+        With stream=True every persona call streams its tokens, and
+        DebateDelta chunks are yielded (interleaved across personas that
+        are speaking concurrently) ahead of each final DebateResponse.
+        
+        LLM calls are admitted through the global scheduler under `tenant`
+        (the owning user; defaults to the session) for fair sharing.
         """
         
         personas = await self.persona_engine.get_personas(persona_ids)
+        persona_store.record_usage(personas)
+        tenant = tenant or session_id
         
-        if mode == "hybrid":
-            async for response in self._hybrid_debate(session_id, question, personas):
+        if not stream:
+            run = self._new_run(session_id, question, tenant)
+            async for response in self._run_mode(run, personas, mode, rounds):
                 yield response
+            return
+        
+        # Deltas are pushed from inside the LLM calls, final responses from
+        # the mode generator; both funnel through one queue in arrival order
+        queue: asyncio.Queue = asyncio.Queue()
+        run = self._new_run(session_id, question, tenant, emit=queue.put_nowait)
+        
+        async def pump():
+            try:
+                async for response in self._run_mode(run, personas, mode, rounds):
+                    queue.put_nowait(response)
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                queue.put_nowait(None)
+        
+        pump_task = asyncio.create_task(pump())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not pump_task.done():
+                pump_task.cancel()
+    
+    def _new_run(self, session_id: str, question: str, tenant: str, emit: Optional[DeltaEmitter] = None) -> DebateRun:
+        run = DebateRun(session_id, question, tenant, emit)
+        run.summary = SummaryBuilder(
+            session_id, question,
+            lambda system_prompt, user_message, max_tokens: self._summary_completion(run, system_prompt, user_message, max_tokens)
+        )
+        return run
+    
+    async def _summary_completion(self, run: DebateRun, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        """The summary's LLM call, scheduled and cached like any persona call"""
+        text, _ = await self._complete(
+            run,
+            system_prompt=system_prompt,
+            user_message=user_message,
+            max_tokens=max_tokens,
+            cache_key=self.cache.make_key("moderator", run.question, user_message, max_tokens, kind="summary")
+        )
+        return text
+    
+    def _run_mode(self, run: DebateRun, personas, mode: str, rounds: Optional[DebateRounds] = None):
+        """Build the call graph for a mode and run it"""
+        if mode == "rounds":
+            return self._run_rounds(run, personas, rounds or DebateRounds())
+        if mode == "hybrid":
+            steps = self._hybrid_steps(personas)
         elif mode == "parallel":
-            async for response in self._parallel_debate(session_id, question, personas):
-                yield response
+            steps = self._parallel_steps(personas)
         else:
-            async for response in self._sequential_debate(session_id, question, personas):
-                yield response
-    
-    async def _hybrid_debate(self, session_id, question, personas):
-        """Wave-based responses with reactions"""
-        
-        # Wave 1: First 3 personas
-        wave1_personas = personas[:3]
-        wave1_responses = []
+            steps = self._sequential_steps(personas)
         
-        tasks = [
-            self._get_persona_response(p, question, [])
-            for p in wave1_personas
-        ]
+        return self._run_graph(run, steps)
+    
+    def _delta_callback(
+        self,
+        run: DebateRun,
+        persona,
+        wave: int,
+        sentiment: Optional[SentimentAccumulator],
+        is_rebuttal: bool = False
+    ) -> Optional[DeltaCallback]:
+        """Bind a streamed call to the debate's delta emitter, scoring the text as it arrives"""
+        if run.emit is None:
+            return None
         
-        for task in asyncio.as_completed(tasks):
-            response = await task
-            wave1_responses.append(response)
-            
-            yield DebateResponse(
-                session_id=session_id,
-                persona_id=response.persona_id,
-                persona_name=response.persona_name,
-                text=response.text,
-                wave=1,
-                sentiment=response.sentiment,
-                confidence_score=response.confidence_score,
-                is_complete=False,
+        def on_delta(text: str):
+            sentiment.feed(text)
+            score = sentiment.current()
+            run.emit(DebateDelta(
+                session_id=run.session_id,
+                persona_id=persona.id,
+                persona_name=persona.name,
+                delta=text,
+                wave=wave,
+                sentiment=score.sentiment,
+                confidence_score=score.confidence,
+                is_rebuttal=is_rebuttal,
                 timestamp=datetime.utcnow()
-            )
-        
-        # Wave 2: Remaining personas respond to wave 1
-        if len(personas) > 3:
-            wave2_personas = personas[3:]
-            wave2_responses = []
-            
-            tasks = [
-                self._get_persona_response(p, question, wave1_responses)
-                for p in wave2_personas
-            ]
-            
-            for task in asyncio.as_completed(tasks):
-                response = await task
-                wave2_responses.append(response)
-                
-                yield DebateResponse(
-                    session_id=session_id,
-                    persona_id=response.persona_id,
-                    persona_name=response.persona_name,
-                    text=response.text,
-                    wave=2,
-                    sentiment=response.sentiment,
-                    confidence_score=response.confidence_score,
-                    is_complete=False,
-                    timestamp=datetime.utcnow()
-                )
-            
-            # Wave 3: Quick rebuttals (first 2 personas)
-            rebuttal_personas = personas[:2]
-            all_responses = wave1_responses + wave2_responses
-            
-            for persona in rebuttal_personas:
-                rebuttal = await self._get_rebuttal(persona, question, all_responses)
-                
-                yield DebateResponse(
-                    session_id=session_id,
-                    persona_id=rebuttal.persona_id,
-                    persona_name=rebuttal.persona_name,
-                    text=rebuttal.text,
-                    wave=3,
-                    sentiment=rebuttal.sentiment,
-                    confidence_score=rebuttal.confidence_score,
-                    is_complete=False,
-                    is_rebuttal=True,
-                    timestamp=datetime.utcnow()
-                )
+            ))
         
-        # Final: Mark complete
-        yield DebateResponse(
-            session_id=session_id,
+        return on_delta
+    
+    def _to_debate_response(
+        self,
+        run: DebateRun,
+        response: PersonaResponseData,
+        wave: int,
+        is_rebuttal: bool = False
+    ) -> DebateResponse:
+        """Wrap a persona response for the client"""
+        return DebateResponse(
+            session_id=run.session_id,
+            persona_id=response.persona_id,
+            persona_name=response.persona_name,
+            text=response.text,
+            wave=wave,
+            sentiment=response.sentiment,
+            confidence_score=response.confidence_score,
+            is_rebuttal=is_rebuttal,
+            is_complete=False,
+            time_to_first_token_ms=response.time_to_first_token_ms,
+            timestamp=datetime.utcnow()
+        )
+    
+    def _complete_marker(self, run: DebateRun, summary: DebateSummary) -> DebateResponse:
+        """Final frame marking the debate as complete, with its summary"""
+        return DebateResponse(
+            session_id=run.session_id,
             persona_id="",
             persona_name="",
             text="",
             wave=0,
             is_complete=True,
+            stats=run.stats(),
+            summary=summary,
             timestamp=datetime.utcnow()
         )
     
-    async def _sequential_debate(self, session_id, question, personas):
-        """One persona at a time"""
-        previous_responses = []
+    def _hybrid_steps(self, personas) -> List[DebateStep]:
+        """Wave-based responses with reactions"""
+        
+        # Wave 1: First 3 personas, independent of each other
+        wave1 = [
+            DebateStep(f"w1:{idx}", p, wave=1)
+            for idx, p in enumerate(personas[:3])
+        ]
+        
+        if len(personas) <= 3:
+            return wave1
+        
+        # Wave 2: Remaining personas respond to wave 1
+        wave1_keys = [step.key for step in wave1]
+        wave2 = [
+            DebateStep(f"w2:{idx}", p, wave=2, depends_on=wave1_keys)
+            for idx, p in enumerate(personas[3:])
+        ]
+        
+        # Wave 3: Quick rebuttals (first 2 personas), run concurrently
+        all_keys = wave1_keys + [step.key for step in wave2]
+        rebuttals = [
+            DebateStep(f"w3:{idx}", p, wave=3, depends_on=all_keys, is_rebuttal=True)
+            for idx, p in enumerate(personas[:2])
+        ]
+        
+        return wave1 + wave2 + rebuttals
+    
+    def _sequential_steps(self, personas) -> List[DebateStep]:
+        """One persona at a time, each seeing everyone before them"""
+        steps = []
         
         for idx, persona in enumerate(personas):
-            response = await self._get_persona_response(persona, question, previous_responses)
-            previous_responses.append(response)
-            
-            yield DebateResponse(
-                session_id=session_id,
-                persona_id=response.persona_id,
-                persona_name=response.persona_name,
-                text=response.text,
-                wave=1,
-                sentiment=response.sentiment,
-                confidence_score=response.confidence_score,
-                is_complete=False,
-                timestamp=datetime.utcnow()
-            )
+            steps.append(DebateStep(
+                f"s:{idx}", persona, wave=1,
+                depends_on=[step.key for step in steps]
+            ))
         
-        yield DebateResponse(
-            session_id=session_id,
-            persona_id="",
-            persona_name="",
-            text="",
-            wave=0,
-            is_complete=True,
-            timestamp=datetime.utcnow()
-        )
+        return steps
     
-    async def _parallel_debate(self, session_id, question, personas):
+    def _parallel_steps(self, personas) -> List[DebateStep]:
         """All at once"""
-        tasks = [
-            self._get_persona_response(p, question, [])
-            for p in personas
+        return [DebateStep(f"p:{idx}", p, wave=1) for idx, p in enumerate(personas)]
+    
+    def _round_steps(self, round_no: int, personas, previous_keys: List[str]) -> List[DebateStep]:
+        """One round: everyone at once, reacting to all earlier rounds"""
+        return [
+            DebateStep(f"r{round_no}:{idx}", p, wave=round_no, depends_on=previous_keys, is_rebuttal=round_no > 1)
+            for idx, p in enumerate(personas)
         ]
+    
+    def _round_personas(self, personas, config: DebateRounds, round_no: int) -> List:
+        if not config.persona_ids:
+            return personas
+        ids = set(config.persona_ids[(round_no - 1) % len(config.persona_ids)])
+        subset = [p for p in personas if p.id in ids]
+        if not subset:
+            raise ValueError(f"Round {round_no} has none of this debate's personas")
+        return subset
+    
+    async def _run_graph(self, run: DebateRun, steps: List[DebateStep]):
+        """Run a mode's whole call graph, then summarize and mark the debate complete"""
+        
+        # Start the summary's LLM call once only the final wave is still out,
+        # if everyone in it has spoken already: a first response adds a
+        # stance, so a summary speculated without it would always be redone
+        final_wave = max(step.wave for step in steps)
+        spoken = {step.persona.id for step in steps if step.wave != final_wave}
+        final = [step for step in steps if step.wave == final_wave]
+        speculate_at = len(steps) - len(final) if spoken and all(step.persona.id in spoken for step in final) else None
+        
+        try:
+            async for response in self._run_steps(run, steps, [], speculate_at):
+                yield response
+            summary = await run.summary.finish()
+        finally:
+            run.summary.cancel()
         
-        for task in asyncio.as_completed(tasks):
-            response = await task
+        # Final: Mark complete
+        yield self._complete_marker(run, summary)
+    
+    async def _run_rounds(self, run: DebateRun, personas, config: DebateRounds):
+        """
+        Run up to `config.count` rounds, each a concurrent wave reacting to
+        the rounds before it. Stops early once no persona's sentiment moved
+        since their previous round, or when the next round would likely
+        push the debate past its token budget (judged by the last round's cost).
+        """
+        
+        completed_keys: List[str] = []
+        stances: Dict[str, SentimentType] = {}
+        stopped = "max_rounds"
+        round_no = 0
+        
+        try:
+            for round_no in range(1, config.count + 1):
+                round_personas = self._round_personas(personas, config, round_no)
+                steps = self._round_steps(round_no, round_personas, list(completed_keys))
+                # Only the planned last round is known to be last; summarize during
+                # it, unless someone in it hasn't spoken yet (see _run_graph)
+                last = round_no == config.count and all(p.id in stances for p in round_personas)
+                speculate_at = len(steps) - 1 if last else None
+                
+                spent_before = run.tokens_used()
+                # A persona speaking for the first time counts as a change
+                changed = False
+                async for response in self._run_steps(run, steps, completed_keys, speculate_at):
+                    changed |= stances.get(response.persona_id) != response.sentiment
+                    stances[response.persona_id] = response.sentiment
+                    yield response
+                
+                if round_no == config.count:
+                    break
+                if config.stop_on_convergence and not changed:
+                    stopped = "converged"
+                    break
+                round_cost = run.tokens_used() - spent_before
+                if config.max_tokens and run.tokens_used() + round_cost > config.max_tokens:
+                    stopped = "token_budget"
+                    break
             
-            yield DebateResponse(
-                session_id=session_id,
-                persona_id=response.persona_id,
-                persona_name=response.persona_name,
-                text=response.text,
-                wave=1,
-                sentiment=response.sentiment,
-                confidence_score=response.confidence_score,
-                is_complete=False,
-                timestamp=datetime.utcnow()
-            )
+            run.rounds = {"completed": round_no, "planned": config.count, "stopped": stopped}
+            rounds_total.inc(stopped=stopped)
+            span = tracer.current_span()
+            if span is not None:
+                span.set_attribute("debate.rounds", round_no)
+                span.set_attribute("debate.rounds_stopped", stopped)
+            summary = await run.summary.finish()
+        finally:
+            run.summary.cancel()
         
-        yield DebateResponse(
-            session_id=session_id,
-            persona_id="",
-            persona_name="",
-            text="",
-            wave=0,
-            is_complete=True,
-            timestamp=datetime.utcnow()
-        )
+        yield self._complete_marker(run, summary)
+    
+    async def _run_steps(self, run: DebateRun, steps: List[DebateStep], completed_keys: List[str], speculate_at: Optional[int]):
+        """
+        Run a call graph, starting each step as soon as the responses it
+        depends on are in, and yield responses in completion order.
+        
+        `completed_keys` holds the steps already finished (in arrival order)
+        and is extended as this graph's steps finish; the summary's LLM call
+        is started once `speculate_at` of this graph's responses are in.
+        """
+        
+        results: Dict[str, PersonaResponseData] = {}
+        available = set(completed_keys)
+        pending = {step.key: step for step in steps}
+        running: Dict[asyncio.Task, DebateStep] = {}
+        
+        # Per wave: steps left to finish, and when its first step started
+        wave_remaining: Dict[int, int] = {}
+        for step in steps:
+            wave_remaining[step.wave] = wave_remaining.get(step.wave, 0) + 1
+        wave_started: Dict[int, Tuple[float, int]] = {}
+        
+        def start_ready():
+            for key, step in list(pending.items()):
+                if not all(dep in available for dep in step.depends_on):
+                    continue
+                
+                del pending[key]
+                # Context keeps the order responses actually arrived in
+                context = run.context.render([k for k in completed_keys if k in step.depends_on])
+                
+                if step.is_rebuttal:
+                    coro = self._get_rebuttal(run, step.persona, context, wave=step.wave)
+                else:
+                    coro = self._get_persona_response(run, step.persona, context, wave=step.wave)
+                wave_started.setdefault(step.wave, (time.perf_counter(), time.time_ns()))
+                running[asyncio.create_task(self._traced_step(step, coro))] = step
+        
+        def finish_wave(step: DebateStep):
+            wave_remaining[step.wave] -= 1
+            if wave_remaining[step.wave]:
+                return
+            started, started_ns = wave_started[step.wave]
+            wave_seconds.observe(time.perf_counter() - started, wave=str(step.wave))
+            tracer.end(tracer.start_span("debate.wave", {"debate.wave": step.wave}, start_ns=started_ns))
+        
+        start_ready()
+        
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                
+                finished = []
+                for task in done:
+                    step = running.pop(task)
+                    response = task.result()
+                    results[step.key] = response
+                    available.add(step.key)
+                    completed_keys.append(step.key)
+                    finished.append((step, response))
+                    finish_wave(step)
+                    run.context.add(step.key, response.persona_name, response.text, response.sentiment)
+                    run.summary.add(
+                        response.persona_id, response.persona_name, response.text,
+                        response.sentiment, response.confidence_score, step.is_rebuttal
+                    )
+                
+                # Unblock dependents before handing results to the consumer
+                start_ready()
+                if speculate_at is not None and len(results) >= speculate_at:
+                    run.summary.speculate()
+                
+                for step, response in finished:
+                    yield self._to_debate_response(run, response, step.wave, step.is_rebuttal)
+        finally:
+            for task in running:
+                task.cancel()
+    
+    async def _traced_step(self, step: DebateStep, coro) -> PersonaResponseData:
+        """Run one step of the graph as its own span"""
+        start = time.perf_counter()
+        with tracer.span("debate.step", {
+            "persona.id": step.persona.id,
+            "debate.wave": step.wave,
+            "debate.is_rebuttal": step.is_rebuttal
+        }) as span:
+            response = await coro
+            step_seconds.observe(time.perf_counter() - start, cached=str(span.attributes.get("cache.hit", False)).lower())
+            return response
     
-    async def _get_persona_response(self, persona, question: str, previous_responses: List) -> PersonaResponseData:
-        """Get a single persona's response"""
+    async def _complete(
+        self,
+        run: DebateRun,
+        system_prompt: SystemPrompt,
+        user_message: str,
+        max_tokens: int,
+        on_delta: Optional[DeltaCallback] = None,
+        cache_key: Optional[CacheKey] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> Tuple[str, Optional[float]]:
+        """Serve a completion from cache, or run it through the scheduler and cache it"""
+        
+        start = time.perf_counter()
+        
+        if cache_key is not None:
+            cached, similar = await self.cache.get(cache_key)
+            span = tracer.current_span()
+            if span is not None:
+                span.set_attribute("cache.hit", cached is not None)
+            if cached is not None:
+                lookup_ms = (time.perf_counter() - start) * 1000
+                run.cache_hits += 1
+                run.cache_similar_hits += int(similar)
+                run.cache_saved_ms += max(0.0, cached["latency_ms"] - lookup_ms)
+                if on_delta is not None:
+                    on_delta(cached["text"])
+                return cached["text"], round(lookup_ms, 1) if on_delta else None
+            run.cache_misses += 1
+        
+        call_usage = usage or TokenUsage()
+        text, ttft = await self._generate(system_prompt, user_message, max_tokens, run.tenant, on_delta, call_usage)
+        run.usage.add(call_usage)
+        
+        if cache_key is not None and text:
+            await self.cache.set(cache_key, text, (time.perf_counter() - start) * 1000)
+        
+        return text, ttft
+    
+    async def _generate(
+        self,
+        system_prompt: SystemPrompt,
+        user_message: str,
+        max_tokens: int,
+        tenant: str,
+        on_delta: Optional[DeltaCallback] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> Tuple[str, Optional[float]]:
+        """Run one completion through the scheduler; stream it through on_delta when given"""
         
-        # Build context from previous responses
-        context = self._build_context(previous_responses)
+        estimated_tokens = self.scheduler.estimate_tokens(system_prompt, user_message, max_tokens)
         
-        # Generate system prompt
-        system_prompt = self.persona_engine.build_prompt(
+        if on_delta is None:
+            text = await self.scheduler.run(
+                tenant,
+                lambda: self.claude.get_completion(
+                    system_prompt=system_prompt,
+                    user_message=user_message,
+                    max_tokens=max_tokens,
+                    usage=usage
+                ),
+                estimated_tokens=estimated_tokens
+            )
+            return text, None
+        
+        async def stream_call() -> Tuple[str, Optional[float]]:
+            chunks = []
+            time_to_first_token_ms = None
+            start = time.perf_counter()
+            
+            try:
+                async for chunk in self.claude.stream_completion(
+                    system_prompt=system_prompt,
+                    user_message=user_message,
+                    max_tokens=max_tokens,
+                    usage=usage
+                ):
+                    if time_to_first_token_ms is None:
+                        time_to_first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+                    chunks.append(chunk)
+                    on_delta(chunk)
+            except Exception as e:
+                # Retrying would re-send tokens the client already has
+                if chunks:
+                    raise StreamInterruptedError(str(e)) from e
+                raise
+            
+            return "".join(chunks), time_to_first_token_ms
+        
+        return await self.scheduler.run(tenant, stream_call, estimated_tokens=estimated_tokens)
+    
+    async def _get_persona_response(
+        self,
+        run: DebateRun,
+        persona,
+        context: str,
+        wave: int = 1
+    ) -> PersonaResponseData:
+        """Get a single persona's response, given the context of responses before it"""
+        
+        # Generate system prompt (static persona prefix is provider-cached)
+        system_prompt = self.persona_engine.build_system_blocks(
             persona=persona,
-            question=question,
+            question=run.question,
             context=context
         )
+        usage = TokenUsage()
+        # Streamed responses are scored delta by delta; the rest in one pass below
+        sentiment = self.sentiment.accumulator() if run.emit is not None else None
         
         # Get completion from Claude
-        response_text = await self.claude.get_completion(
+        response_text, ttft = await self._complete(
+            run,
             system_prompt=system_prompt,
-            user_message=question,
-            max_tokens=300
+            user_message=run.question,
+            max_tokens=300,
+            on_delta=self._delta_callback(run, persona, wave, sentiment),
+            cache_key=self.cache.make_key(persona.fingerprint, run.question, context, 300),
+            usage=usage
         )
         
         # Analyze sentiment
-        sentiment = self._analyze_sentiment(response_text)
+        score = sentiment.finish() if sentiment is not None else self.sentiment.score(response_text)
         
         return PersonaResponseData(
             persona_id=persona.id,
             persona_name=persona.name,
             text=response_text,
-            sentiment=sentiment,
-            confidence_score=self._calculate_confidence(response_text)
+            sentiment=score.sentiment,
+            confidence_score=score.confidence,
+            time_to_first_token_ms=ttft,
+            usage=usage
         )
     
-    async def _get_rebuttal(self, persona, question: str, all_responses: List) -> PersonaResponseData:
+    async def _get_rebuttal(
+        self,
+        run: DebateRun,
+        persona,
+        context: str,
+        wave: int = 3
+    ) -> PersonaResponseData:
         """Get a rebuttal response"""
         
-        context = self._build_context(all_responses)
-        context += "\n\nNow provide a brief rebuttal or final thought (1-2 sentences)."
+        context = f"{context}\n\nNow provide a brief rebuttal or final thought (1-2 sentences)."
         
-        system_prompt = self.persona_engine.build_prompt(
+        system_prompt = self.persona_engine.build_system_blocks(
             persona=persona,
-            question=question,
+            question=run.question,
             context=context
         )
+        usage = TokenUsage()
+        sentiment = self.sentiment.accumulator() if run.emit is not None else None
         
-        response_text = await self.claude.get_completion(
+        response_text, ttft = await self._complete(
+            run,
             system_prompt=system_prompt,
             user_message="Provide your rebuttal",
-            max_tokens=150
+            max_tokens=150,
+            on_delta=self._delta_callback(run, persona, wave, sentiment, is_rebuttal=True),
+            cache_key=self.cache.make_key(persona.fingerprint, run.question, context, 150, kind="rebuttal"),
+            usage=usage
         )
         
-        sentiment = self._analyze_sentiment(response_text)
+        score = sentiment.finish() if sentiment is not None else self.sentiment.score(response_text)
         
         return PersonaResponseData(
             persona_id=persona.id,
             persona_name=persona.name,
             text=response_text,
-            sentiment=sentiment,
-            confidence_score=self._calculate_confidence(response_text)
+            sentiment=score.sentiment,
+            confidence_score=score.confidence,
+            time_to_first_token_ms=ttft,
+            usage=usage
         )
-    
-    def _build_context(self, previous_responses: List) -> str:
-        """Format previous responses for context"""
-        if not previous_responses:
-            return ""
-        
-        context = "Other panel members have said:\n\n"
-        for resp in previous_responses:
-            context += f"{resp.persona_name}: {resp.text}\n\n"
-        
-        return context
-    
-    def _analyze_sentiment(self, text: str) -> SentimentType:
-        """Determine sentiment of response"""
-        positive_words = ['great', 'love', 'amazing', 'yes', 'definitely', 'excellent', 'perfect', 'good']
-        negative_words = ['bad', 'hate', 'terrible', 'no', 'never', 'awful', 'wrong', 'problem']
-        
-        text_lower = text.lower()
-        pos_count = sum(1 for w in positive_words if w in text_lower)
-        neg_count = sum(1 for w in negative_words if w in text_lower)
-        
-        if pos_count > neg_count:
-            return SentimentType.POSITIVE
-        elif neg_count > pos_count:
-            return SentimentType.NEGATIVE
-        else:
-            return SentimentType.NEUTRAL
-    
-    def _calculate_confidence(self, text: str) -> float:
-        """Calculate how confident the response is"""
-        hedging = ['maybe', 'perhaps', 'possibly', 'might', 'could', 'probably']
-        hedge_count = sum(1 for w in hedging if w in text.lower())
-        
-        confidence = max(0.3, 1.0 - (hedge_count * 0.15))
-        return round(confidence, 2)
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import math
+import random
+from types import SimpleNamespace
+from typing import List, Optional
+import anthropic
+import httpx
+from app.config import settings
+from app.core.llm_client import LLMBackend, SystemPrompt, TokenUsage
+
+# Enough sentiment and hedging words that the orchestrator's analysis
+# produces a realistic mix of positive/negative/neutral responses
+VOCABULARY = [
+    "honestly", "I", "think", "this", "could", "work", "but", "the", "price",
+    "matters", "a", "lot", "great", "idea", "love", "it", "terrible", "problem",
+    "maybe", "definitely", "never", "perfect", "wrong", "probably", "people",
+    "would", "use", "it", "every", "day", "not", "sure", "about", "that",
+    "amazing", "awful", "good", "bad", "perhaps", "my", "kids", "team", "users"
+]
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Offline, deterministic stand-in for the Messages API
+
+    The same prompt always produces the same text (seeded from a hash of
+    the prompt), so debates are reproducible without a network. Latency
+    to the first token is drawn from a configurable distribution, tokens
+    then arrive at a fixed rate, and a fraction of calls can fail with a
+    429 or a 500 to exercise the scheduler's retry path. Errors and
+    latency draw from one seeded RNG; text does not depend on them.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = settings.FAKE_LLM_LATENCY_MS,
+        distribution: str = settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+        sigma: float = settings.FAKE_LLM_LATENCY_SIGMA,
+        tokens_per_second: float = settings.FAKE_LLM_TOKENS_PER_SECOND,
+        error_rate: float = settings.FAKE_LLM_ERROR_RATE,
+        rate_limit_rate: float = settings.FAKE_LLM_RATE_LIMIT_RATE,
+        retry_after: float = settings.FAKE_LLM_RETRY_AFTER_SECONDS,
+        seed: int = settings.FAKE_LLM_SEED
+    ):
+        if distribution not in ("fixed", "uniform", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+
+        self.latency = latency_ms / 1000
+        self.distribution = distribution
+        self.sigma = sigma
+        self.token_interval = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.calls = 0
+        self._rng = random.Random(seed)
+        # System prefixes seen with cache_control, to report cache hits like the API does
+        self._cached_prefixes = set()
+
+    async def stream(self, system_prompt, user_message, max_tokens, timeout, usage=None):
+        words = await self._begin(system_prompt, user_message, max_tokens, usage)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.token_interval)
+            yield word if i == 0 else " " + word
+
+    async def complete(self, system_prompt, user_message, max_tokens, timeout, usage=None):
+        words = await self._begin(system_prompt, user_message, max_tokens, usage)
+        # Non-streaming calls still take as long as generating every token
+        await asyncio.sleep(self.token_interval * max(0, len(words) - 1))
+        return " ".join(words)
+
+    async def _begin(self, system_prompt: SystemPrompt, user_message: str, max_tokens: int, usage: Optional[TokenUsage]) -> List[str]:
+        """Wait out the time to first token, maybe fail, and pick the reply"""
+        self.calls += 1
+        roll = self._rng.random()
+        await asyncio.sleep(self._sample_latency())
+
+        if roll < self.rate_limit_rate:
+            raise anthropic.RateLimitError(
+                "Rate limited (fake)",
+                response=self._error_response(429, {"retry-after": str(self.retry_after)}),
+                body=None
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise anthropic.InternalServerError(
+                "Internal server error (fake)",
+                response=self._error_response(500),
+                body=None
+            )
+
+        system_text = self._system_text(system_prompt)
+        words = self._reply(system_text + "\n" + user_message, max_tokens)
+        if usage is not None:
+            usage.record(self._usage(system_prompt, system_text, user_message, len(words)))
+        return words
+
+    def _sample_latency(self) -> float:
+        if self.distribution == "fixed":
+            return self.latency
+        if self.distribution == "uniform":
+            return self._rng.uniform(0, 2 * self.latency)
+        if self.distribution == "exponential":
+            return self._rng.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+        # lognormal with the configured median
+        return self._rng.lognormvariate(math.log(self.latency), self.sigma) if self.latency > 0 else 0.0
+
+    def _reply(self, prompt: str, max_tokens: int) -> List[str]:
+        """Deterministic text for a prompt: same prompt, same words"""
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode()).digest()
+        rng = random.Random(digest)
+        length = min(max_tokens, rng.randint(12, 40))
+        words = [rng.choice(VOCABULARY) for _ in range(length)]
+        words[0] = words[0].capitalize()
+        words[-1] += "."
+        return words
+
+    def _usage(self, system_prompt: SystemPrompt, system_text: str, user_message: str, output_tokens: int) -> SimpleNamespace:
+        """Usage block shaped like the API's, with ~4 characters per token"""
+        cached = 0
+        created = 0
+        if isinstance(system_prompt, list):
+            for block in system_prompt:
+                if "cache_control" not in block:
+                    continue
+                tokens = len(block.get("text", "")) // 4
+                if block.get("text") in self._cached_prefixes:
+                    cached += tokens
+                else:
+                    self._cached_prefixes.add(block.get("text"))
+                    created += tokens
+
+        return SimpleNamespace(
+            input_tokens=max(1, (len(system_text) + len(user_message)) // 4 - cached - created),
+            output_tokens=output_tokens,
+            cache_read_input_tokens=cached,
+            cache_creation_input_tokens=created
+        )
+
+    @staticmethod
+    def _system_text(system_prompt: SystemPrompt) -> str:
+        if isinstance(system_prompt, str):
+            return system_prompt
+        return "".join(block.get("text", "") for block in system_prompt)
+
+    @staticmethod
+    def _error_response(status: int, headers: Optional[dict] = None) -> httpx.Response:
+        request = httpx.Request("POST", "http://fake-llm.local/v1/messages")
+        return httpx.Response(status, headers=headers, request=request)
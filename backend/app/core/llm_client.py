@@ -1,57 +1,259 @@
 import anthropic
-from typing import AsyncGenerator
+import httpx
+import time
+from typing import AsyncGenerator, Dict, List, Optional, Union
 from app.config import settings
+from app.services.metrics import metrics
+from app.services.tracing import tracer
+
+# One keep-alive connection pool per process, shared by every ClaudeClient
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get (or lazily create) the process-wide async HTTP pool"""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(
+                settings.LLM_REQUEST_TIMEOUT,
+                connect=settings.LLM_CONNECT_TIMEOUT
+            )
+        )
+    return _http_client
+
+def set_http_client(client: httpx.AsyncClient):
+    """Replace the shared HTTP pool (e.g. with a mock transport for benchmarks)"""
+    global _http_client
+    _http_client = client
+
+async def close_http_client():
+    """Close the shared HTTP pool on shutdown"""
+    global _http_client
+
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+# Plain string, or content blocks (e.g. with cache_control markers)
+SystemPrompt = Union[str, List[Dict]]
+
+class TokenUsage:
+    """Input/output token counts, split into cached and uncached input"""
+    __slots__ = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.cache_creation_input_tokens = 0
+
+    def record(self, usage):
+        """Add the usage block of an API response"""
+        self.input_tokens += usage.input_tokens or 0
+        self.output_tokens += usage.output_tokens or 0
+        self.cache_read_input_tokens += getattr(usage, "cache_read_input_tokens", None) or 0
+        self.cache_creation_input_tokens += getattr(usage, "cache_creation_input_tokens", None) or 0
+
+    def add(self, other: "TokenUsage"):
+        for field in self.__slots__:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    @property
+    def total_input_tokens(self) -> int:
+        """Uncached + cache-read + cache-write input tokens"""
+        return self.input_tokens + self.cache_read_input_tokens + self.cache_creation_input_tokens
+
+    def to_dict(self) -> Dict:
+        return {
+            "input_tokens": self.input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "output_tokens": self.output_tokens
+        }
+
+class LLMBackend:
+    """
+    Where completions actually come from
+
+    ClaudeClient delegates to one of these (chosen by LLM_BACKEND), so the
+    rest of the app never knows whether it's talking to the API or to the
+    offline stand-in. Implementations add token counts to `usage`.
+    """
+
+    def stream(
+        self,
+        system_prompt: SystemPrompt,
+        user_message: str,
+        max_tokens: int,
+        timeout: float,
+        usage: Optional[TokenUsage] = None
+    ) -> AsyncGenerator[str, None]:
+        """Async generator of text chunks"""
+        raise NotImplementedError
+
+    async def complete(
+        self,
+        system_prompt: SystemPrompt,
+        user_message: str,
+        max_tokens: int,
+        timeout: float,
+        usage: Optional[TokenUsage] = None
+    ) -> str:
+        raise NotImplementedError
+
+class AnthropicBackend(LLMBackend):
+    """The Anthropic Messages API, over the shared connection pool"""
 
-class ClaudeClient:
-    """Wrapper for Anthropic Claude API"""
-    
     def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    
+        self._client: Optional[anthropic.AsyncAnthropic] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> anthropic.AsyncAnthropic:
+        """Async Anthropic client bound to the shared connection pool"""
+        http_client = get_http_client()
+
+        # Rebind if the shared pool was closed and recreated
+        if self._client is None or self._http_client is not http_client:
+            self._client = anthropic.AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                base_url=settings.ANTHROPIC_BASE_URL or None,
+                http_client=http_client,
+                max_retries=settings.LLM_MAX_RETRIES
+            )
+            self._http_client = http_client
+        return self._client
+
+    async def stream(self, system_prompt, user_message, max_tokens, timeout, usage=None):
+        async with self.client.messages.stream(
+            model=settings.DEFAULT_MODEL,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": user_message}
+            ],
+            timeout=timeout
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+            if usage is not None:
+                usage.record((await stream.get_final_message()).usage)
+
+    async def complete(self, system_prompt, user_message, max_tokens, timeout, usage=None):
+        message = await self.client.messages.create(
+            model=settings.DEFAULT_MODEL,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": user_message}
+            ],
+            timeout=timeout
+        )
+
+        if usage is not None:
+            usage.record(message.usage)
+
+        return message.content[0].text
+
+def create_backend(name: str = settings.LLM_BACKEND) -> LLMBackend:
+    """Backend for an LLM_BACKEND name ("anthropic" or "fake")"""
+    if name == "fake":
+        from app.core.fake_llm import FakeLLMBackend
+        return FakeLLMBackend()
+    if name == "anthropic":
+        return AnthropicBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+llm_requests = metrics.counter("fg_llm_requests_total", "LLM calls by outcome", ["backend", "kind", "outcome"])
+llm_ttft_seconds = metrics.histogram("fg_llm_time_to_first_token_seconds", "Time from sending a call to its first token", ["backend"])
+llm_generation_seconds = metrics.histogram("fg_llm_generation_seconds", "Time spent generating a response (after the first token when streaming)", ["backend", "kind"])
+llm_tokens = metrics.counter("fg_llm_tokens_total", "Tokens billed by the provider", ["backend", "type"])
+
+class ClaudeClient:
+    """Async wrapper for Anthropic Claude API (or the configured stand-in)"""
+
+    def __init__(self, timeout: Optional[float] = None, backend: Optional[LLMBackend] = None):
+        self.timeout = timeout or settings.LLM_REQUEST_TIMEOUT
+        self.backend = backend or create_backend()
+        self.backend_name = type(self.backend).__name__
+
     async def stream_completion(
         self,
-        system_prompt: str,
+        system_prompt: SystemPrompt,
         user_message: str,
-        max_tokens: int = 300
+        max_tokens: int = 300,
+        usage: Optional[TokenUsage] = None
     ) -> AsyncGenerator[str, None]:
-        """Stream a completion from Claude"""
-        
+        """Stream a completion from Claude; token counts are added to `usage`"""
+
+        span = tracer.start_span("llm.stream", {"gen_ai.request.model": settings.DEFAULT_MODEL, "gen_ai.request.max_tokens": max_tokens})
+        call_usage = TokenUsage()
+        start = time.perf_counter()
+        first_token_at = None
+        outcome = "cancelled"
+
         try:
-            with self.client.messages.stream(
-                model=settings.DEFAULT_MODEL,
-                max_tokens=max_tokens,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_message}
-                ]
-            ) as stream:
-                for text in stream.text_stream:
-                    yield text
-                    
+            async for text in self.backend.stream(system_prompt, user_message, max_tokens, self.timeout, call_usage):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    llm_ttft_seconds.observe(first_token_at - start, backend=self.backend_name)
+                    span.set_attribute("llm.time_to_first_token_ms", round((first_token_at - start) * 1000, 1))
+                yield text
+            outcome = "ok"
+
         except Exception as e:
             print(f"Error streaming from Claude: {e}")
+            outcome = e.__class__.__name__
+            span.record_error(e)
             raise
-    
+        finally:
+            if first_token_at is not None:
+                llm_generation_seconds.observe(time.perf_counter() - first_token_at, backend=self.backend_name, kind="stream")
+            self._finish(span, "stream", outcome, call_usage, usage)
+
+    def _finish(self, span, kind: str, outcome: str, call_usage: TokenUsage, usage: Optional[TokenUsage]):
+        """Record one call's outcome and tokens, and hand its usage to the caller"""
+        llm_requests.inc(backend=self.backend_name, kind=kind, outcome=outcome)
+        for field, count in call_usage.to_dict().items():
+            if count:
+                llm_tokens.inc(count, backend=self.backend_name, type=field.replace("_tokens", ""))
+        span.set_attribute("gen_ai.usage.input_tokens", call_usage.total_input_tokens)
+        span.set_attribute("gen_ai.usage.output_tokens", call_usage.output_tokens)
+        tracer.end(span)
+        if usage is not None:
+            usage.add(call_usage)
+
     async def get_completion(
         self,
-        system_prompt: str,
+        system_prompt: SystemPrompt,
         user_message: str,
-        max_tokens: int = 300
+        max_tokens: int = 300,
+        usage: Optional[TokenUsage] = None
     ) -> str:
-        """Get a complete response from Claude"""
-        
+        """Get a complete response from Claude; token counts are added to `usage`"""
+
+        span = tracer.start_span("llm.complete", {"gen_ai.request.model": settings.DEFAULT_MODEL, "gen_ai.request.max_tokens": max_tokens})
+        call_usage = TokenUsage()
+        start = time.perf_counter()
+        outcome = "cancelled"
+
         try:
-            message = self.client.messages.create(
-                model=settings.DEFAULT_MODEL,
-                max_tokens=max_tokens,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_message}
-                ]
-            )
-            
-            return message.content[0].text
-            
+            text = await self.backend.complete(system_prompt, user_message, max_tokens, self.timeout, call_usage)
+            llm_generation_seconds.observe(time.perf_counter() - start, backend=self.backend_name, kind="complete")
+            outcome = "ok"
+            return text
+
         except Exception as e:
             print(f"Error getting completion from Claude: {e}")
+            outcome = e.__class__.__name__
+            span.record_error(e)
             raise
+        finally:
+            self._finish(span, "complete", outcome, call_usage, usage)
@@ -1,5 +1,13 @@
-from typing import List, Dict
-from app.models.entities import Persona
+from typing import List, Dict, Optional, Tuple
+import time
+from app.core.persona_registry import PersonaRecord, PersonaRegistry
+from app.services.metrics import metrics
+from app.services.persona_store import persona_store
+
+prompt_build_seconds = metrics.histogram(
+    "fg_prompt_build_seconds", "Time to render a persona system prompt",
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01)
+)
 
 class PersonaEngine:
     """Manages persona creation, retrieval, and prompt generation"""
@@ -227,34 +235,50 @@ Respond like a corporate executive in a board meeting."""
         }
     }
     
-    async def get_personas(self, persona_ids: List[str]) -> List[Persona]:
-        """Retrieve persona objects from database"""
-        # In production, this would query the database
-        # For now, return template data
+    def __init__(self, registry: Optional[PersonaRegistry] = None):
+        self.registry = registry or persona_registry
+    
+    async def get_personas(self, persona_ids: List[str]) -> List[PersonaRecord]:
+        """
+        Compiled personas for a debate, in the order asked (unknown ids are
+        skipped): templates from the registry, custom personas from the
+        store in one batched lookup
+        """
+        snapshot = self.registry.current
+        custom_ids = [pid for pid in persona_ids if pid not in snapshot.by_id]
+        custom = await persona_store.get_many(custom_ids) if custom_ids else {}
+        
         personas = []
         for pid in persona_ids:
-            # Mock persona object
-            template = self.PERSONA_TEMPLATES.get(pid, {})
-            if template:
-                personas.append(type('Persona', (), {
-                    'id': pid,
-                    'name': template['name'],
-                    'slug': pid,
-                    'category': template['category'],
-                    'description': template['description'],
-                    'speaking_style': template['speaking_style'],
-                    'system_prompt_template': template['system_prompt']
-                }))
+            record = snapshot.by_id.get(pid) or custom.get(pid)
+            if record is not None:
+                personas.append(record)
         return personas
     
     def build_prompt(
         self,
-        persona: Persona,
+        persona: PersonaRecord,
         question: str,
         context: str = ""
     ) -> str:
         """Generate the full system prompt for a persona"""
         
+        prefix, suffix = self.build_prompt_parts(persona, question, context)
+        return prefix + suffix
+    
+    def build_prompt_parts(
+        self,
+        persona: PersonaRecord,
+        question: str,
+        context: str = ""
+    ) -> Tuple[str, str]:
+        """
+        Split the system prompt into a static prefix (the persona template,
+        identical across waves and rebuttals) and a per-call suffix
+        (context and question)
+        """
+        
+        start = time.perf_counter()
         base_prompt = persona.system_prompt_template
         
         # Inject context if exists
@@ -262,7 +286,7 @@ Respond like a corporate executive in a board meeting."""
         if context:
             context_section = f"\n\n{context}\n"
         
-        full_prompt = f"""{base_prompt}
+        suffix = f"""
 
 {context_section}
 
@@ -276,15 +300,30 @@ Remember:
 - Show your unique perspective
 - Reference others' points if relevant"""
         
-        return full_prompt
+        prompt_build_seconds.observe(time.perf_counter() - start)
+        return base_prompt, suffix
+    
+    def build_system_blocks(
+        self,
+        persona: PersonaRecord,
+        question: str,
+        context: str = ""
+    ) -> List[Dict]:
+        """System prompt as content blocks, with a provider cache marker on the static prefix"""
+        
+        _, suffix = self.build_prompt_parts(persona, question, context)
+        # The prefix block is pre-rendered on the record
+        return [persona.prefix_block, {"type": "text", "text": suffix}]
     
     def get_all_template_ids(self) -> List[str]:
-        """Get list of all available persona template IDs"""
-        return list(self.PERSONA_TEMPLATES.keys())
+        """Get list of all available persona IDs"""
+        return self.registry.ids()
     
-    def get_templates_by_category(self, category: str) -> Dict:
+    def get_templates_by_category(self, category: str) -> Dict[str, PersonaRecord]:
         """Get personas filtered by category"""
-        return {
-            k: v for k, v in self.PERSONA_TEMPLATES.items() 
-            if v.get('category') == category
-        }
+        return {record.id: record for record in self.registry.by_category(category)}
+
+# Global registry instance (built-in templates, plus PERSONA_TEMPLATES_FILE)
+persona_registry = PersonaRegistry(PersonaEngine.PERSONA_TEMPLATES)
+
+metrics.gauge("fg_persona_registry_version", "Persona registry version being served", fn=lambda: persona_registry.version)
@@ -0,0 +1,213 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+from app.config import settings
+from app.services.metrics import metrics
+from app.utils.serialization import dumps
+
+# Always listed by /api/personas/categories, even when empty
+CATEGORIES = ("demographic", "professional", "personality")
+
+reloads_total = metrics.counter("fg_persona_reloads_total", "Persona registry reloads by outcome", ["outcome"])
+
+class PersonaRecord:
+    """
+    One compiled persona, immutable once built
+
+    Carries everything the hot path needs precomputed: the static prompt
+    prefix as a ready-made, provider-cached system block, a fingerprint of
+    the prompt (for cache keys, so editing a persona retires its cached
+    responses) and its list/detail JSON.
+    """
+    __slots__ = (
+        "id", "slug", "name", "category", "description", "speaking_style", "system_prompt_template",
+        "avatar_url", "is_premium", "is_custom", "fingerprint", "prefix_block", "summary", "detail_json", "etag"
+    )
+
+    def __init__(
+        self,
+        persona_id: str,
+        name: str,
+        category: str,
+        description: str,
+        speaking_style: str,
+        system_prompt: str,
+        avatar_url: Optional[str] = None,
+        is_premium: bool = False,
+        is_custom: bool = False
+    ):
+        set_ = object.__setattr__
+        set_(self, "id", persona_id)
+        set_(self, "slug", persona_id)
+        set_(self, "name", name)
+        set_(self, "category", category)
+        set_(self, "description", description)
+        set_(self, "speaking_style", speaking_style)
+        set_(self, "system_prompt_template", system_prompt)
+        set_(self, "avatar_url", avatar_url or f"/personas/{persona_id}.png")
+        set_(self, "is_premium", is_premium)
+        set_(self, "is_custom", is_custom)
+        set_(self, "fingerprint", f"{persona_id}:{hashlib.sha256(system_prompt.encode()).hexdigest()[:12]}")
+        # Shared by every call for this persona; never mutated
+        set_(self, "prefix_block", {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}})
+        summary = {
+            "id": persona_id,
+            "name": name,
+            "category": category,
+            "description": description,
+            "speaking_style": speaking_style,
+            "avatar_url": self.avatar_url,
+            "is_premium": is_premium
+        }
+        set_(self, "summary", summary)
+        set_(self, "detail_json", dumps({**summary, "system_prompt": system_prompt}))
+        set_(self, "etag", '"' + hashlib.sha256(self.detail_json).hexdigest()[:16] + '"')
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("PersonaRecord is immutable")
+
+    @classmethod
+    def from_template(cls, persona_id: str, template: Mapping[str, Any]) -> "PersonaRecord":
+        return cls(
+            persona_id,
+            template["name"],
+            template["category"],
+            template["description"],
+            template["speaking_style"],
+            template["system_prompt"],
+            avatar_url=template.get("avatar_url"),
+            is_premium=bool(template.get("is_premium", False))
+        )
+
+    @classmethod
+    def from_entity(cls, row) -> "PersonaRecord":
+        """A persona stored in the `personas` table (keyed by slug, like the templates)"""
+        return cls(
+            row.slug,
+            row.name,
+            row.category or "custom",
+            row.description or "",
+            row.speaking_style or "",
+            row.system_prompt_template or "",
+            avatar_url=row.avatar_url,
+            is_premium=bool(row.is_premium),
+            is_custom=bool(row.is_custom)
+        )
+
+class PersonaSnapshot:
+    """One version of the registry: records, indexes and pre-serialized listings"""
+    __slots__ = ("version", "etag", "by_id", "by_category", "list_json", "categories_json")
+
+    def __init__(self, version: int, records: Iterable[PersonaRecord]):
+        self.version = version
+        self.by_id: Dict[str, PersonaRecord] = {record.id: record for record in records}
+
+        by_category: Dict[str, List[PersonaRecord]] = {category: [] for category in CATEGORIES}
+        for record in self.by_id.values():
+            by_category.setdefault(record.category, []).append(record)
+        self.by_category: Dict[str, Tuple[PersonaRecord, ...]] = {k: tuple(v) for k, v in by_category.items()}
+
+        summaries = [record.summary for record in self.by_id.values()]
+        self.list_json = dumps({"personas": summaries, "total": len(summaries)})
+        self.categories_json = dumps({
+            category: [
+                {"id": r.id, "name": r.name, "description": r.description, "avatar_url": r.avatar_url}
+                for r in records
+            ]
+            for category, records in self.by_category.items()
+        })
+        # Same content -> same tag on every worker
+        digest = hashlib.sha256(self.list_json)
+        for record in self.by_id.values():
+            digest.update(record.detail_json)
+        self.etag = '"' + digest.hexdigest()[:16] + '"'
+
+class PersonaRegistry:
+    """
+    Every persona template, compiled once into an immutable snapshot
+
+    Lookups read the current snapshot; reload() compiles a new one and
+    swaps it in whole, so readers never see a half-built registry and a
+    debate keeps the records it started with. Templates come from the
+    built-in table, overlaid by PERSONA_TEMPLATES_FILE (JSON, same shape)
+    when set; start() polls that file and reloads when it changes.
+    """
+
+    def __init__(self, builtin: Mapping[str, Mapping[str, Any]], path: str = settings.PERSONA_TEMPLATES_FILE):
+        self.builtin = builtin
+        self.path = path
+        self._mtime: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        try:
+            records = self._compile()
+        except Exception as e:
+            print(f"Persona registry: ignoring {self.path}: {e}")
+            records = [PersonaRecord.from_template(persona_id, template) for persona_id, template in builtin.items()]
+        self.current = PersonaSnapshot(1, records)
+
+    @property
+    def version(self) -> int:
+        return self.current.version
+
+    def get(self, persona_id: str) -> Optional[PersonaRecord]:
+        return self.current.by_id.get(persona_id)
+
+    def ids(self) -> List[str]:
+        return list(self.current.by_id)
+
+    def by_category(self, category: str) -> Tuple[PersonaRecord, ...]:
+        return self.current.by_category.get(category, ())
+
+    def reload(self) -> bool:
+        """Recompile from the sources; on a bad template file, keep serving the current version"""
+        try:
+            records = self._compile()
+        except Exception as e:
+            print(f"Persona registry: reload failed, keeping version {self.version}: {e}")
+            reloads_total.inc(outcome="failed")
+            return False
+        self.current = PersonaSnapshot(self.version + 1, records)
+        reloads_total.inc(outcome="reloaded")
+        print(f"Persona registry: loaded version {self.version} ({len(self.current.by_id)} personas)")
+        return True
+
+    def start(self, interval: float = settings.PERSONA_RELOAD_INTERVAL_SECONDS):
+        if self.path and interval > 0:
+            self._task = asyncio.create_task(self._watch(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # Internals
+
+    def _compile(self) -> List[PersonaRecord]:
+        templates = dict(self.builtin)
+        if self.path:
+            self._mtime = self._file_mtime()
+            if self._mtime is not None:
+                with open(self.path) as f:
+                    overrides = json.load(f)
+                if not isinstance(overrides, dict):
+                    raise ValueError(f"{self.path} must hold an object of persona id -> template")
+                templates.update(overrides)
+        return [PersonaRecord.from_template(persona_id, template) for persona_id, template in templates.items()]
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            if self._file_mtime() != self._mtime:
+                self.reload()
@@ -0,0 +1,371 @@
+from typing import Dict, List, Sequence, Tuple
+from itertools import repeat
+import numpy as np
+from app.models.schemas import SentimentType
+
+def _translation_table() -> bytes:
+    table = bytearray(b" " * 256)
+    for c in b"abcdefghijklmnopqrstuvwxyz'\x00":
+        table[c] = c
+    for c in b"ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        table[c] = c + 32
+    for c in b".,;:!?":
+        table[c] = ord("|")
+    return bytes(table)
+
+# ASCII tokenization with one bytes.translate: letters (lowercased) and
+# apostrophes stay, clause punctuation becomes the "|" token, anything else
+# separates words. Much faster than a regex, which matters for batches.
+_TABLE = _translation_table()
+BREAK_TOKEN = b"|"
+
+# Texts in a batch are tokenized together, joined by a separator token
+_SEPARATOR = "\x00"
+
+# Sentiment words and their strength
+LEXICON: Dict[str, float] = {
+    # positive
+    "love": 2.0, "loved": 2.0, "loving": 1.5, "amazing": 2.0, "awesome": 2.0, "brilliant": 2.0,
+    "excellent": 2.0, "fantastic": 2.0, "perfect": 2.0, "incredible": 2.0, "great": 1.5, "best": 1.5,
+    "beautiful": 1.5, "excited": 1.5, "exciting": 1.5, "impressive": 1.5, "innovative": 1.5, "slaps": 1.5,
+    "good": 1.0, "better": 1.0, "nice": 1.0, "cool": 1.0, "fun": 1.0, "happy": 1.0, "glad": 1.0,
+    "enjoy": 1.0, "helpful": 1.0, "useful": 1.0, "valuable": 1.0, "worth": 1.0, "smart": 1.0,
+    "solid": 1.0, "strong": 1.0, "promising": 1.0, "recommend": 1.0, "benefit": 1.0, "benefits": 1.0,
+    "opportunity": 1.0, "win": 1.0, "trust": 1.0, "lit": 1.0, "convenient": 1.0, "fair": 0.5,
+    "interesting": 0.5, "support": 0.5, "agree": 0.5, "safe": 0.5, "easy": 0.5, "work": 0.5, "works": 0.5, "yes": 0.5,
+    # negative
+    "hate": -2.0, "terrible": -2.0, "awful": -2.0, "horrible": -2.0, "worst": -2.0, "disaster": -2.0,
+    "scam": -2.0, "useless": -2.0, "bad": -1.5, "worse": -1.5, "cringe": -1.5, "overpriced": -1.5,
+    "waste": -1.5, "annoying": -1.5, "frustrating": -1.5, "dangerous": -1.5, "unsafe": -1.5,
+    "scary": -1.5, "creepy": -1.5, "invasive": -1.5, "gimmick": -1.5, "mess": -1.5, "broken": -1.5,
+    "fail": -1.5, "fails": -1.5, "failure": -1.5, "harm": -1.5, "unfair": -1.5, "distrust": -1.5,
+    "wrong": -1.0, "problem": -1.0, "problems": -1.0, "poor": -1.0, "boring": -1.0, "confusing": -1.0,
+    "expensive": -1.0, "mid": -1.0, "sus": -1.0, "worried": -1.0, "concerned": -1.0, "concern": -1.0,
+    "concerns": -1.0, "doubt": -1.0, "skeptical": -1.0, "unnecessary": -1.0, "hurt": -1.0,
+    "issue": -0.5, "issues": -0.5, "risk": -0.5, "risks": -0.5, "risky": -1.0, "hype": -0.5,
+    "disagree": -0.5,
+}
+
+# Scale the sentiment word that follows
+INTENSIFIERS: Dict[str, float] = {
+    "extremely": 1.8, "incredibly": 1.8, "insanely": 1.8, "absolutely": 1.6, "very": 1.5,
+    "super": 1.5, "totally": 1.5, "highly": 1.5, "really": 1.4, "truly": 1.4, "so": 1.3,
+    "literally": 1.3, "pretty": 1.2, "quite": 1.2, "fairly": 0.8, "somewhat": 0.6, "kinda": 0.6,
+    "slightly": 0.5, "barely": 0.4,
+}
+
+# Flip the sentiment of the next few words, up to the end of the clause
+NEGATORS = frozenset([
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "cannot", "without", "hardly",
+    "don't", "doesn't", "didn't", "isn't", "aren't", "wasn't", "weren't", "won't", "wouldn't",
+    "can't", "couldn't", "shouldn't", "haven't", "hasn't", "ain't", "dont", "doesnt", "isnt", "cant",
+])
+
+# Lower / raise confidence; a negated booster ("not sure") counts as a hedge
+HEDGES = frozenset([
+    "maybe", "perhaps", "possibly", "might", "could", "probably", "guess", "unsure", "uncertain",
+    "somewhat", "seems", "seem", "suppose", "arguably", "likely", "unclear", "depends",
+])
+BOOSTERS = frozenset([
+    "definitely", "certainly", "absolutely", "clearly", "obviously", "surely", "sure", "always",
+    "undoubtedly", "confident", "guaranteed",
+])
+
+NEGATION_SCOPE = 3  # words after a negator that it applies to
+NEGATION_FACTOR = -0.75  # "not good" is milder than "bad"
+NEUTRAL_THRESHOLD = 0.75  # total sentiment below this is neutral
+MIXED_RATIO = 0.5  # weaker side at least this fraction of the stronger one...
+MIXED_MIN = 1.0  # ...and at least this strong
+HEDGE_PENALTY = 0.15
+BOOSTER_BONUS = 0.05
+MIN_CONFIDENCE = 0.3
+
+class SentimentScore:
+    """Sentiment and confidence of one text, with the evidence behind them"""
+    __slots__ = ("sentiment", "confidence", "positive", "negative", "hedges", "boosters")
+
+    def __init__(self, sentiment: SentimentType, confidence: float, positive: float, negative: float, hedges: int, boosters: int):
+        self.sentiment = sentiment
+        self.confidence = confidence
+        self.positive = positive
+        self.negative = negative
+        self.hedges = hedges
+        self.boosters = boosters
+
+    def __repr__(self) -> str:
+        return f"SentimentScore({self.sentiment.value}, confidence={self.confidence}, +{self.positive:.2f}/-{self.negative:.2f})"
+
+def tokenize(text: str) -> List[bytes]:
+    data = (" " + text + " ").replace("’", "'").encode("ascii", "ignore").translate(_TABLE)
+    # Split off punctuation and separators; drop quote marks around words
+    data = data.replace(b"|", b" | ").replace(b"\x00", b" \x00 ").replace(b" '", b" ").replace(b"' ", b" ")
+    return data.split()
+
+def classify(positive: float, negative: float) -> SentimentType:
+    if positive + negative < NEUTRAL_THRESHOLD:
+        return SentimentType.NEUTRAL
+    weaker, stronger = min(positive, negative), max(positive, negative)
+    if weaker >= MIXED_MIN and weaker >= MIXED_RATIO * stronger:
+        return SentimentType.MIXED
+    return SentimentType.POSITIVE if positive > negative else SentimentType.NEGATIVE
+
+def confidence(hedges: int, boosters: int) -> float:
+    return round(min(1.0, max(MIN_CONFIDENCE, 1.0 - HEDGE_PENALTY * hedges + BOOSTER_BONUS * boosters)), 2)
+
+class SentimentAccumulator:
+    """Running sentiment of a response that arrives in pieces"""
+
+    def feed(self, text: str):
+        raise NotImplementedError
+
+    def current(self) -> SentimentScore:
+        """Provisional score of everything fed so far"""
+        raise NotImplementedError
+
+    def finish(self) -> SentimentScore:
+        """Final score, equal to scoring the whole text at once"""
+        raise NotImplementedError
+
+class RescoringAccumulator(SentimentAccumulator):
+    """Fallback for scorers with no incremental form: keeps the text and rescores it"""
+
+    def __init__(self, scorer: "SentimentScorer"):
+        self.scorer = scorer
+        self._parts: List[str] = []
+
+    def feed(self, text: str):
+        self._parts.append(text)
+
+    def current(self) -> SentimentScore:
+        return self.scorer.score("".join(self._parts))
+
+    def finish(self) -> SentimentScore:
+        return self.current()
+
+class SentimentScorer:
+    """
+    Scores persona responses; swap in another implementation on the orchestrator
+
+    score() is for one text (the response path), score_batch() for many at
+    once (replays, analytics, benchmarks), and accumulator() for a response
+    that is still streaming in.
+    """
+
+    def score(self, text: str) -> SentimentScore:
+        raise NotImplementedError
+
+    def score_batch(self, texts: Sequence[str]) -> List[SentimentScore]:
+        return [self.score(text) for text in texts]
+
+    def accumulator(self) -> SentimentAccumulator:
+        return RescoringAccumulator(self)
+
+class LexiconScorer(SentimentScorer):
+    """
+    Weighted lexicon with negation, intensifiers and hedging
+
+    Each sentiment word counts with its lexicon weight, scaled by an
+    intensifier right before it ("really good") and flipped and damped
+    when a negator appears up to NEGATION_SCOPE words earlier in the same
+    clause ("not that good"). Strong evidence on both sides is MIXED.
+
+    score() is a single pass in plain Python (microseconds for a
+    response), shared with the streaming accumulator. score_batch() computes the same features for many texts
+    with NumPy: tokens of every text are laid out in one array, negation
+    scope and intensifiers become shifted running maxima, and per-text
+    sums are a bincount.
+    """
+
+    # Vocabulary ids: 0 is any other word, 1 is clause punctuation, 2 separates texts in a batch
+    UNKNOWN, BREAK, SEPARATOR = 0, 1, 2
+
+    def __init__(self):
+        words = sorted(set(LEXICON) | set(INTENSIFIERS) | NEGATORS | HEDGES | BOOSTERS)
+        self._ids: Dict[bytes, int] = {word.encode(): i + 3 for i, word in enumerate(words)}
+        self._ids[BREAK_TOKEN] = self.BREAK
+        self._ids[_SEPARATOR.encode()] = self.SEPARATOR
+
+        size = len(words) + 3
+        self._weight = np.zeros(size)
+        self._intensity = np.ones(size)
+        self._negator = np.zeros(size, dtype=bool)
+        self._hedge = np.zeros(size, dtype=bool)
+        self._booster = np.zeros(size, dtype=bool)
+        self._break = np.zeros(size, dtype=bool)
+        self._break[self.BREAK] = True
+        for word, i in self._ids.items():
+            if i in (self.BREAK, self.SEPARATOR):
+                continue
+            word = word.decode()
+            self._weight[i] = LEXICON.get(word, 0.0)
+            self._intensity[i] = INTENSIFIERS.get(word, 1.0)
+            self._negator[i] = word in NEGATORS
+            self._hedge[i] = word in HEDGES
+            self._booster[i] = word in BOOSTERS
+
+        # Scalar path: word -> (weight, intensity, is_negator, is_hedge, is_booster)
+        self._entries: Dict[bytes, Tuple[float, float, bool, bool, bool]] = {
+            word.encode(): (LEXICON.get(word, 0.0), INTENSIFIERS.get(word, 1.0), word in NEGATORS, word in HEDGES, word in BOOSTERS)
+            for word in words
+        }
+
+    def score(self, text: str) -> SentimentScore:
+        accumulator = LexiconAccumulator(self._entries)
+        accumulator.consume(tokenize(text))
+        return accumulator.current()
+
+    def accumulator(self) -> "LexiconAccumulator":
+        return LexiconAccumulator(self._entries)
+
+    def score_batch(self, texts: Sequence[str]) -> List[SentimentScore]:
+        if not texts:
+            return []
+
+        joined = _SEPARATOR.join(texts)
+        if joined.count(_SEPARATOR) != len(texts) - 1:
+            joined = _SEPARATOR.join(text.replace(_SEPARATOR, " ") for text in texts)
+        tokens = tokenize(joined)
+        ids = np.fromiter(map(self._ids.get, tokens, repeat(self.UNKNOWN)), dtype=np.int64, count=len(tokens))
+
+        # Drop the separators, remembering which text each token came from
+        separator = ids == self.SEPARATOR
+        text_of = np.cumsum(separator)[~separator]
+        ids = ids[~separator]
+        total = len(ids)
+
+        index = np.arange(total)
+        text_start = np.searchsorted(text_of, np.arange(len(texts)))[text_of]
+
+        # Most recent negator / clause break strictly before each token
+        last_negator = self._previous(np.where(self._negator[ids], index, -1))
+        last_break = np.maximum(self._previous(np.where(self._break[ids], index, -1)), text_start - 1)
+        negated = (last_negator > last_break) & (index - last_negator <= NEGATION_SCOPE)
+
+        # Intensity of the word before, within the same text and clause
+        intensity = np.ones(total)
+        if total:
+            intensity[1:] = self._intensity[ids[:-1]]
+        intensity[index == text_start] = 1.0
+
+        contribution = self._weight[ids] * intensity * np.where(negated, NEGATION_FACTOR, 1.0)
+        positive = np.bincount(text_of, weights=np.maximum(contribution, 0.0), minlength=len(texts))
+        negative = np.bincount(text_of, weights=np.maximum(-contribution, 0.0), minlength=len(texts))
+        booster = self._booster[ids]
+        hedges = np.bincount(text_of, weights=(self._hedge[ids] & ~negated) | (booster & negated), minlength=len(texts))
+        boosters = np.bincount(text_of, weights=booster & ~negated, minlength=len(texts))
+
+        # Classify and score confidence for every text at once
+        weaker, stronger = np.minimum(positive, negative), np.maximum(positive, negative)
+        labels = np.select(
+            [positive + negative < NEUTRAL_THRESHOLD, (weaker >= MIXED_MIN) & (weaker >= MIXED_RATIO * stronger), positive > negative],
+            [0, 1, 2],
+            default=3
+        )
+        confidences = np.round(np.clip(1.0 - HEDGE_PENALTY * hedges + BOOSTER_BONUS * boosters, MIN_CONFIDENCE, 1.0), 2)
+
+        kinds = (SentimentType.NEUTRAL, SentimentType.MIXED, SentimentType.POSITIVE, SentimentType.NEGATIVE)
+        return [
+            SentimentScore(kinds[label], conf, pos, neg, hedge, boost)
+            for label, conf, pos, neg, hedge, boost in zip(
+                labels.tolist(), confidences.tolist(), positive.tolist(), negative.tolist(),
+                hedges.astype(np.int64).tolist(), boosters.astype(np.int64).tolist()
+            )
+        ]
+
+    @staticmethod
+    def _previous(positions: np.ndarray) -> np.ndarray:
+        """For each index, the largest marked position before it (-1 if none)"""
+        running = np.maximum.accumulate(positions) if len(positions) else positions
+        return np.concatenate(([-1], running[:-1])) if len(running) else running
+
+# Characters that can continue a word (non-ASCII is dropped by the tokenizer, so it joins too)
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'")
+
+class LexiconAccumulator(SentimentAccumulator):
+    """
+    LexiconScorer's running counts for one streamed response
+
+    feed() tokenizes only the new text, so each delta costs O(delta). A
+    word that may continue in the next delta is held back until a space
+    or punctuation arrives; negation and intensifier state carries over
+    between deltas, so finish() equals scoring the full text in one go.
+    """
+    __slots__ = ("_entries", "positive", "negative", "hedges", "boosters", "_position", "_last_negator", "_last_break", "_intensity", "_tail")
+
+    def __init__(self, entries: Dict[bytes, Tuple[float, float, bool, bool, bool]]):
+        self._entries = entries
+        self.positive = self.negative = 0.0
+        self.hedges = self.boosters = 0
+        self._position = 0
+        self._last_negator = self._last_break = -1
+        self._intensity = 1.0
+        self._tail = ""
+
+    def feed(self, text: str):
+        data = self._tail + text
+        # Everything up to the last word boundary is settled
+        cut = len(data) - 1
+        while cut >= 0 and (data[cut] in _WORD_CHARS or data[cut] >= "\x80"):
+            cut -= 1
+        self._tail = data[cut + 1:]
+        if cut >= 0:
+            self.consume(tokenize(data[:cut + 1]))
+
+    def current(self) -> SentimentScore:
+        return SentimentScore(
+            classify(self.positive, self.negative), confidence(self.hedges, self.boosters),
+            self.positive, self.negative, self.hedges, self.boosters
+        )
+
+    def finish(self) -> SentimentScore:
+        if self._tail:
+            self.consume(tokenize(self._tail))
+            self._tail = ""
+        return self.current()
+
+    def consume(self, tokens: List[bytes]):
+        """Add already-tokenized text"""
+        entries = self._entries
+        positive, negative = self.positive, self.negative
+        hedges, boosters = self.hedges, self.boosters
+        last_negator, last_break = self._last_negator, self._last_break
+        intensity = self._intensity
+
+        for i, token in enumerate(tokens, self._position):
+            if token == BREAK_TOKEN:
+                last_break = i
+                intensity = 1.0
+                continue
+
+            entry = entries.get(token)
+            if entry is None:
+                intensity = 1.0
+                continue
+
+            weight, next_intensity, is_negator, is_hedge, is_booster = entry
+            negated = last_negator > last_break and i - last_negator <= NEGATION_SCOPE
+            if weight:
+                contribution = weight * intensity * (NEGATION_FACTOR if negated else 1.0)
+                if contribution > 0:
+                    positive += contribution
+                else:
+                    negative -= contribution
+            if is_hedge and not negated:
+                hedges += 1
+            if is_booster:
+                if negated:
+                    hedges += 1
+                else:
+                    boosters += 1
+            if is_negator:
+                last_negator = i
+            intensity = next_intensity
+
+        self._position += len(tokens)
+        self.positive, self.negative = positive, negative
+        self.hedges, self.boosters = hedges, boosters
+        self._last_negator, self._last_break = last_negator, last_break
+        self._intensity = intensity
+
+# Global scorer instance
+sentiment_scorer = LexiconScorer()
@@ -0,0 +1,201 @@
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+from app.config import settings
+from app.models.schemas import DebateSummary, SentimentBreakdown, SentimentType
+from app.services.metrics import metrics
+from app.services.tracing import tracer
+from app.utils.serialization import loads
+from app.utils.text import first_sentence
+
+# Runs one completion: (system prompt, user message, max tokens) -> text
+SummaryGenerator = Callable[[str, str, int], Awaitable[str]]
+
+summary_outcomes = metrics.counter(
+    "fg_summary_total", "Debate summaries by how the insights were produced",
+    ["outcome"]  # speculative | regenerated | direct | fallback
+)
+
+SUMMARY_SYSTEM_PROMPT = """You are the moderator of a focus group. Summarize the panel discussion you are given.
+
+Reply with a single JSON object and nothing else:
+{"summary": "2-3 sentence overview",
+ "key_insights": ["up to 3 short insights"],
+ "consensus_points": ["up to 3 points most panelists agreed on; empty if none"],
+ "most_controversial_take": "the single most divisive statement, quoted or closely paraphrased"}"""
+
+class SummaryEntry:
+    """One response as the summary sees it"""
+    __slots__ = ("persona_name", "text", "sentiment", "confidence", "is_rebuttal")
+
+    def __init__(self, persona_name: str, text: str, sentiment: Optional[SentimentType], confidence: float, is_rebuttal: bool):
+        self.persona_name = persona_name
+        self.text = text
+        self.sentiment = sentiment or SentimentType.NEUTRAL
+        self.confidence = confidence
+        self.is_rebuttal = is_rebuttal
+
+class SummaryBuilder:
+    """
+    Builds a debate's summary as its responses come in
+
+    The sentiment breakdown is kept per persona (their latest response
+    is their stance) and updated in O(1) per response, so it is ready
+    the moment the debate ends. The written parts (summary, insights,
+    consensus, controversial take) come from one LLM call, started by
+    speculate() before the final wave is done. When the debate finishes,
+    the speculative result is used if the late responses left every
+    persona's stance unchanged, and regenerated from the full transcript
+    otherwise. Without a usable LLM answer, the written parts are
+    derived from the responses themselves.
+    """
+
+    def __init__(self, session_id: str, question: str, generate: SummaryGenerator):
+        self.session_id = session_id
+        self.question = question
+        self.generate = generate
+        self.entries: List[SummaryEntry] = []
+        self.counts: Dict[SentimentType, int] = {sentiment: 0 for sentiment in SentimentType}
+        self._stances: Dict[str, SentimentType] = {}
+        # Speculative insights call, and the stances it was started with
+        self._speculation: Optional[asyncio.Task] = None
+        self._speculated_stances: Dict[str, SentimentType] = {}
+        self._result: Optional[DebateSummary] = None
+
+    def add(self, persona_id: str, persona_name: str, text: str, sentiment: Optional[SentimentType], confidence: float, is_rebuttal: bool = False):
+        entry = SummaryEntry(persona_name, text, sentiment, confidence or 0.0, is_rebuttal)
+        self.entries.append(entry)
+
+        previous = self._stances.get(persona_id)
+        if previous is not None:
+            self.counts[previous] -= 1
+        self._stances[persona_id] = entry.sentiment
+        self.counts[entry.sentiment] += 1
+
+    def breakdown(self) -> SentimentBreakdown:
+        return SentimentBreakdown(**{sentiment.value: count for sentiment, count in self.counts.items()})
+
+    def speculate(self):
+        """Start the insights call on the responses so far (once)"""
+        if self._speculation is not None or not self.entries or not settings.SUMMARY_SPECULATIVE:
+            return
+        self._speculated_stances = dict(self._stances)
+        self._speculation = asyncio.create_task(self._insights(list(self.entries)))
+
+    async def finish(self) -> DebateSummary:
+        """The final summary; cached, so later calls are free"""
+        if self._result is not None:
+            return self._result
+
+        with tracer.span("debate.summary", {"summary.responses": len(self.entries)}) as span:
+            insights, outcome = None, "fallback"
+            if self._speculation is not None:
+                speculative = await self._speculation
+                if speculative is not None and self._speculated_stances == self._stances:
+                    insights, outcome = speculative, "speculative"
+                elif self.entries:
+                    insights = await self._insights(self.entries)
+                    outcome = "regenerated" if insights is not None else "fallback"
+            elif self.entries:
+                insights = await self._insights(self.entries)
+                outcome = "direct" if insights is not None else "fallback"
+            span.set_attribute("summary.outcome", outcome)
+            summary_outcomes.inc(outcome=outcome)
+
+        self._result = self._build(insights or self._fallback())
+        return self._result
+
+    def cancel(self):
+        if self._speculation is not None and not self._speculation.done():
+            self._speculation.cancel()
+
+    # Internals
+
+    async def _insights(self, entries: List[SummaryEntry]) -> Optional[Dict]:
+        """One call for every written part of the summary; None if it fails or isn't usable"""
+        transcript = "\n\n".join(
+            f"{entry.persona_name}{' (rebuttal)' if entry.is_rebuttal else ''}: {entry.text}" for entry in entries
+        )
+        user_message = f"Question: {self.question}\n\nPanel discussion:\n\n{transcript}"
+        with tracer.span("debate.summary.insights", {"summary.responses": len(entries)}) as span:
+            try:
+                text = await self.generate(SUMMARY_SYSTEM_PROMPT, user_message, settings.SUMMARY_MAX_TOKENS)
+            except Exception as e:
+                print(f"Summary generation failed for {self.session_id}: {e}")
+                span.record_error(e)
+                return None
+            insights = _parse_insights(text)
+            span.set_attribute("summary.parsed", insights is not None)
+            return insights
+
+    def _fallback(self) -> Dict:
+        """Written parts derived from the responses, for when the LLM gives nothing usable"""
+        answers = [entry for entry in self.entries if not entry.is_rebuttal] or self.entries
+        if not answers:
+            return {"summary": "The panel did not respond.", "key_insights": [], "consensus_points": [], "most_controversial_take": ""}
+
+        total = sum(self.counts.values())
+        majority, majority_count = max(self.counts.items(), key=lambda item: item[1])
+        summary = f"{majority_count} of {total} panelists leaned {majority.value} on \"{self.question}\"."
+
+        consensus = []
+        if majority_count * 2 > total:
+            consensus.append(f"Most of the panel was {majority.value}.")
+
+        # Most confident voice per sentiment, strongest first
+        leaders: Dict[SentimentType, SummaryEntry] = {}
+        for entry in answers:
+            leader = leaders.get(entry.sentiment)
+            if leader is None or entry.confidence > leader.confidence:
+                leaders[entry.sentiment] = entry
+        insights = [
+            f"{entry.persona_name}: {first_sentence(entry.text)}"
+            for entry in sorted(leaders.values(), key=lambda e: e.confidence, reverse=True)[:3]
+        ]
+
+        # The most confident response against the majority, else the most negative one
+        dissent = [entry for entry in answers if entry.sentiment != majority]
+        if dissent:
+            controversial = max(dissent, key=lambda entry: entry.confidence)
+        else:
+            controversial = max(answers, key=lambda entry: (entry.sentiment == SentimentType.NEGATIVE, entry.confidence))
+
+        return {
+            "summary": summary,
+            "key_insights": insights,
+            "consensus_points": consensus,
+            "most_controversial_take": f"{controversial.persona_name}: {first_sentence(controversial.text)}"
+        }
+
+    def _build(self, insights: Dict) -> DebateSummary:
+        return DebateSummary(
+            session_id=self.session_id,
+            summary_text=insights["summary"],
+            sentiment_breakdown=self.breakdown(),
+            key_insights=insights["key_insights"],
+            consensus_points=insights["consensus_points"],
+            most_controversial_take=insights["most_controversial_take"],
+            share_url=f"/replay/{self.session_id}"
+        )
+
+def _parse_insights(text: str) -> Optional[Dict]:
+    """The JSON object in a model reply, checked and trimmed; None if there isn't a usable one"""
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        data = loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("summary"), str) or not data["summary"].strip():
+        return None
+
+    def strings(value) -> List[str]:
+        return [item.strip() for item in value if isinstance(item, str) and item.strip()][:3] if isinstance(value, list) else []
+
+    take = data.get("most_controversial_take")
+    return {
+        "summary": data["summary"].strip(),
+        "key_insights": strings(data.get("key_insights")),
+        "consensus_points": strings(data.get("consensus_points")),
+        "most_controversial_take": take.strip() if isinstance(take, str) else ""
+    }
@@ -1,13 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.routes import focus_groups, personas, replays, analytics
-from app.api.websocket.debate_stream import router as websocket_router
+from app.api.websocket.debate_stream import router as websocket_router, manager as debate_manager
 from app.config import settings
+from app.core.llm_client import close_http_client
+from app.core.persona_engine import persona_registry
+from app.services.broadcast import broadcast_hub
+from app.services.metrics import metrics, loop_lag_monitor
+from app.services.platform_stats import platform_stats
+from app.services.redis_client import close_redis
+from app.services.persona_store import persona_store
+from app.services.session_store import session_store
+from app.services.trending import trending_index
+from app.models.database import init_db, close_db
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup / shutdown hooks"""
+    try:
+        await init_db()
+    except Exception as e:
+        print(f"Database unavailable at startup: {e}")
+    await session_store.start()
+    await debate_manager.start()
+    loop_lag_monitor.start()
+    persona_registry.start()
+    persona_store.start()
+    trending_index.start()
+    platform_stats.start()
+    yield
+    await platform_stats.stop()
+    await trending_index.stop()
+    await persona_store.stop()
+    await persona_registry.stop()
+    await loop_lag_monitor.stop()
+    # Hand running debates to other workers, then flush pending session/transcript writes
+    await debate_manager.shutdown()
+    await broadcast_hub.close()
+    await session_store.stop()
+    await close_db()
+    # Release shared connection pools
+    await close_http_client()
+    await close_redis()
 
 app = FastAPI(
     title="Focus Group AI API",
     description="Synthetic Focus Group Debate Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS
@@ -37,3 +79,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (this worker's metrics)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,23 +1,134 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import text
 from app.config import settings
-from typing import Generator
+from typing import AsyncGenerator, Deque, Dict
+from collections import deque
+import time
+
+class PoolMetrics:
+    """Connection checkout wait times for the async engine's pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.failures = 0
+        self._recent_waits: Deque[float] = deque(maxlen=1000)
+
+    def record(self, wait_seconds: float, failed: bool = False):
+        self.checkouts += 1
+        self.failures += int(failed)
+        self._recent_waits.append(wait_seconds)
+
+    def stats(self) -> Dict:
+        waits = sorted(self._recent_waits)
+        pool = engine.pool
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2)
+
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "failures": self.failures,
+            "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+            "wait_ms_p95": pct(0.95),
+            "wait_ms_max": round(waits[-1] * 1000, 2) if waits else 0.0
+        }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record(time.perf_counter() - start, failed=True)
+            raise
+        pool_metrics.record(time.perf_counter() - start)
+        return connection
+
+def async_database_url(url: str) -> str:
+    """Point a plain postgresql:// URL at the asyncpg driver"""
+    for prefix in ("postgresql://", "postgres://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
 
 # Create engine
-engine = create_engine(
-    settings.DATABASE_URL,
+engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    poolclass=InstrumentedAsyncPool,
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    connect_args={
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    }
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Dependency for getting DB session
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+# Columns whose type changed since their table may have been created:
+# (table, column, old udt_name, ALTER to apply)
+COLUMN_MIGRATIONS = [
+    (
+        "focus_group_sessions", "selected_persona_ids", "_uuid",
+        "ALTER TABLE focus_group_sessions ALTER COLUMN selected_persona_ids "
+        "TYPE VARCHAR(100)[] USING selected_persona_ids::VARCHAR(100)[]"
+    ),
+    (
+        "persona_responses", "persona_id", "uuid",
+        "ALTER TABLE persona_responses DROP CONSTRAINT IF EXISTS persona_responses_persona_id_fkey, "
+        "ALTER COLUMN persona_id TYPE VARCHAR(100) USING persona_id::VARCHAR(100)"
+    ),
+]
+
+# Columns added since; safe to run every start
+ADDED_COLUMNS = [
+    "ALTER TABLE persona_responses ADD COLUMN IF NOT EXISTS persona_name VARCHAR(100)",
+    "ALTER TABLE persona_responses ADD COLUMN IF NOT EXISTS wave INTEGER",
+    "ALTER TABLE persona_responses ADD COLUMN IF NOT EXISTS is_rebuttal BOOLEAN DEFAULT false",
+]
+
+async def init_db():
+    """Create any missing tables and indexes, and migrate existing tables"""
+    from app.models.entities import Base
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that exist, so bring older ones up to date
+        if conn.dialect.name == "postgresql":
+            await _migrate(conn)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
+
+async def _migrate(conn):
+    for table, column, old_type, statement in COLUMN_MIGRATIONS:
+        current = await conn.scalar(
+            text("SELECT udt_name FROM information_schema.columns WHERE table_name = :table AND column_name = :column"),
+            {"table": table, "column": column}
+        )
+        if current == old_type:
+            print(f"Migrating {table}.{column} from {old_type}")
+            await conn.execute(text(statement))
+    for statement in ADDED_COLUMNS:
+        await conn.execute(text(statement))
+
+async def close_db():
+    """Dispose of pooled connections on shutdown"""
+    await engine.dispose()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ARRAY, JSON, Float, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ARRAY, JSON, Float, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -32,7 +32,7 @@ class FocusGroupSession(Base):
     session_key = Column(String(12), unique=True, nullable=False)
     user_id = Column(UUID(as_uuid=True))
     question = Column(Text, nullable=False)
-    selected_persona_ids = Column(ARRAY(UUID(as_uuid=True)), nullable=False)
+    selected_persona_ids = Column(ARRAY(String(100)), nullable=False)  # persona slugs
     status = Column(String(20))
     debate_mode = Column(String(20))
     
@@ -54,15 +54,27 @@ class FocusGroupSession(Base):
     
     created_at = Column(DateTime, server_default=func.now())
     completed_at = Column(DateTime)
+    
+    # Keyset pagination, newest first: (created_at, id), optionally behind a filter column
+    __table_args__ = (
+        Index("ix_sessions_created", "created_at", "id"),
+        Index("ix_sessions_public_created", "is_public", "created_at", "id"),
+        Index("ix_sessions_status_created", "status", "created_at", "id"),
+        Index("ix_sessions_user_created", "user_id", "created_at", "id"),
+        Index("ix_sessions_featured_created", "created_at", "id", postgresql_where=text("is_featured")),
+    )
 
 class PersonaResponse(Base):
     __tablename__ = "persona_responses"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey('focus_group_sessions.id', ondelete='CASCADE'))
-    persona_id = Column(UUID(as_uuid=True), ForeignKey('personas.id'))
+    persona_id = Column(String(100))  # persona slug; built-in templates have no personas row
+    persona_name = Column(String(100))
     response_text = Column(Text, nullable=False)
     response_order = Column(Integer)
+    wave = Column(Integer)
+    is_rebuttal = Column(Boolean, default=False)
     responding_to = Column(UUID(as_uuid=True))
     sentiment = Column(String(20))
     confidence_score = Column(Float)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Dict
 from datetime import datetime
 from enum import Enum
@@ -13,6 +13,7 @@ class DebateMode(str, Enum):
     SEQUENTIAL = "sequential"
     PARALLEL = "parallel"
     HYBRID = "hybrid"
+    ROUNDS = "rounds"
 
 class SessionStatus(str, Enum):
     PENDING = "pending"
@@ -38,6 +39,22 @@ class PersonaResponse(PersonaBase):
     usage_count: int
     created_at: datetime
 
+# Summary Schemas
+class SentimentBreakdown(BaseModel):
+    positive: int
+    negative: int
+    neutral: int
+    mixed: int
+
+class DebateSummary(BaseModel):
+    session_id: str
+    summary_text: str
+    sentiment_breakdown: SentimentBreakdown
+    key_insights: List[str]
+    consensus_points: List[str]
+    most_controversial_take: str
+    share_url: str
+
 # Focus Group Schemas
 class FocusGroupCreate(BaseModel):
     question: str = Field(..., min_length=10, max_length=500)
@@ -45,13 +62,25 @@ class FocusGroupCreate(BaseModel):
     mode: DebateMode = DebateMode.HYBRID
     is_public: bool = True
 
-class FocusGroupSession(BaseModel):
+class FocusGroupSessionPublic(BaseModel):
+    """A session as anyone may see it: without the session key"""
     id: str
-    session_key: str
     question: str
     selected_persona_ids: List[str]
     status: SessionStatus
+    is_public: bool = True
     created_at: datetime
+    user_id: Optional[str] = None  # owner, when created by a signed-in user
+    summary: Optional[DebateSummary] = None  # once completed
+
+class FocusGroupSession(FocusGroupSessionPublic):
+    session_key: str  # only ever returned to the session's creator
+
+class FocusGroupList(BaseModel):
+    sessions: List[FocusGroupSessionPublic]
+    next_cursor: Optional[str] = None
+    total: int
+    total_is_estimate: bool = False
 
 # Debate Response Schemas
 class DebateResponse(BaseModel):
@@ -64,6 +93,22 @@ class DebateResponse(BaseModel):
     confidence_score: Optional[float] = None
     is_rebuttal: bool = False
     is_complete: bool = False
+    time_to_first_token_ms: Optional[float] = None
+    stats: Optional[Dict] = None  # per-debate stats, set on the completion frame
+    summary: Optional[DebateSummary] = None  # set on the completion frame
+    timestamp: datetime
+
+class DebateDelta(BaseModel):
+    """Incremental token chunk of a persona response (streaming mode)"""
+    session_id: str
+    persona_id: str
+    persona_name: str
+    delta: str
+    wave: int = 1
+    # Provisional, from the text streamed so far; the final values come on the DebateResponse
+    sentiment: Optional[SentimentType] = None
+    confidence_score: Optional[float] = None
+    is_rebuttal: bool = False
     timestamp: datetime
 
 class PersonaResponseCreate(BaseModel):
@@ -73,26 +118,9 @@ class PersonaResponseCreate(BaseModel):
     sentiment: SentimentType
     confidence_score: float
 
-# Summary Schemas
-class SentimentBreakdown(BaseModel):
-    positive: int
-    negative: int
-    neutral: int
-    mixed: int
-
-class DebateSummary(BaseModel):
-    session_id: str
-    summary_text: str
-    sentiment_breakdown: SentimentBreakdown
-    key_insights: List[str]
-    consensus_points: List[str]
-    most_controversial_take: str
-    share_url: str
-
 # Analytics Schemas
 class TrendingQuestion(BaseModel):
     question: str
-    category: Optional[str]
     run_count: int
     trending_score: float
     last_run: datetime
@@ -103,8 +131,36 @@ class WSMessage(BaseModel):
     data: Optional[Dict] = None
     message: Optional[str] = None
 
+class DebateRounds(BaseModel):
+    """Settings for mode=rounds"""
+    count: int = Field(3, ge=1, le=10)
+    # Personas speaking in each round (cycled if shorter than count); default: everyone
+    persona_ids: Optional[List[List[str]]] = Field(None, min_items=1, max_items=10)
+    # Stop starting rounds once the debate has used this many tokens
+    max_tokens: Optional[int] = Field(None, gt=0)
+    # Stop once no persona's sentiment changed from their previous round
+    stop_on_convergence: bool = True
+
+    def check_personas(self, persona_ids: List[str]):
+        """ValueError unless every round has speakers, all of them in the debate"""
+        for round_no, speakers in enumerate(self.persona_ids or [], start=1):
+            if not speakers:
+                raise ValueError(f"Round {round_no} has no personas")
+            unknown = [pid for pid in speakers if pid not in persona_ids]
+            if unknown:
+                raise ValueError(f"Round {round_no} has personas not in the debate: {', '.join(unknown)}")
+
 class WSDebateStart(BaseModel):
     action: str = "start"
-    question: str
-    persona_ids: List[str]
-    mode: str = "hybrid"
+    question: str = Field(..., min_length=10, max_length=500)
+    persona_ids: List[str] = Field(..., min_items=2, max_items=6)
+    mode: DebateMode = DebateMode.HYBRID
+    stream: bool = False
+    rounds: Optional[DebateRounds] = None
+
+    @model_validator(mode="after")
+    def _rounds_use_the_debate_personas(self) -> "WSDebateStart":
+        # Caught here, before any round has been paid for
+        if self.rounds is not None:
+            self.rounds.check_personas(self.persona_ids)
+        return self
@@ -0,0 +1,440 @@
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from collections import deque
+import asyncio
+import time
+from fastapi import WebSocket
+from app.config import settings
+from app.services.metrics import metrics
+from app.services.redis_client import get_redis, WORKER_ID
+from app.utils.serialization import dumps, loads
+
+CHANNEL_PREFIX = "fg:debate:"
+# Sorted set of a session's resumable frames, scored by seq
+HISTORY_PREFIX = "fg:debate:history:"
+# Highest seq relayed for a session, so a worker taking it over numbers on from there
+SEQ_PREFIX = "fg:debate:seq:"
+
+# A queued frame and its encoded JSON (None once coalesced; re-encoded on send)
+QueuedFrame = Tuple[Dict, Optional[bytes]]
+
+send_seconds = metrics.histogram("fg_ws_send_seconds", "Time to write one WebSocket message (a frame or a batch)")
+frames_sent = metrics.counter("fg_ws_frames_sent_total", "Frames written to viewers")
+frames_dropped = metrics.counter("fg_ws_frames_dropped_total", "Deltas dropped for viewers that fell behind")
+slow_disconnects = metrics.counter("fg_ws_slow_disconnects_total", "Viewers disconnected for falling too far behind")
+relay_dropped = metrics.counter("fg_ws_relay_dropped_total", "Deltas not relayed to other workers because the relay fell behind")
+
+class Subscriber:
+    """
+    One viewer of a debate, with a bounded outbound queue
+
+    Publishing never waits on the socket: frames are queued here and a
+    sender task writes them out, so a slow client only ever delays itself.
+    Frames queued within a short window go out together as one "batch"
+    message, and pending deltas from the same persona are coalesced.
+    When the queue is full the overflow policy decides: "drop_deltas"
+    drops deltas (the persona's debate_response carries the full text
+    anyway) and only disconnects a viewer that can't keep up with complete
+    responses either; "disconnect" drops the viewer straight away.
+
+    A reconnecting viewer is primed with the frames it missed: live frames
+    are held back until the replay is queued, then de-duplicated by seq.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_frames: int = settings.WS_SUBSCRIBER_MAX_FRAMES,
+        overflow_policy: str = settings.WS_OVERFLOW_POLICY,
+        batch_window_ms: int = settings.WS_BATCH_WINDOW_MS,
+        max_batch: int = settings.WS_MAX_BATCH_FRAMES
+    ):
+        self.websocket = websocket
+        self.max_frames = max_frames
+        self.overflow_policy = overflow_policy
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.dropped = 0
+        self.closed = False
+        self.too_slow = False
+
+        self._frames: Deque[QueuedFrame] = deque()
+        self._ready = asyncio.Event()
+        # Live frames that arrive while missed ones are being fetched
+        self._held: Optional[List[QueuedFrame]] = None
+
+    def begin_replay(self):
+        self._held = []
+
+    def end_replay(self, missed: List[QueuedFrame], last_seq: int):
+        """Queue the frames after last_seq, then the live frames held meanwhile"""
+        held, self._held = self._held or [], None
+        for frame, encoded in missed + held:
+            seq = frame.get("seq")
+            if seq is not None:
+                if seq <= last_seq:
+                    continue
+                last_seq = seq
+            self.offer(frame, encoded)
+
+    def offer(self, frame: Dict, encoded: Optional[bytes] = None):
+        """Queue a frame without blocking"""
+        if self.closed:
+            return
+        if self._held is not None:
+            self._held.append((frame, encoded))
+            return
+
+        is_delta = frame["type"] == "debate_delta"
+        if is_delta and self._coalesce(frame):
+            return
+
+        if len(self._frames) >= self.max_frames:
+            if self.overflow_policy == "drop_deltas":
+                if is_delta:
+                    self.dropped += 1
+                    frames_dropped.inc()
+                    return
+                self._drop_deltas()
+            if len(self._frames) >= self.max_frames:
+                print(f"Disconnecting slow viewer ({len(self._frames)} frames behind)")
+                self.too_slow = True
+                slow_disconnects.inc()
+                self.close()
+                return
+
+        self._frames.append((frame, encoded))
+        self._ready.set()
+
+    def close(self):
+        """Stop sending; anything still queued is discarded"""
+        self.closed = True
+        self._frames.clear()
+        self._ready.set()
+
+    async def run(self):
+        """Send queued frames until closed or the socket goes away"""
+        try:
+            while not self.closed:
+                if not self._frames:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                # Give a burst of small frames a moment to pile up
+                if self.batch_window and len(self._frames) < self.max_batch:
+                    await asyncio.sleep(self.batch_window)
+                    if self.closed:
+                        break
+
+                count = min(len(self._frames), self.max_batch)
+                batch = [self._frames.popleft() for _ in range(count)]
+                start = time.perf_counter()
+                await self.websocket.send_text(self._encode(batch).decode())
+                send_seconds.observe(time.perf_counter() - start)
+                frames_sent.inc(count)
+        except Exception:
+            # Client went away mid-send; the receive loop cleans up
+            pass
+        finally:
+            self.closed = True
+
+        if self.too_slow:
+            try:
+                await self.websocket.close(code=1013)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _encode(batch: List[QueuedFrame]) -> bytes:
+        parts = [encoded if encoded is not None else dumps(frame) for frame, encoded in batch]
+        if len(parts) == 1:
+            return parts[0]
+        # Splice the already-encoded frames rather than re-serializing them
+        return b'{"type":"batch","frames":[' + b",".join(parts) + b"]}"
+
+    def _coalesce(self, frame: Dict) -> bool:
+        """Merge a delta into a pending delta for the same response"""
+        if not self._frames or self._frames[-1][0]["type"] != "debate_delta":
+            return False
+
+        last, new = self._frames[-1][0]["data"], frame["data"]
+        if (last["persona_id"], last["wave"], last["is_rebuttal"]) != (new["persona_id"], new["wave"], new["is_rebuttal"]):
+            return False
+
+        # Frames are shared between viewers, so build a new one; the newest
+        # provisional sentiment wins
+        merged = {**frame, "data": {**new, "delta": last["delta"] + new["delta"]}}
+        self._frames[-1] = (merged, None)
+        return True
+
+    def _drop_deltas(self):
+        kept = deque(f for f in self._frames if f[0]["type"] != "debate_delta")
+        self.dropped += len(self._frames) - len(kept)
+        frames_dropped.inc(len(self._frames) - len(kept))
+        self._frames = kept
+
+class BroadcastHub:
+    """
+    Fans debate frames out to every viewer of a session
+
+    A debate runs once, on the worker that started it, and publishes each
+    frame here. Local viewers get it straight away, and it's relayed over
+    Redis pub/sub so viewers connected to other workers get it too. The
+    relay runs in the background, pipelining whatever has queued up since
+    its last round trip, so publishing never waits on Redis. A worker only
+    listens on the channels of sessions it has viewers for.
+
+    Every frame is numbered with a per-session `seq`. All but deltas are
+    kept for a while (in a Redis sorted set by seq, and in memory on the
+    publishing worker), so viewers that drop can reconnect with the last
+    seq they saw and pick up where they left off, whichever worker they
+    land on. Deltas aren't kept: the persona's debate_response that
+    follows them carries the full text.
+    """
+
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._redis_down_until = 0.0
+
+        # Sessions published from this worker: first and next seq, and recent resumable frames
+        self._first_seq: Dict[str, int] = {}
+        self._next_seq: Dict[str, int] = {}
+        self._history: Dict[str, Deque[QueuedFrame]] = {}
+        self._expiry: Dict[str, asyncio.TimerHandle] = {}
+
+        # Frames waiting to be relayed: (session, seq, encoded, kept for resume)
+        self._outbox: List[Tuple[str, int, bytes, bool]] = []
+        self._outbox_ready: Optional[asyncio.Event] = None
+        self._relayer: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def viewer_count(self, session_id: str) -> int:
+        """Viewers of a session connected to this worker"""
+        return len(self._subscribers.get(session_id, ()))
+
+    async def subscribe(self, session_id: str, websocket: WebSocket, last_seq: Optional[int] = None) -> Subscriber:
+        """Add a viewer; with last_seq, frames after it are replayed first (-1 for all)"""
+        subscriber = Subscriber(websocket)
+        if last_seq is not None:
+            subscriber.begin_replay()
+
+        subscribers = self._subscribers.setdefault(session_id, set())
+        subscribers.add(subscriber)
+        if len(subscribers) == 1:
+            await self._redis_subscribe(session_id)
+
+        # Fetched after subscribing so nothing falls between history and live
+        if last_seq is not None:
+            subscriber.end_replay(await self._history_after(session_id, last_seq), last_seq)
+        return subscriber
+
+    async def unsubscribe(self, session_id: str, subscriber: Subscriber):
+        subscriber.close()
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[session_id]
+            await self._redis_unsubscribe(session_id)
+
+    async def publish(self, session_id: str, frame: Dict):
+        """Number a frame and send it to every viewer, on this worker and others"""
+        frame["seq"] = await self._take_seq(session_id)
+        # Encoded once, however many viewers and workers it goes to
+        encoded = dumps(frame)
+        resumable = frame["type"] != "debate_delta"
+        if resumable:
+            self._remember(session_id, frame, encoded)
+        self._deliver(session_id, frame, encoded)
+
+        if not self._redis_available():
+            return
+        if not resumable and len(self._outbox) >= settings.WS_RELAY_MAX_PENDING:
+            relay_dropped.inc()
+            return
+        self._outbox.append((session_id, frame["seq"], encoded, resumable))
+        if self._relayer is None or self._relayer.done():
+            self._outbox_ready = asyncio.Event()
+            self._relayer = asyncio.create_task(self._relay_loop())
+        self._outbox_ready.set()
+
+    def end(self, session_id: str):
+        """The debate stopped publishing here; forget its frames once they can't be resumed"""
+        handle = self._expiry.pop(session_id, None)
+        if handle is not None:
+            handle.cancel()
+        self._expiry[session_id] = asyncio.get_running_loop().call_later(
+            settings.WS_RESUME_TTL_SECONDS, self._forget, session_id
+        )
+
+    async def close(self):
+        """Relay what's still queued, then stop relaying to and from Redis on shutdown"""
+        if self._relayer is not None:
+            # Not cancelled: a pipeline cut off mid-flight would lose its frames
+            self._closing = True
+            self._outbox_ready.set()
+            await self._relayer
+            self._relayer = None
+            self._closing = False
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    async def _take_seq(self, session_id: str) -> int:
+        if session_id not in self._next_seq:
+            # First frame from this worker: continue numbering after any
+            # earlier run (e.g. on a worker that died). Its last frames may
+            # not have been relayed, so skip past as many as could be queued.
+            start = 0
+            if self._redis_available():
+                try:
+                    relayed = await get_redis().get(SEQ_PREFIX + session_id)
+                    if relayed is not None:
+                        start = int(relayed) + 1 + settings.WS_RELAY_MAX_PENDING
+                except Exception as e:
+                    self._mark_redis_down(e)
+            self._next_seq.setdefault(session_id, start)
+            self._first_seq.setdefault(session_id, start)
+
+        seq = self._next_seq[session_id]
+        self._next_seq[session_id] = seq + 1
+        return seq
+
+    def _remember(self, session_id: str, frame: Dict, encoded: bytes):
+        history = self._history.get(session_id)
+        if history is None:
+            history = self._history[session_id] = deque(maxlen=settings.WS_RESUME_BUFFER_FRAMES)
+        history.append((frame, encoded))
+
+        # Still publishing, so don't expire yet
+        handle = self._expiry.pop(session_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    def _forget(self, session_id: str):
+        self._expiry.pop(session_id, None)
+        self._history.pop(session_id, None)
+        self._next_seq.pop(session_id, None)
+        self._first_seq.pop(session_id, None)
+
+    async def _history_after(self, session_id: str, last_seq: int) -> List[QueuedFrame]:
+        # Published here: memory has this worker's frames, including any not
+        # relayed yet, so Redis is only read for frames from before it took over
+        history = self._history.get(session_id)
+        start = self._first_seq.get(session_id, 0)
+        earlier: List[QueuedFrame] = []
+        if (history is None or last_seq < start - 1) and self._redis_available():
+            try:
+                raw = await get_redis().zrangebyscore(
+                    HISTORY_PREFIX + session_id, f"({last_seq}", "+inf" if history is None else f"({start}"
+                )
+                earlier = [(loads(item), item.encode()) for item in raw]
+            except Exception as e:
+                self._mark_redis_down(e)
+        return earlier + [(frame, encoded) for frame, encoded in history or () if frame["seq"] > last_seq]
+
+    async def _relay_loop(self):
+        while not (self._closing and not self._outbox):
+            await self._outbox_ready.wait()
+            self._outbox_ready.clear()
+            await self._relay()
+
+    async def _relay(self):
+        """Send everything queued to Redis in one pipeline: history, high-water seq, then pub/sub"""
+        batch, self._outbox = self._outbox, []
+        if not batch or not self._redis_available():
+            return
+
+        ttl = settings.WS_RESUME_TTL_SECONDS
+        last_seq: Dict[str, int] = {}
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for session_id, seq, encoded, resumable in batch:
+                    # Stored before it's published, so a viewer subscribing
+                    # in between finds it in the history instead
+                    if resumable:
+                        pipe.zadd(HISTORY_PREFIX + session_id, {encoded: seq})
+                    # "<origin worker>\n<frame json>"
+                    pipe.publish(CHANNEL_PREFIX + session_id, WORKER_ID.encode() + b"\n" + encoded)
+                    last_seq[session_id] = seq
+                for session_id, seq in last_seq.items():
+                    pipe.zremrangebyrank(HISTORY_PREFIX + session_id, 0, -settings.WS_RESUME_BUFFER_FRAMES - 1)
+                    pipe.expire(HISTORY_PREFIX + session_id, ttl)
+                    pipe.set(SEQ_PREFIX + session_id, seq, ex=ttl)
+                await pipe.execute()
+        except Exception as e:
+            self._mark_redis_down(e)
+
+    def _deliver(self, session_id: str, frame: Dict, encoded: bytes):
+        for subscriber in list(self._subscribers.get(session_id, ())):
+            subscriber.offer(frame, encoded)
+
+    async def _redis_subscribe(self, session_id: str):
+        if not self._redis_available():
+            return
+        try:
+            if self._pubsub is None:
+                self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            await self._pubsub.subscribe(CHANNEL_PREFIX + session_id)
+        except Exception as e:
+            self._mark_redis_down(e)
+            return
+
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _redis_unsubscribe(self, session_id: str):
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(CHANNEL_PREFIX + session_id)
+        except Exception as e:
+            self._mark_redis_down(e)
+
+    async def _listen(self):
+        """Relay frames published by other workers to local viewers"""
+        while self._pubsub is not None:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._mark_redis_down(e)
+                await asyncio.sleep(1.0)
+                continue
+
+            if message is None or message["type"] != "message":
+                continue
+            origin, encoded = message["data"].split("\n", 1)
+            if origin == WORKER_ID:
+                continue
+            encoded = encoded.encode()
+            self._deliver(message["channel"][len(CHANNEL_PREFIX):], loads(encoded), encoded)
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception):
+        if self._redis_available():
+            print(f"Broadcast: Redis unavailable ({error}), viewers on other workers won't get frames")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+# Global hub instance
+broadcast_hub = BroadcastHub()
+
+metrics.gauge("fg_ws_viewers", "Viewers connected to this worker", fn=lambda: sum(len(v) for v in broadcast_hub._subscribers.values()))
@@ -0,0 +1,134 @@
+from typing import Dict, List, Set, Tuple
+import time
+from app.config import settings
+from app.services.redis_client import get_redis, WORKER_ID
+from app.utils.serialization import dumps, loads
+
+# Only touch the lease if this worker still holds it
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class DebateRegistry:
+    """
+    Which worker owns each running debate, leased in Redis
+
+    Starting a debate claims `fg:lease:<session>` (SET NX with a TTL) and
+    records how to re-run it in the `fg:debates:running` hash. The owner
+    renews its leases while the debate runs; if the worker dies the lease
+    expires, and any other worker can find the debate in the hash, claim
+    it and resume or fail it. Without Redis every claim succeeds and
+    debates are simply owned by the worker that started them.
+    """
+
+    LEASE_PREFIX = "fg:lease:"
+    RUNNING_KEY = "fg:debates:running"
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self, lease_ttl: float = settings.DEBATE_LEASE_TTL_SECONDS):
+        self.lease_ttl_ms = int(lease_ttl * 1000)
+        self._held: Set[str] = set()
+        self._redis_down_until = 0.0
+
+    async def claim(self, session_id: str, spec: Dict) -> bool:
+        """Take ownership of a debate; False if another worker holds it"""
+        if not self._redis_available():
+            return True
+        try:
+            redis = get_redis()
+            claimed = await redis.set(self.LEASE_PREFIX + session_id, WORKER_ID, nx=True, px=self.lease_ttl_ms)
+            if not claimed:
+                return False
+            await redis.hset(self.RUNNING_KEY, session_id, dumps(spec))
+        except Exception as e:
+            self._mark_redis_down(e)
+            return True
+
+        self._held.add(session_id)
+        return True
+
+    async def release(self, session_id: str):
+        """The debate finished (or failed) here; nobody needs to resume it"""
+        self._held.discard(session_id)
+        if not self._redis_available():
+            return
+        try:
+            redis = get_redis()
+            await redis.hdel(self.RUNNING_KEY, session_id)
+            await redis.eval(RELEASE_SCRIPT, 1, self.LEASE_PREFIX + session_id, WORKER_ID)
+        except Exception as e:
+            self._mark_redis_down(e)
+
+    async def abandon(self, session_id: str) -> bool:
+        """Give a debate up for another worker to resume right away; False if nobody can"""
+        self._held.discard(session_id)
+        if not self._redis_available():
+            return False
+        try:
+            await get_redis().eval(RELEASE_SCRIPT, 1, self.LEASE_PREFIX + session_id, WORKER_ID)
+            return True
+        except Exception as e:
+            self._mark_redis_down(e)
+            return False
+
+    async def renew(self) -> List[str]:
+        """Extend every lease held here; returns debates whose lease was lost"""
+        if not self._held or not self._redis_available():
+            return []
+
+        held = list(self._held)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for session_id in held:
+                    pipe.eval(RENEW_SCRIPT, 1, self.LEASE_PREFIX + session_id, WORKER_ID, self.lease_ttl_ms)
+                results = await pipe.execute()
+        except Exception as e:
+            self._mark_redis_down(e)
+            return []
+
+        lost = [session_id for session_id, ok in zip(held, results) if not ok]
+        self._held.difference_update(lost)
+        return lost
+
+    async def orphans(self) -> List[Tuple[str, Dict]]:
+        """Running debates whose owner's lease has expired"""
+        if not self._redis_available():
+            return []
+        try:
+            redis = get_redis()
+            running = await redis.hgetall(self.RUNNING_KEY)
+            if not running:
+                return []
+            async with redis.pipeline(transaction=False) as pipe:
+                for session_id in running:
+                    pipe.exists(self.LEASE_PREFIX + session_id)
+                leased = await pipe.execute()
+        except Exception as e:
+            self._mark_redis_down(e)
+            return []
+
+        return [
+            (session_id, loads(spec))
+            for (session_id, spec), exists in zip(running.items(), leased)
+            if not exists
+        ]
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception):
+        print(f"Debate registry: Redis unavailable ({error}), debates are owned locally")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+# Global registry instance
+debate_registry = DebateRegistry()
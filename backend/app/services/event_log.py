@@ -0,0 +1,240 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from bisect import bisect_right
+import asyncio
+import os
+import re
+import struct
+import time
+from app.config import settings
+from app.utils.serialization import dumps, loads
+
+# Session ids become file names
+SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Sparse seek index: (ms since debate start, byte offset of the first event at/after it)
+INDEX_RECORD = struct.Struct("<IQ")
+
+class SessionEventLog:
+    """
+    Append-only NDJSON event log of one debate
+
+    Each line is {"seq", "t" (ms since start), "type", "data"}. Lines are
+    buffered in memory and appended to `<id>.ndjson.part` off the event
+    loop; a sparse binary index `<id>.idx` maps time to byte offset so
+    replays can seek. Closing the log renames it to `<id>.ndjson`.
+    """
+
+    def __init__(self, session_id: str, directory: str):
+        self.session_id = session_id
+        self.part_path = os.path.join(directory, f"{session_id}.ndjson.part")
+        self.final_path = os.path.join(directory, f"{session_id}.ndjson")
+        self.index_path = os.path.join(directory, f"{session_id}.idx")
+
+        self._started = time.monotonic()
+        self._seq = 0
+        self._buffer: List[Tuple[int, bytes]] = []
+        self._offset = 0
+        self._next_index_ms = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def append(self, event_type: str, data: Dict) -> int:
+        """Buffer one event; returns its sequence number"""
+        t = int((time.monotonic() - self._started) * 1000)
+        line = dumps({"seq": self._seq, "t": t, "type": event_type, "data": data}) + b"\n"
+        self._buffer.append((t, line))
+        self._seq += 1
+
+        if len(self._buffer) >= settings.REPLAY_FLUSH_EVENTS:
+            self.schedule_flush()
+        return self._seq - 1
+
+    def schedule_flush(self):
+        """Flush in the background without blocking the caller"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write_sync, batch)
+
+    async def close(self):
+        """Flush everything and publish the log as complete"""
+        if self.closed:
+            return
+        self.closed = True
+        await self.flush()
+        await asyncio.to_thread(self._publish_sync)
+
+    def _resume_sync(self):
+        """Continue an existing .part log: drop a torn last line and rebuild the index"""
+        with open(self.part_path, "rb+") as log:
+            data = log.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                log.truncate(end)
+
+        index = bytearray()
+        offset, last_t = 0, 0
+        for line in data[:end].splitlines(keepends=True):
+            event = loads(line)
+            last_t = event["t"]
+            if last_t >= self._next_index_ms:
+                index += INDEX_RECORD.pack(last_t, offset)
+                self._next_index_ms = last_t + settings.REPLAY_INDEX_INTERVAL_MS
+            offset += len(line)
+            self._seq = event["seq"] + 1
+        with open(self.index_path, "wb") as idx:
+            idx.write(index)
+
+        self._offset = offset
+        # Carry on the timeline where the lost worker left off
+        self._started = time.monotonic() - last_t / 1000
+
+    def _publish_sync(self):
+        if not os.path.exists(self.part_path):
+            open(self.part_path, "ab").close()
+        os.replace(self.part_path, self.final_path)
+
+    def _write_sync(self, batch: List[Tuple[int, bytes]]):
+        index = bytearray()
+        with open(self.part_path, "ab") as log:
+            for t, line in batch:
+                if t >= self._next_index_ms:
+                    index += INDEX_RECORD.pack(t, self._offset)
+                    self._next_index_ms = t + settings.REPLAY_INDEX_INTERVAL_MS
+                log.write(line)
+                self._offset += len(line)
+        if index:
+            with open(self.index_path, "ab") as idx:
+                idx.write(index)
+
+class EventLogStore:
+    """Creates debate event logs and serves them back for replay"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, directory: str = settings.REPLAY_DIR):
+        self.directory = directory
+        # Completed logs are immutable, so popular replays are served from memory
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+
+    def open(self, session_id: str, resume: bool = False) -> SessionEventLog:
+        """
+        Start a fresh log for a debate run, or with resume=True append to
+        the unfinished log of a run taken over from another worker
+        """
+        if not SAFE_ID.match(session_id):
+            raise ValueError(f"Invalid session id for event log: {session_id!r}")
+        os.makedirs(self.directory, exist_ok=True)
+        log = SessionEventLog(session_id, self.directory)
+        if resume and os.path.exists(log.part_path):
+            try:
+                log._resume_sync()
+                return log
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Event log: can't resume {session_id} ({e}), starting over")
+                log = SessionEventLog(session_id, self.directory)
+        for path in (log.part_path, log.final_path, log.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._evict(session_id)
+        return log
+
+    def locate(self, session_id: str) -> Optional[Tuple[str, bool]]:
+        """Path of a session's log and whether the debate has finished"""
+        if not SAFE_ID.match(session_id):
+            return None
+        final_path = os.path.join(self.directory, f"{session_id}.ndjson")
+        if os.path.exists(final_path):
+            return final_path, True
+        part_path = final_path + ".part"
+        if os.path.exists(part_path):
+            return part_path, False
+        return None
+
+    def seek_offset(self, session_id: str, from_ms: int) -> int:
+        """Byte offset to start reading at for events at or after from_ms"""
+        if from_ms <= 0:
+            return 0
+        index_path = os.path.join(self.directory, f"{session_id}.idx")
+        try:
+            with open(index_path, "rb") as idx:
+                raw = idx.read()
+        except FileNotFoundError:
+            return 0
+
+        entries = [INDEX_RECORD.unpack_from(raw, i) for i in range(0, len(raw) - len(raw) % INDEX_RECORD.size, INDEX_RECORD.size)]
+        pos = bisect_right([t for t, _ in entries], from_ms) - 1
+        return entries[pos][1] if pos >= 0 else 0
+
+    async def load_complete(self, session_id: str, path: str, from_ms: int = 0) -> bytes:
+        """Completed log (from from_ms on), via the in-memory cache"""
+        data = await self._load_cached(session_id, path)
+        if from_ms <= 0:
+            return data
+
+        offset = self.seek_offset(session_id, from_ms)
+        return b"".join(
+            line + b"\n" for line in data[offset:].split(b"\n")
+            if line and event_time(line) >= from_ms
+        )
+
+    async def _load_cached(self, session_id: str, path: str) -> bytes:
+        data = self._cache.get(session_id)
+        if data is not None:
+            self._cache.move_to_end(session_id)
+            return data
+
+        data = await asyncio.to_thread(_read_file, path)
+        if len(data) <= settings.REPLAY_CACHE_MAX_BYTES // 4:
+            self._cache[session_id] = data
+            self._cache_bytes += len(data)
+            while self._cache_bytes > settings.REPLAY_CACHE_MAX_BYTES:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+        return data
+
+    async def iter_events(self, path: str, offset: int, from_ms: int) -> AsyncIterator[bytes]:
+        """Stream NDJSON lines from `offset`, skipping events before from_ms"""
+        position = offset
+        remainder = b""
+        while True:
+            chunk = await asyncio.to_thread(_read_chunk, path, position, self.CHUNK_SIZE)
+            if not chunk:
+                break
+            position += len(chunk)
+            lines = (remainder + chunk).split(b"\n")
+            remainder = lines.pop()
+            out = [line + b"\n" for line in lines if line and event_time(line) >= from_ms]
+            if out:
+                yield b"".join(out)
+
+    def _evict(self, session_id: str):
+        data = self._cache.pop(session_id, None)
+        if data is not None:
+            self._cache_bytes -= len(data)
+
+def event_time(line: bytes) -> int:
+    """Timestamp of an encoded event ("t" is always the second key, so skip the JSON parse)"""
+    start = line.index(b'"t":') + 4
+    end = line.index(b",", start)
+    return int(line[start:end])
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def _read_chunk(path: str, offset: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+# Global store instance
+event_log_store = EventLogStore()
@@ -0,0 +1,231 @@
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+from collections import OrderedDict, deque
+import asyncio
+import random
+import time
+import anthropic
+from app.config import settings
+from app.core.llm_client import SystemPrompt
+from app.services.metrics import metrics
+from app.services.tracing import tracer
+
+T = TypeVar("T")
+
+queue_wait_seconds = metrics.histogram("fg_llm_queue_wait_seconds", "Time an LLM call waited for a scheduler slot")
+retries_total = metrics.counter("fg_llm_retries_total", "LLM calls retried by the scheduler", ["error"])
+
+class LLMScheduler:
+    """
+    Process-wide admission control in front of ClaudeClient
+
+    - Caps in-flight requests and estimated tokens per minute
+    - Round-robins capacity across tenants (user, or session when anonymous)
+      so one busy tenant can't starve the others
+    - Retries 429/5xx/connection errors with Retry-After or exponential
+      backoff; a 429 also pauses dispatch for everyone until it expires
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = settings.LLM_MAX_IN_FLIGHT,
+        tokens_per_minute: int = settings.LLM_TOKENS_PER_MINUTE,
+        max_retries: int = settings.LLM_SCHEDULER_MAX_RETRIES,
+        backoff_base: float = settings.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max: float = settings.LLM_BACKOFF_MAX_SECONDS
+    ):
+        self.max_in_flight = max_in_flight
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # tenant -> waiting (future, tokens, enqueued_at); dict order is the RR ring
+        self._queues: "OrderedDict[str, Deque[Tuple[asyncio.Future, int, float]]]" = OrderedDict()
+        self._in_flight = 0
+
+        # Token bucket, refilled continuously at tokens_per_minute / 60
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        # Stats
+        self._recent_waits: Deque[float] = deque(maxlen=1000)
+        self._completed = 0
+        self._retries = 0
+        self._rate_limited = 0
+
+    @staticmethod
+    def estimate_tokens(system_prompt: SystemPrompt, user_message: str, max_tokens: int) -> int:
+        """Cheap upper-ish estimate of a call's token cost (~4 chars per token)"""
+        if isinstance(system_prompt, str):
+            system_chars = len(system_prompt)
+        else:
+            system_chars = sum(len(block.get("text", "")) for block in system_prompt)
+        return (system_chars + len(user_message)) // 4 + max_tokens
+
+    async def run(
+        self,
+        tenant: str,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0
+    ) -> T:
+        """Run `call` once a slot is free, retrying transient API errors"""
+        attempt = 0
+
+        while True:
+            await self._acquire(tenant, estimated_tokens)
+            try:
+                result = await call()
+                self._completed += 1
+                return result
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                print(f"LLM call failed ({e.__class__.__name__}), retrying in {delay:.2f}s")
+                retries_total.inc(error=e.__class__.__name__)
+            finally:
+                self._release()
+
+            attempt += 1
+            self._retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict:
+        """Queue depth, in-flight count and recent wait times"""
+        waits = sorted(self._recent_waits)
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 1)
+
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": sum(len(q) for q in self._queues.values()),
+            "queued_tenants": len(self._queues),
+            "tokens_available": int(self._refill()),
+            "tokens_per_minute": self.tokens_per_minute,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "wait_ms_p50": pct(0.50),
+            "wait_ms_p95": pct(0.95),
+            "completed": self._completed,
+            "retries": self._retries,
+            "rate_limited": self._rate_limited
+        }
+
+    async def _acquire(self, tenant: str, tokens: int):
+        """Queue under `tenant` until the dispatcher grants a slot"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        tokens = min(tokens, self.tokens_per_minute)
+
+        enqueued_at = time.monotonic()
+        self._queues.setdefault(tenant, deque()).append((future, tokens, enqueued_at))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before being cancelled: hand the slot back
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+        waited = time.monotonic() - enqueued_at
+        queue_wait_seconds.observe(waited)
+        span = tracer.current_span()
+        if span is not None:
+            span.add("llm.queue_wait_ms", round(waited * 1000, 1))
+
+    def _release(self):
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.tokens_per_minute),
+            self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0
+        )
+        self._refilled_at = now
+        return self._tokens
+
+    def _dispatch(self):
+        """Grant slots round-robin across tenants while capacity allows"""
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._schedule_wakeup(self._paused_until - now)
+            return
+
+        while self._queues and self._in_flight < self.max_in_flight:
+            tenant, queue = next(iter(self._queues.items()))
+
+            # Drop waiters whose callers went away
+            while queue and queue[0][0].done():
+                queue.popleft()
+            if not queue:
+                del self._queues[tenant]
+                continue
+
+            future, tokens, enqueued_at = queue[0]
+            available = self._refill()
+            if tokens > available:
+                needed = (tokens - available) * 60.0 / self.tokens_per_minute
+                self._schedule_wakeup(needed)
+                return
+
+            queue.popleft()
+            self._tokens -= tokens
+            self._in_flight += 1
+            self._recent_waits.append(now - enqueued_at)
+            future.set_result(None)
+
+            # Rotate this tenant to the back of the ring
+            del self._queues[tenant]
+            if queue:
+                self._queues[tenant] = queue
+
+    def _schedule_wakeup(self, delay: float):
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `error`, or None if it's not retryable"""
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        backoff = random.uniform(backoff / 2, backoff)
+
+        if isinstance(error, anthropic.RateLimitError):
+            self._rate_limited += 1
+            delay = self._retry_after(error) or backoff
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            return delay
+
+        if isinstance(error, anthropic.APIStatusError):
+            if error.status_code >= 500:
+                return self._retry_after(error) or backoff
+            return None
+
+        if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+            return backoff
+
+        return None
+
+    @staticmethod
+    def _retry_after(error: anthropic.APIStatusError) -> Optional[float]:
+        value = error.response.headers.get("retry-after")
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+# Global scheduler instance
+llm_scheduler = LLMScheduler()
+
+metrics.gauge("fg_llm_in_flight", "LLM calls currently running", fn=lambda: llm_scheduler._in_flight)
+metrics.gauge("fg_llm_queue_depth", "LLM calls waiting for a slot", fn=lambda: sum(len(q) for q in llm_scheduler._queues.values()))
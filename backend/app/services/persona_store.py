@@ -0,0 +1,178 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import Counter, OrderedDict
+import asyncio
+import time
+from sqlalchemy import bindparam, select, update
+from app.config import settings
+from app.core.persona_registry import PersonaRecord
+from app.models import entities
+from app.models.database import SessionLocal
+from app.models.schemas import PersonaCreate
+from app.services.metrics import metrics
+
+cache_lookups = metrics.counter("fg_persona_cache_lookups_total", "Custom persona lookups by result", ["result"])
+
+class PersonaStore:
+    """
+    User-created personas, stored in the `personas` table
+
+    Lookups go through a read-through LRU/TTL cache of compiled records;
+    the slugs a debate is missing are fetched together in one query.
+    Slugs that don't exist are remembered briefly too, so a bad id can't
+    turn into a query per request. Edits through this store invalidate
+    the entry here; other workers pick them up when it expires.
+
+    usage_count is counted in memory and flushed periodically as one
+    batched UPDATE per flush, rather than a row write per debate.
+    """
+
+    NEGATIVE_TTL_SECONDS = 5
+
+    def __init__(self):
+        # slug -> (expires at, record or None for "doesn't exist")
+        self._cache: "OrderedDict[str, Tuple[float, Optional[PersonaRecord]]]" = OrderedDict()
+        self._usage: Counter = Counter()
+        self._flusher: Optional[asyncio.Task] = None
+
+    # Lifecycle
+
+    def start(self):
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush_usage()
+
+    # Reads
+
+    async def get_many(self, slugs: Iterable[str]) -> Dict[str, PersonaRecord]:
+        """Custom personas by slug; one query for whatever isn't cached"""
+        found: Dict[str, PersonaRecord] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+
+        for slug in dict.fromkeys(slugs):
+            entry = self._cache.get(slug)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(slug)
+                cache_lookups.inc(result="hit")
+                if entry[1] is not None:
+                    found[slug] = entry[1]
+            else:
+                cache_lookups.inc(result="miss")
+                missing.append(slug)
+
+        if missing:
+            try:
+                loaded = await self._load(missing)
+            except Exception as e:
+                # Don't remember anything; the next lookup retries
+                print(f"Persona store: failed to load {missing}: {e}")
+                return found
+            for slug in missing:
+                record = loaded.get(slug)
+                self._remember(slug, record)
+                if record is not None:
+                    found[slug] = record
+
+        return found
+
+    async def get(self, slug: str) -> Optional[PersonaRecord]:
+        return (await self.get_many([slug])).get(slug)
+
+    # Writes
+
+    async def create(self, data: PersonaCreate, created_by: Optional[str] = None) -> PersonaRecord:
+        row = entities.Persona(
+            name=data.name,
+            slug=data.slug,
+            category=data.category,
+            description=data.description,
+            avatar_url=data.avatar_url,
+            speaking_style=data.speaking_style,
+            system_prompt_template=data.system_prompt_template,
+            is_premium=data.is_premium,
+            is_custom=True,
+            created_by=created_by,
+            usage_count=0
+        )
+        async with SessionLocal() as db:
+            db.add(row)
+            await db.commit()
+        record = PersonaRecord.from_entity(row)
+        self._remember(data.slug, record)
+        return record
+
+    async def update(self, slug: str, data: PersonaCreate) -> Optional[PersonaRecord]:
+        """Replace a custom persona's fields (its slug stays); None if there isn't one"""
+        async with SessionLocal() as db:
+            row = await db.scalar(
+                select(entities.Persona).where(entities.Persona.slug == slug, entities.Persona.is_custom.is_(True))
+            )
+            if row is None:
+                return None
+            for field in ("name", "category", "description", "avatar_url", "speaking_style", "system_prompt_template", "is_premium"):
+                setattr(row, field, getattr(data, field))
+            await db.commit()
+            record = PersonaRecord.from_entity(row)
+        self.invalidate(slug)
+        return record
+
+    def invalidate(self, slug: str):
+        self._cache.pop(slug, None)
+
+    def record_usage(self, records: Iterable[PersonaRecord]):
+        """Count a debate's use of its custom personas (flushed in batches)"""
+        for record in records:
+            if record.is_custom:
+                self._usage[record.slug] += 1
+
+    async def flush_usage(self):
+        """Apply pending usage_count increments in one statement"""
+        if not self._usage:
+            return
+
+        pending, self._usage = self._usage, Counter()
+        table = entities.Persona.__table__
+        try:
+            async with SessionLocal() as db:
+                await db.execute(
+                    update(table)
+                    .where(table.c.slug == bindparam("b_slug"))
+                    .values(usage_count=table.c.usage_count + bindparam("b_count")),
+                    [{"b_slug": slug, "b_count": count} for slug, count in pending.items()]
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"Persona store: usage flush of {len(pending)} personas failed ({e}), will retry")
+            self._usage.update(pending)
+
+    # Internals
+
+    def _remember(self, slug: str, record: Optional[PersonaRecord]):
+        ttl = settings.PERSONA_CACHE_TTL_SECONDS if record is not None else self.NEGATIVE_TTL_SECONDS
+        self._cache[slug] = (time.monotonic() + ttl, record)
+        self._cache.move_to_end(slug)
+        while len(self._cache) > settings.PERSONA_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def _load(self, slugs: List[str]) -> Dict[str, PersonaRecord]:
+        async with SessionLocal() as db:
+            rows = await db.scalars(
+                select(entities.Persona).where(entities.Persona.slug.in_(slugs), entities.Persona.is_custom.is_(True))
+            )
+            return {row.slug: PersonaRecord.from_entity(row) for row in rows}
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(settings.PERSONA_USAGE_FLUSH_SECONDS)
+            await self.flush_usage()
+
+# Global store instance
+persona_store = PersonaStore()
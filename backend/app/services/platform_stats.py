@@ -0,0 +1,299 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections import Counter
+from datetime import datetime
+import asyncio
+import time
+from sqlalchemy import func, select
+from app.config import settings
+from app.models import entities
+from app.models.database import SessionLocal
+from app.models.schemas import SessionStatus
+from app.services.metrics import metrics
+from app.services.redis_client import get_redis
+
+reconciliations_total = metrics.counter("fg_stats_reconciliations_total", "Stats reconciliations against the DB by outcome", ["outcome"])
+
+# Space-Saving top-K: a new item beyond capacity replaces the current
+# minimum and inherits its count (an overestimate bounded by that count)
+# KEYS[1] = sorted set; ARGV = capacity, then item, count pairs
+SPACE_SAVING_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+for i = 2, #ARGV, 2 do
+    local item, count = ARGV[i], tonumber(ARGV[i + 1])
+    if redis.call('zscore', KEYS[1], item) or redis.call('zcard', KEYS[1]) < capacity then
+        redis.call('zincrby', KEYS[1], count, item)
+    else
+        local smallest = redis.call('zrange', KEYS[1], 0, 0, 'WITHSCORES')
+        redis.call('zrem', KEYS[1], smallest[1])
+        redis.call('zadd', KEYS[1], tonumber(smallest[2]) + count, item)
+    end
+end
+return 0
+"""
+
+# Raise a counter to at least ARGV[1] (keeping its TTL, or setting ARGV[2] seconds on a new key)
+RAISE_SCRIPT = """
+local current = tonumber(redis.call('get', KEYS[1]) or '0')
+local floor = tonumber(ARGV[1])
+if current < floor then
+    if redis.call('exists', KEYS[1]) == 1 or tonumber(ARGV[2]) == 0 then
+        redis.call('set', KEYS[1], floor, 'KEEPTTL')
+    else
+        redis.call('set', KEYS[1], floor, 'EX', ARGV[2])
+    end
+end
+return 0
+"""
+
+def _day(ts: float) -> str:
+    return datetime.utcfromtimestamp(ts).strftime("%Y%m%d")
+
+def _hour(ts: float) -> str:
+    return datetime.utcfromtimestamp(ts).strftime("%Y%m%d%H")
+
+class PlatformStats:
+    """
+    Platform-wide stats kept as counters and sketches, not computed per request
+
+    Every debate start is counted in memory and flushed to Redis every
+    STATS_FLUSH_SECONDS: a total, a counter per UTC day and per hour (the
+    last 24 hourly buckets give a rolling day), a HyperLogLog of the
+    clients that started debates, and a Space-Saving top-K sketch of the
+    personas they picked. Each flush reads them back into a snapshot that
+    /stats returns as-is.
+
+    Once per STATS_RECONCILE_SECONDS one worker recounts from the DB and
+    raises any counter that fell behind it (e.g. after losing Redis data);
+    counters are never lowered, since the DB is written behind. Without
+    Redis, each worker serves the last snapshot plus what it has counted
+    since.
+    """
+
+    PREFIX = "fg:stats:"
+    RECONCILE_LOCK_KEY = "fg:stats:reconcile"
+    HOUR_TTL_SECONDS = 26 * 3600
+    DAY_TTL_SECONDS = 8 * 86400
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self):
+        self.sketch_size = settings.STATS_PERSONA_SKETCH_SIZE
+
+        # Counted here, not yet in Redis
+        self._pending_hours: Counter = Counter()
+        self._pending_personas: Counter = Counter()
+        self._pending_users: Set[str] = set()
+
+        # Last values read from Redis (or the DB)
+        self._base = {"total_debates": 0, "total_users": 0, "debates_today": 0, "debates_last_24h": 0}
+        self._base_day = _day(time.time())
+        self._base_personas: List[Tuple[str, int]] = []
+
+        self._snapshot: Dict = {}
+        self._task: Optional[asyncio.Task] = None
+        self._redis_down_until = 0.0
+        self._refresh_local()
+
+    # Lifecycle
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    # Hot path
+
+    def record_debate(self, persona_ids: Iterable[str], client: Optional[str] = None):
+        """Count a debate starting (O(personas))"""
+        self._pending_hours[_hour(time.time())] += 1
+        self._pending_personas.update(set(persona_ids))
+        if client and len(self._pending_users) < settings.STATS_MAX_PENDING_USERS:
+            self._pending_users.add(client)
+
+    def snapshot(self) -> Dict:
+        return self._snapshot
+
+    # Flushing
+
+    async def flush(self):
+        """Push pending counts to Redis and refresh the snapshot"""
+        if self._redis_available():
+            try:
+                await self._write()
+                await self._read()
+            except Exception as e:
+                self._mark_redis_down(e)
+        self._refresh_local()
+
+    async def reconcile(self):
+        """Recount from the DB (one worker at a time) and raise counters that are behind"""
+        if self._redis_available():
+            try:
+                if not await get_redis().set(self.RECONCILE_LOCK_KEY, "1", nx=True, ex=max(int(settings.STATS_RECONCILE_SECONDS), 1)):
+                    return
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        now = time.time()
+        midnight = datetime.utcfromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        sessions = entities.FocusGroupSession
+        started = sessions.status != SessionStatus.PENDING.value
+        try:
+            async with SessionLocal() as db:
+                total = await db.scalar(select(func.count()).select_from(sessions).where(started))
+                today = await db.scalar(select(func.count()).select_from(sessions).where(started, sessions.created_at >= midnight))
+                personas = []
+                # Persona picks are counted by unnesting the ARRAY column, which only PostgreSQL has
+                if db.bind.dialect.name == "postgresql":
+                    persona = func.unnest(sessions.selected_persona_ids).label("persona")
+                    picks = select(persona).where(started).subquery()
+                    personas = (await db.execute(
+                        select(picks.c.persona, func.count())
+                        .group_by(picks.c.persona)
+                        .order_by(func.count().desc())
+                        .limit(self.sketch_size)
+                    )).all()
+        except Exception as e:
+            print(f"Stats: reconciliation skipped, DB unavailable: {e}")
+            reconciliations_total.inc(outcome="failed")
+            return
+
+        if self._redis_available():
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    pipe.eval(RAISE_SCRIPT, 1, self.PREFIX + "debates", total or 0, 0)
+                    pipe.eval(RAISE_SCRIPT, 1, self.PREFIX + "debates:d:" + _day(now), today or 0, self.DAY_TTL_SECONDS)
+                    if personas:
+                        pipe.zadd(self.PREFIX + "personas", {persona_id: count for persona_id, count in personas}, gt=True)
+                        pipe.zremrangebyrank(self.PREFIX + "personas", 0, -(self.sketch_size + 1))
+                    await pipe.execute()
+                reconciliations_total.inc(outcome="redis")
+                await self.flush()
+                return
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        # Only this worker's view to correct. Fold pending counts in first,
+        # since the DB already has most of them.
+        self._refresh_local()
+        self._base.update({key: self._snapshot[key] for key in self._base})
+        self._base_personas = (Counter(dict(self._base_personas)) + self._pending_personas).most_common(self.sketch_size)
+        self._pending_hours.clear()
+        self._pending_personas.clear()
+        self._pending_users.clear()
+        self._base["total_debates"] = max(self._base["total_debates"], total or 0)
+        self._base["debates_today"] = max(self._base["debates_today"], today or 0)
+        merged = dict(self._base_personas)
+        for persona_id, count in personas:
+            merged[persona_id] = max(merged.get(persona_id, 0), count)
+        self._base_personas = sorted(merged.items(), key=lambda item: item[1], reverse=True)[:self.sketch_size]
+        reconciliations_total.inc(outcome="local")
+        self._refresh_local()
+
+    # Internals
+
+    async def _write(self):
+        if not (self._pending_hours or self._pending_personas or self._pending_users):
+            return
+
+        hours, self._pending_hours = self._pending_hours, Counter()
+        personas, self._pending_personas = self._pending_personas, Counter()
+        users, self._pending_users = self._pending_users, set()
+        days: Counter = Counter()
+        for hour, count in hours.items():
+            days[hour[:8]] += count
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                if hours:
+                    pipe.incrby(self.PREFIX + "debates", sum(hours.values()))
+                for hour, count in hours.items():
+                    pipe.incrby(self.PREFIX + "debates:h:" + hour, count)
+                    pipe.expire(self.PREFIX + "debates:h:" + hour, self.HOUR_TTL_SECONDS)
+                for day, count in days.items():
+                    pipe.incrby(self.PREFIX + "debates:d:" + day, count)
+                    pipe.expire(self.PREFIX + "debates:d:" + day, self.DAY_TTL_SECONDS)
+                if users:
+                    pipe.pfadd(self.PREFIX + "users", *users)
+                if personas:
+                    args = [self.sketch_size]
+                    for persona_id, count in personas.items():
+                        args += [persona_id, count]
+                    pipe.eval(SPACE_SAVING_SCRIPT, 1, self.PREFIX + "personas", *args)
+                await pipe.execute()
+        except Exception:
+            # Keep them for the next flush
+            self._pending_hours.update(hours)
+            self._pending_personas.update(personas)
+            self._pending_users.update(users)
+            raise
+
+    async def _read(self):
+        now = time.time()
+        hour_keys = [self.PREFIX + "debates:h:" + _hour(now - 3600 * i) for i in range(24)]
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.get(self.PREFIX + "debates")
+            pipe.get(self.PREFIX + "debates:d:" + _day(now))
+            pipe.mget(hour_keys)
+            pipe.pfcount(self.PREFIX + "users")
+            pipe.zrevrange(self.PREFIX + "personas", 0, 4, withscores=True)
+            total, today, hourly, users, personas = await pipe.execute()
+
+        self._base = {
+            "total_debates": int(total or 0),
+            "total_users": int(users or 0),
+            "debates_today": int(today or 0),
+            "debates_last_24h": sum(int(count or 0) for count in hourly)
+        }
+        self._base_day = _day(now)
+        self._base_personas = [(persona_id, int(count)) for persona_id, count in personas]
+
+    def _roll_day(self, now: float):
+        if self._base_day != _day(now):
+            self._base_day = _day(now)
+            self._base["debates_today"] = 0
+
+    def _refresh_local(self):
+        """Snapshot = last values read + whatever is still pending here"""
+        now = time.time()
+        self._roll_day(now)
+        today, recent = _day(now), {_hour(now - 3600 * i) for i in range(24)}
+
+        personas = Counter(dict(self._base_personas))
+        personas.update(self._pending_personas)
+        popular = personas.most_common(5)
+
+        self._snapshot = {
+            "total_debates": self._base["total_debates"] + sum(self._pending_hours.values()),
+            "total_users": self._base["total_users"] + len(self._pending_users),
+            "debates_today": self._base["debates_today"] + sum(c for h, c in self._pending_hours.items() if h.startswith(today)),
+            "debates_last_24h": self._base["debates_last_24h"] + sum(c for h, c in self._pending_hours.items() if h in recent),
+            "most_popular_persona": popular[0][0] if popular else None,
+            "popular_personas": [{"persona_id": persona_id, "debates": count} for persona_id, count in popular]
+        }
+
+    async def _run(self):
+        await self.reconcile()
+        last_reconcile = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.STATS_FLUSH_SECONDS)
+            await self.flush()
+            if time.monotonic() - last_reconcile >= settings.STATS_RECONCILE_SECONDS:
+                last_reconcile = time.monotonic()
+                await self.reconcile()
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception):
+        print(f"Stats: Redis unavailable ({error}), serving this worker's counts")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+# Global stats instance
+platform_stats = PlatformStats()
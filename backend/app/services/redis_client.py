@@ -0,0 +1,33 @@
+from typing import Optional
+import os
+import socket
+import uuid
+import redis.asyncio as aioredis
+from app.config import settings
+
+# Identifies this process in messages and keys shared with other workers
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+# One connection pool per process, shared by every Redis-backed service
+_redis: Optional[aioredis.Redis] = None
+
+def get_redis() -> aioredis.Redis:
+    """Get (or lazily create) the process-wide async Redis client"""
+    global _redis
+
+    if _redis is None:
+        _redis = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+    return _redis
+
+async def close_redis():
+    """Close the shared Redis pool on shutdown"""
+    global _redis
+
+    if _redis is not None:
+        await _redis.aclose()
+    _redis = None
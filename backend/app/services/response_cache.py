@@ -0,0 +1,176 @@
+from typing import Deque, Dict, FrozenSet, Optional, Tuple
+from collections import OrderedDict, deque
+import hashlib
+import time
+from app.config import settings
+from app.services.redis_client import get_redis
+from app.utils.serialization import dumps, loads
+from app.utils.text import normalize_question, trigrams, jaccard
+
+class CacheKey:
+    """Exact key plus the pieces needed for similarity lookups"""
+    __slots__ = ("digest", "bucket", "question", "question_grams")
+
+    def __init__(self, digest: str, bucket: str, question: str):
+        self.digest = digest
+        self.bucket = bucket
+        self.question = question
+        self.question_grams = trigrams(question)
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    async def get(self, digest: str) -> Optional[Dict]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[digest]
+            return None
+
+        self._entries.move_to_end(digest)
+        return value
+
+    async def set(self, digest: str, value: Dict):
+        self._entries[digest] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class RedisCacheBackend:
+    """Redis-backed cache shared across workers (eviction via TTL + maxmemory LRU)"""
+
+    PREFIX = "fg:resp:"
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, digest: str) -> Optional[Dict]:
+        raw = await get_redis().get(self.PREFIX + digest)
+        return loads(raw) if raw else None
+
+    async def set(self, digest: str, value: Dict):
+        await get_redis().set(self.PREFIX + digest, dumps(value), ex=self.ttl_seconds)
+
+class ResponseCache:
+    """
+    Cache of persona completions keyed on (persona, normalized question,
+    context, model settings)
+
+    Exact tier: digest lookup in Redis, falling back to an in-process LRU
+    while Redis is unreachable.
+    Similarity tier (optional): for exact misses, near-duplicate questions
+    under the same persona/context/settings bucket are matched by trigram
+    Jaccard similarity against a bounded in-process index.
+    """
+
+    REDIS_RETRY_SECONDS = 30.0
+
+    def __init__(self):
+        self.enabled = settings.RESPONSE_CACHE_ENABLED
+        self.similarity_threshold = settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD
+        self.memory = MemoryCacheBackend(
+            settings.RESPONSE_CACHE_MAX_ENTRIES,
+            settings.RESPONSE_CACHE_TTL_SECONDS
+        )
+        self.redis = (
+            RedisCacheBackend(settings.RESPONSE_CACHE_TTL_SECONDS)
+            if settings.RESPONSE_CACHE_BACKEND == "redis" else None
+        )
+        self._redis_down_until = 0.0
+
+        # bucket -> recent (normalized question, trigrams, digest)
+        self._similar: "OrderedDict[str, Deque[Tuple[str, FrozenSet[str], str]]]" = OrderedDict()
+
+    def make_key(
+        self,
+        persona_id: str,
+        question: str,
+        context: str,
+        max_tokens: int,
+        kind: str = "response"
+    ) -> CacheKey:
+        """Build the cache key for one persona call (kind: response | rebuttal)"""
+        normalized = normalize_question(question)
+        bucket = self._hash(kind, persona_id, context, settings.DEFAULT_MODEL, max_tokens)
+        return CacheKey(self._hash(bucket, normalized), bucket, normalized)
+
+    async def get(self, key: CacheKey) -> Tuple[Optional[Dict], bool]:
+        """Look up a completion; returns (entry, was_similarity_match)"""
+        if not self.enabled:
+            return None, False
+
+        entry = await self._backend_get(key.digest)
+        if entry is not None:
+            return entry, False
+
+        if self.similarity_threshold <= 0:
+            return None, False
+
+        best_digest, best_score = None, self.similarity_threshold
+        for question, grams, digest in self._similar.get(key.bucket, ()):
+            if question == key.question:
+                continue
+            score = jaccard(key.question_grams, grams)
+            if score >= best_score:
+                best_digest, best_score = digest, score
+
+        if best_digest is None:
+            return None, False
+
+        entry = await self._backend_get(best_digest)
+        return entry, entry is not None
+
+    async def set(self, key: CacheKey, text: str, latency_ms: float):
+        """Store a completion with the latency it took to generate"""
+        if not self.enabled:
+            return
+
+        await self._backend_set(key.digest, {"text": text, "latency_ms": latency_ms})
+
+        if self.similarity_threshold > 0:
+            entries = self._similar.pop(key.bucket, None) or deque(
+                maxlen=settings.RESPONSE_CACHE_SIMILARITY_BUCKET_SIZE
+            )
+            entries.append((key.question, key.question_grams, key.digest))
+            self._similar[key.bucket] = entries
+            while len(self._similar) > settings.RESPONSE_CACHE_MAX_ENTRIES:
+                self._similar.popitem(last=False)
+
+    async def _backend_get(self, digest: str) -> Optional[Dict]:
+        if self._redis_available():
+            try:
+                return await self.redis.get(digest)
+            except Exception as e:
+                self._mark_redis_down(e)
+        return await self.memory.get(digest)
+
+    async def _backend_set(self, digest: str, value: Dict):
+        if self._redis_available():
+            try:
+                await self.redis.set(digest, value)
+                return
+            except Exception as e:
+                self._mark_redis_down(e)
+        await self.memory.set(digest, value)
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception):
+        print(f"Response cache: Redis unavailable ({error}), using in-process cache")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+    @staticmethod
+    def _hash(*parts) -> str:
+        return hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+
+# Global cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,571 @@
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from collections import OrderedDict, deque
+from datetime import datetime
+import asyncio
+import base64
+import time
+import uuid
+from app.config import settings
+from app.services.metrics import metrics
+from app.services.redis_client import get_redis
+from sqlalchemy import select, update, func, text, tuple_
+from app.models.database import SessionLocal
+from app.models import entities
+from app.models.schemas import DebateResponse, DebateSummary, FocusGroupSession, SentimentBreakdown, SessionStatus
+
+# (kind, payload) queued for the next batch: insert_session | update_session | insert_response
+WriteOp = Tuple[str, Dict[str, Any]]
+
+dead_lettered = metrics.counter("fg_session_writes_dead_lettered_total", "Queued session writes given up on after repeated failures", ["kind"])
+
+# Listing filters: (is_public, is_featured, user_id, status); None means any
+ListFilter = Tuple[Optional[bool], Optional[bool], Optional[uuid.UUID], Optional[SessionStatus]]
+
+def encode_cursor(session: FocusGroupSession) -> str:
+    """Opaque position after `session` in the newest-first listing"""
+    raw = f"{session.created_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """(created_at, id) of the last session already listed; ValueError if it isn't a cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, session_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(session_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def may_view(session: Optional[FocusGroupSession], key: Optional[str]) -> bool:
+    """
+    Public sessions are open to all; private ones need the key handed to
+    their creator. A session that doesn't exist yet isn't anyone's secret.
+    """
+    return session is None or session.is_public or key == session.session_key
+
+def _position(session: FocusGroupSession) -> Tuple[datetime, uuid.UUID]:
+    """Where a session sorts in the listing"""
+    return session.created_at, uuid.UUID(session.id)
+
+class SessionStore:
+    """
+    Focus group sessions and transcripts, persisted write-behind
+
+    Writes are queued in memory and flushed to the DB in batches by a
+    background task, so the debate/WebSocket path never waits on a DB
+    round-trip. Reads go through an LRU cache, then the Redis session
+    registry shared by all workers (which also holds sessions whose
+    inserts haven't been flushed yet), before falling back to the DB.
+    """
+
+    MAX_FLUSH_ATTEMPTS = 3
+    DEAD_LETTER_LIMIT = 1000
+    REGISTRY_PREFIX = "fg:session:"
+    REDIS_RETRY_SECONDS = 30
+    MAX_CACHED_PAGES = 256
+    # Filtered totals are counted exactly up to this many, then estimated
+    COUNT_CAP = 10000
+
+    def __init__(self):
+        # session id -> (trusted until, session)
+        self._cache: "OrderedDict[str, Tuple[float, FocusGroupSession]]" = OrderedDict()
+        self._pending: List[WriteOp] = []
+        # The batch being written right now
+        self._in_flight: List[WriteOp] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # id(payload) -> failed attempts, for ops being retried alone
+        self._attempts: Dict[int, int] = {}
+        # Ops given up on, most recent last, kept for inspection
+        self.dead_letters: Deque[WriteOp] = deque(maxlen=self.DEAD_LETTER_LIMIT)
+        self._flush_lock = asyncio.Lock()
+        self._registry_writes: Set[asyncio.Task] = set()
+        self._redis_down_until = 0.0
+        # (limit, filters) -> (expires at, first page); filters -> (expires at, total, estimated)
+        self._first_pages: Dict[Tuple[int, ListFilter], Tuple[float, Tuple]] = {}
+        self._totals: Dict[ListFilter, Tuple[float, int, bool]] = {}
+
+    # Lifecycle
+
+    async def start(self):
+        """Start the background flusher"""
+        self._wakeup = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flusher and write out everything still pending"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._registry_writes:
+            await asyncio.gather(*self._registry_writes, return_exceptions=True)
+        await self.flush()
+
+    # Reads
+
+    async def get(self, session_id: str, fresh: bool = False) -> Optional[FocusGroupSession]:
+        """
+        Get a session from cache, then the registry, falling back to the DB
+
+        Another worker may run or finish the debate, so a cached copy is
+        only trusted for SESSION_CACHE_TTL_SECONDS; fresh=True skips it.
+        """
+        entry = self._cache.get(session_id)
+        if entry is not None and not fresh and entry[0] > time.monotonic():
+            self._cache.move_to_end(session_id)
+            return entry[1]
+        cached = entry[1] if entry is not None else None
+
+        session_uuid = self._as_uuid(session_id)
+        if session_uuid is None:
+            return cached
+
+        # Created or updated by another worker, possibly not flushed yet
+        session = await self._registry_get(session_id)
+        if session is not None:
+            self._remember(session)
+            return session
+        if cached is not None and not self._redis_available():
+            # Nobody else can see this session without Redis; ours is the latest copy
+            return cached
+
+        try:
+            session = await self._load(session_uuid)
+        except Exception as e:
+            print(f"Session store: failed to load {session_id}: {e}")
+            return cached
+
+        if session is None:
+            # Not flushed yet
+            return cached
+        self._remember(session)
+        return session
+
+    def invalidate(self, session_id: str):
+        """Forget the cached copy (e.g. another worker is about to change it)"""
+        self._cache.pop(session_id, None)
+
+    async def list_recent(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        filters: ListFilter = (None, None, None, None)
+    ) -> Tuple[List[FocusGroupSession], Optional[str], int, bool]:
+        """
+        Sessions newest first, a page at a time
+
+        Keyset pagination on (created_at, id): `after` is the decoded
+        next_cursor of the previous page, so every page is an index range
+        scan however deep it is. Sessions created here but not flushed yet
+        are merged in rather than flushing on the read path. First pages
+        are cached briefly per filter. Returns (sessions, next cursor or
+        None, total, whether total is estimated).
+        """
+        now = time.monotonic()
+
+        page_key = (limit, filters)
+        if after is None:
+            cached = self._first_pages.get(page_key)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+
+        try:
+            sessions, next_cursor = await self._list(limit, after, filters)
+            total, estimated = await self._total(filters, now)
+        except Exception as e:
+            print(f"Session store: DB listing failed ({e}), serving cached sessions")
+            return self._list_cached(limit, after, filters)
+
+        unflushed = self._unflushed(after, filters)
+        if unflushed:
+            listed = {session.id for session in sessions}
+            merged = [session for session in unflushed if session.id not in listed]
+            total += len(merged)
+            sessions = sorted(sessions + merged, key=_position, reverse=True)
+            if next_cursor is not None or len(sessions) > limit:
+                sessions = sessions[:limit]
+                next_cursor = encode_cursor(sessions[-1])
+
+        page = (sessions, next_cursor, total, estimated)
+        if after is None:
+            self._first_pages[page_key] = (now + settings.SESSION_LIST_CACHE_SECONDS, page)
+            while len(self._first_pages) > self.MAX_CACHED_PAGES:
+                self._first_pages.pop(next(iter(self._first_pages)))
+        return page
+
+    # Writes (queued)
+
+    async def create(self, session: FocusGroupSession, mode: str):
+        """Register a new session, visible to every worker once this returns"""
+        self._remember(session)
+        self._first_pages.clear()
+        await self._registry_set(session)
+        self._enqueue("insert_session", {
+            "id": uuid.UUID(session.id),
+            "session_key": session.session_key,
+            "question": session.question,
+            "selected_persona_ids": session.selected_persona_ids,
+            "status": session.status.value,
+            "debate_mode": mode,
+            "is_public": session.is_public,
+            "user_id": uuid.UUID(session.user_id) if session.user_id else None,
+            "created_at": session.created_at
+        })
+
+    async def ensure(self, session_id: str, question: str, persona_ids: List[str], mode: str) -> bool:
+        """Make sure a debate has a session row to attach responses to; False if it can't be stored"""
+        if self._as_uuid(session_id) is None:
+            return False
+
+        if await self.get(session_id) is None:
+            await self.create(FocusGroupSession(
+                id=session_id,
+                session_key=str(uuid.uuid4())[:12],
+                question=question,
+                selected_persona_ids=persona_ids,
+                status=SessionStatus.PENDING,
+                created_at=datetime.utcnow()
+            ), mode=mode)
+        return True
+
+    def mark_running(self, session_id: str, mode: str):
+        self._set_status(session_id, SessionStatus.RUNNING, {"debate_mode": mode})
+
+    def mark_failed(self, session_id: str):
+        self._set_status(session_id, SessionStatus.FAILED, {"completed_at": datetime.utcnow()})
+
+    def record_response(self, response: DebateResponse, order: int):
+        """Queue one completed persona response"""
+        self._enqueue("insert_response", {
+            "session_id": uuid.UUID(response.session_id),
+            "persona_id": response.persona_id,
+            "persona_name": response.persona_name,
+            "response_text": response.text,
+            "response_order": order,
+            "wave": response.wave,
+            "is_rebuttal": response.is_rebuttal,
+            "sentiment": response.sentiment.value if response.sentiment else None,
+            "confidence_score": response.confidence_score,
+            "created_at": response.timestamp
+        })
+
+    def complete(self, session_id: str, transcript: List[Dict], summary: Optional[DebateSummary] = None, extra: Optional[Dict] = None):
+        """Store the final transcript and summary, and mark the session completed"""
+        fields = {"transcript": transcript, "completed_at": datetime.utcnow()}
+        if summary is not None:
+            fields.update(
+                summary=summary.summary_text,
+                sentiment_breakdown=summary.sentiment_breakdown.model_dump(),
+                key_insights=summary.key_insights,
+                consensus_points=summary.consensus_points,
+                most_controversial_take=summary.most_controversial_take
+            )
+        fields.update(extra or {})
+        self._set_status(session_id, SessionStatus.COMPLETED, fields, {"summary": summary})
+
+    async def flush(self):
+        """
+        Write every queued op in one transaction
+
+        If the batch fails, its ops are retried one at a time, so one bad
+        write can't take the rest down with it. An op that still fails is
+        queued again and dead-lettered after MAX_FLUSH_ATTEMPTS; later ops
+        for the same session wait behind it so they can't apply out of order.
+        """
+        # Serialized so batches commit in the order they were queued
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            batch, self._pending = self._pending, []
+            self._in_flight = batch
+            try:
+                try:
+                    await self._write(batch)
+                    return
+                except Exception as e:
+                    print(f"Session store: flush of {len(batch)} writes failed ({e}), retrying one at a time")
+
+                retry: List[WriteOp] = []
+                blocked: Set[uuid.UUID] = set()
+                for op in batch:
+                    session_uuid = self._session_of(op)
+                    if session_uuid in blocked:
+                        retry.append(op)
+                        continue
+                    try:
+                        await self._write([op])
+                        self._attempts.pop(id(op[1]), None)
+                    except Exception as e:
+                        attempts = self._attempts.pop(id(op[1]), 0) + 1
+                        if attempts < self.MAX_FLUSH_ATTEMPTS:
+                            self._attempts[id(op[1])] = attempts
+                            retry.append(op)
+                            blocked.add(session_uuid)
+                        else:
+                            self._dead_letter(op, e)
+                self._pending = retry + self._pending
+            finally:
+                self._in_flight = []
+
+    # Internals
+
+    def _enqueue(self, kind: str, payload: Dict[str, Any]):
+        self._pending.append((kind, payload))
+        if self._wakeup is not None and len(self._pending) >= settings.PERSISTENCE_BATCH_SIZE:
+            self._wakeup.set()
+
+    def _dead_letter(self, op: WriteOp, error: Exception):
+        kind, payload = op
+        print(f"Session store: giving up on {kind} for session {self._session_of(op)} after {self.MAX_FLUSH_ATTEMPTS} attempts: {error}")
+        self.dead_letters.append(op)
+        dead_lettered.inc(kind=kind)
+
+    @staticmethod
+    def _session_of(op: WriteOp) -> uuid.UUID:
+        kind, payload = op
+        return payload["session_id"] if kind == "insert_response" else payload["id"]
+
+    def _set_status(self, session_id: str, status: SessionStatus, fields: Dict[str, Any], changes: Optional[Dict[str, Any]] = None):
+        update = {"status": status, **(changes or {})}
+        entry = self._cache.get(session_id)
+        if entry is not None:
+            session = entry[1].model_copy(update=update)
+            self._remember(session)
+            self._in_background(self._registry_set(session))
+        else:
+            # Created elsewhere; other workers still need to see the change
+            self._in_background(self._registry_update(session_id, update))
+        self._first_pages.clear()
+
+        session_uuid = self._as_uuid(session_id)
+        if session_uuid is not None:
+            self._enqueue("update_session", {"id": session_uuid, "status": status.value, **fields})
+
+    def _remember(self, session: FocusGroupSession):
+        self._cache[session.id] = (time.monotonic() + settings.SESSION_CACHE_TTL_SECONDS, session)
+        self._cache.move_to_end(session.id)
+        while len(self._cache) > settings.SESSION_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _in_background(self, write):
+        task = asyncio.create_task(write)
+        self._registry_writes.add(task)
+        task.add_done_callback(self._registry_writes.discard)
+
+    # Registry (Redis; best effort, the DB stays the source of truth)
+
+    async def _registry_get(self, session_id: str) -> Optional[FocusGroupSession]:
+        if not self._redis_available():
+            return None
+        try:
+            raw = await get_redis().get(self.REGISTRY_PREFIX + session_id)
+        except Exception as e:
+            self._mark_redis_down(e)
+            return None
+        return FocusGroupSession.model_validate_json(raw) if raw else None
+
+    async def _registry_set(self, session: FocusGroupSession):
+        if not self._redis_available():
+            return
+        try:
+            await get_redis().set(
+                self.REGISTRY_PREFIX + session.id,
+                session.model_dump_json(),
+                ex=settings.SESSION_REGISTRY_TTL_SECONDS
+            )
+        except Exception as e:
+            self._mark_redis_down(e)
+
+    async def _registry_update(self, session_id: str, update: Dict[str, Any]):
+        session = await self._registry_get(session_id)
+        if session is not None:
+            await self._registry_set(session.model_copy(update=update))
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception):
+        print(f"Session store: Redis unavailable ({error}), sessions are only visible to this worker")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+    async def _flush_loop(self):
+        interval = settings.PERSISTENCE_FLUSH_INTERVAL_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    @staticmethod
+    def _as_uuid(session_id: str) -> Optional[uuid.UUID]:
+        try:
+            return uuid.UUID(session_id)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _to_schema(row: entities.FocusGroupSession) -> FocusGroupSession:
+        return FocusGroupSession(
+            id=str(row.id),
+            session_key=row.session_key,
+            question=row.question,
+            selected_persona_ids=list(row.selected_persona_ids or []),
+            status=row.status or SessionStatus.PENDING,
+            is_public=row.is_public if row.is_public is not None else True,
+            created_at=row.created_at,
+            user_id=str(row.user_id) if row.user_id else None,
+            summary=DebateSummary(
+                session_id=str(row.id),
+                summary_text=row.summary,
+                sentiment_breakdown=SentimentBreakdown(**row.sentiment_breakdown),
+                key_insights=list(row.key_insights or []),
+                consensus_points=list(row.consensus_points or []),
+                most_controversial_take=row.most_controversial_take or "",
+                share_url=f"/replay/{row.id}"
+            ) if row.summary is not None and row.sentiment_breakdown else None
+        )
+
+    # DB access (one pooled connection per call; writes are serialized by
+    # the flush lock, so persistence never holds more than one connection
+    # and can't starve API routes sharing the pool)
+
+    async def _write(self, batch: List[WriteOp]):
+        sessions = [entities.FocusGroupSession(**p) for kind, p in batch if kind == "insert_session"]
+        updates = [p for kind, p in batch if kind == "update_session"]
+        responses = [entities.PersonaResponse(**p) for kind, p in batch if kind == "insert_response"]
+
+        async with SessionLocal() as db:
+            # Parents first so updates and responses in the same batch find them
+            db.add_all(sessions)
+            await db.flush()
+            for fields in updates:
+                fields = dict(fields)
+                session_uuid = fields.pop("id")
+                await db.execute(
+                    update(entities.FocusGroupSession)
+                    .where(entities.FocusGroupSession.id == session_uuid)
+                    .values(**fields)
+                    .execution_options(synchronize_session=False)
+                )
+            db.add_all(responses)
+            await db.commit()
+
+    async def _load(self, session_uuid: uuid.UUID) -> Optional[FocusGroupSession]:
+        async with SessionLocal() as db:
+            row = await db.get(entities.FocusGroupSession, session_uuid)
+            return self._to_schema(row) if row is not None else None
+
+    @staticmethod
+    def _where(filters: ListFilter) -> List:
+        is_public, is_featured, user_id, status = filters
+        table = entities.FocusGroupSession
+        clauses = []
+        if is_public is not None:
+            clauses.append(table.is_public == is_public)
+        if is_featured is not None:
+            clauses.append(table.is_featured == is_featured)
+        if user_id is not None:
+            clauses.append(table.user_id == user_id)
+        if status is not None:
+            clauses.append(table.status == status.value)
+        return clauses
+
+    async def _list(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]],
+        filters: ListFilter
+    ) -> Tuple[List[FocusGroupSession], Optional[str]]:
+        table = entities.FocusGroupSession
+        query = select(table).where(*self._where(filters))
+        if after is not None:
+            query = query.where(tuple_(table.created_at, table.id) < tuple_(*after))
+        # One extra row tells us whether there is a next page
+        query = query.order_by(table.created_at.desc(), table.id.desc()).limit(limit + 1)
+
+        async with SessionLocal() as db:
+            rows = (await db.scalars(query)).all()
+        sessions = [self._to_schema(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(sessions[-1]) if len(rows) > limit else None
+        return sessions, next_cursor
+
+    async def _total(self, filters: ListFilter, now: float) -> Tuple[int, bool]:
+        """
+        How many sessions match, cached per filter: the planner's row
+        estimate for the whole table, and an exact count capped at
+        COUNT_CAP (estimated past that) when filtered
+        """
+        cached = self._totals.get(filters)
+        if cached is not None and cached[0] > now:
+            return cached[1], cached[2]
+
+        table = entities.FocusGroupSession
+        where = self._where(filters)
+        async with SessionLocal() as db:
+            estimate = None
+            if not where and db.bind.dialect.name == "postgresql":
+                estimate = await db.scalar(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+                    {"name": table.__tablename__}
+                )
+            if estimate is not None and estimate >= self.COUNT_CAP:
+                total, estimated = int(estimate), True
+            else:
+                capped = select(table.id).where(*where).limit(self.COUNT_CAP).subquery()
+                total = await db.scalar(select(func.count()).select_from(capped))
+                estimated = total >= self.COUNT_CAP
+
+        self._totals[filters] = (now + settings.SESSION_LIST_COUNT_TTL_SECONDS, total, estimated)
+        return total, estimated
+
+    @staticmethod
+    def _matches(session: FocusGroupSession, filters: ListFilter) -> bool:
+        is_public, is_featured, user_id, status = filters
+        return (
+            (is_public is None or session.is_public == is_public)
+            # Only featured by hand, after it's stored
+            and not is_featured
+            and (user_id is None or session.user_id == str(user_id))
+            and (status is None or session.status == status)
+        )
+
+    def _unflushed(self, after: Optional[Tuple[datetime, uuid.UUID]], filters: ListFilter) -> List[FocusGroupSession]:
+        """Sessions created here whose inserts are still queued, filtered like the listing"""
+        unflushed = []
+        for kind, payload in self._in_flight + self._pending:
+            if kind != "insert_session":
+                continue
+            entry = self._cache.get(str(payload["id"]))
+            if entry is None:
+                continue
+            session = entry[1]
+            if self._matches(session, filters) and (after is None or _position(session) < after):
+                unflushed.append(session)
+        return unflushed
+
+    def _list_cached(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]],
+        filters: ListFilter
+    ) -> Tuple[List[FocusGroupSession], Optional[str], int, bool]:
+        """The listing from cached sessions alone, for when the DB is unreachable"""
+        matching = sorted(
+            (session for _, session in self._cache.values() if self._matches(session, filters)),
+            key=_position,
+            reverse=True
+        )
+        if after is not None:
+            matching = [session for session in matching if _position(session) < after]
+        page = matching[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(matching) > limit else None
+        return page, next_cursor, len(matching), True
+
+# Global store instance
+session_store = SessionStore()
@@ -0,0 +1,167 @@
+from typing import Any, Dict, Iterator, List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import os
+import time
+from app.config import settings
+
+SERVICE_NAME = "focus-group-api"
+
+class Span:
+    """One timed operation, shaped like an OpenTelemetry span"""
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str] = None, attributes: Optional[Dict] = None, start_ns: Optional[int] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float):
+        """Accumulate a numeric attribute (e.g. wait time across retries)"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def record_error(self, error: BaseException):
+        self.error = f"{error.__class__.__name__}: {error}"
+
+    def to_otlp(self) -> Dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class Tracer:
+    """
+    Per-debate traces in the OpenTelemetry data model, with no SDK
+
+    Each debate is one trace: a root span for the run, child spans for
+    every persona step, wave and LLM call. Finished traces are kept for
+    the last TRACING_MAX_DEBATES debates (served as OTLP/JSON by the
+    analytics API) and, when OTLP_TRACES_ENDPOINT is set, posted to an
+    OpenTelemetry collector as the root span ends.
+    """
+
+    def __init__(self, max_traces: int = settings.TRACING_MAX_DEBATES, endpoint: str = settings.OTLP_TRACES_ENDPOINT):
+        self.max_traces = max_traces
+        self.endpoint = endpoint
+        # trace_id -> finished spans, oldest trace first
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        # Lookup key (session id) -> trace_id
+        self._keys: Dict[str, str] = {}
+        self._exports: set = set()
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_span(self, name: str, attributes: Optional[Dict] = None, parent: Optional[Span] = None, start_ns: Optional[int] = None) -> Span:
+        """A span under `parent` (default: the current span) that isn't made current; call end()"""
+        parent = parent or _current_span.get()
+        if parent is None:
+            return Span(name, os.urandom(16).hex(), attributes=attributes, start_ns=start_ns)
+        return Span(name, parent.trace_id, parent.span_id, attributes, start_ns)
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict] = None, key: Optional[str] = None) -> Iterator[Span]:
+        """
+        Run a block as the current span; `key` starts a new trace findable
+        by that key. Only use in coroutines, not across async-generator yields.
+        """
+        if key is not None:
+            span = Span(name, os.urandom(16).hex(), attributes=attributes)
+            self._keys[key] = span.trace_id
+        else:
+            span = self.start_span(name, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end(span)
+
+    def end(self, span: Span, end_ns: Optional[int] = None):
+        span.end_ns = end_ns or time.time_ns()
+        spans = self._traces.get(span.trace_id)
+        if spans is None:
+            spans = self._traces[span.trace_id] = []
+            while len(self._traces) > self.max_traces:
+                trace_id, _ = self._traces.popitem(last=False)
+                self._forget_keys(trace_id)
+        spans.append(span)
+
+        if span.parent_span_id is None and self.endpoint:
+            self._export(span.trace_id)
+
+    def trace(self, key: str) -> Optional[Dict]:
+        """OTLP/JSON export of a traced debate, or None if it isn't kept"""
+        trace_id = self._keys.get(key)
+        spans = self._traces.get(trace_id) if trace_id else None
+        return self._otlp(spans) if spans else None
+
+    def _forget_keys(self, trace_id: str):
+        for key in [k for k, t in self._keys.items() if t == trace_id]:
+            del self._keys[key]
+
+    def _export(self, trace_id: str):
+        try:
+            task = asyncio.get_running_loop().create_task(self._post(self._otlp(self._traces[trace_id])))
+        except RuntimeError:
+            return
+        self._exports.add(task)
+        task.add_done_callback(self._exports.discard)
+
+    async def _post(self, body: Dict):
+        # Shares the process-wide pool; imported here since the LLM client is instrumented with this tracer
+        from app.core.llm_client import get_http_client
+        try:
+            response = await get_http_client().post(self.endpoint, json=body, timeout=5.0)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Trace export to {self.endpoint} failed: {e}")
+
+    @staticmethod
+    def _otlp(spans: List[Span]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.services.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+# Global tracer instance
+tracer = Tracer()
@@ -0,0 +1,344 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
+import asyncio
+import hashlib
+import heapq
+import time
+from sqlalchemy import delete, select
+from app.config import settings
+from app.models import entities
+from app.models.database import SessionLocal
+from app.services.metrics import metrics
+from app.services.redis_client import get_redis
+from app.utils.text import jaccard, question_key, trigrams
+
+questions_total = metrics.counter(
+    "fg_trending_questions_total", "Debate questions counted for trending, by how they were grouped",
+    ["match"]  # exact | similar | new
+)
+
+class TrendingCluster:
+    """A group of questions that are rephrasings of each other"""
+    __slots__ = ("id", "key", "question", "grams", "runs", "last_run")
+
+    def __init__(self, cluster_id: str, key: str, question: str, runs: int = 0, last_run: float = 0.0):
+        self.id = cluster_id
+        self.key = key
+        self.question = question
+        self.grams: FrozenSet[str] = trigrams(key)
+        self.runs = runs
+        self.last_run = last_run
+
+class TrendingIndex:
+    """
+    Time-decayed popularity of debate questions, kept as a top-K index
+
+    Each debate start adds 2^(t / half-life) to its question's cluster,
+    with t measured from the start of the current epoch, so older runs
+    count for exponentially less without ever rescoring the set. Questions are grouped by their
+    content words (question_key), and unseen ones are matched against
+    the trending and recently seen clusters by trigram similarity.
+
+    Increments are batched in memory and flushed to Redis sorted sets
+    (`fg:trending:<epoch>`) every TRENDING_FLUSH_SECONDS. Every write
+    also goes to the next epoch's set, so that set already holds the
+    recent history when the epoch rolls over and scores stay small. Each
+    flush reads the top K back into a snapshot that /trending slices, and
+    periodically one worker saves it to the trending_questions table,
+    which seeds the snapshot after a restart. Without Redis, the same
+    scores are kept per worker.
+    """
+
+    PREFIX = "fg:trending:"
+    CLUSTER_PREFIX = "fg:trending:c:"
+    PERSIST_LOCK_KEY = "fg:trending:persist"
+    # Clusters compared by similarity for each unseen question
+    SIMILARITY_CANDIDATES = 256
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self):
+        self.half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+        self.epoch_seconds = 4 * self.half_life
+        self.top_k = settings.TRENDING_TOP_K
+        self.max_tracked = settings.TRENDING_MAX_TRACKED
+        self.similarity_threshold = settings.TRENDING_SIMILARITY_THRESHOLD
+
+        # Local scores are 2^((t - _ref) / half-life); rebased as _ref moves forward
+        self._ref = time.time()
+        self._scores: Dict[str, float] = {}
+        self._clusters: "OrderedDict[str, TrendingCluster]" = OrderedDict()
+        # question key -> cluster it was matched into by similarity
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+        # Not yet written to Redis
+        self._pending: Dict[str, float] = {}
+        self._pending_runs: Counter = Counter()
+
+        # What /trending serves, best first, plus the clusters behind it
+        self._top: List[Dict] = []
+        self._top_clusters: Dict[str, TrendingCluster] = {}
+
+        self._task: Optional[asyncio.Task] = None
+        self._redis_down_until = 0.0
+
+    # Lifecycle
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    # Hot path
+
+    def record(self, question: str):
+        """Count a debate starting on `question`"""
+        cluster, match = self._cluster(question)
+        questions_total.inc(match=match)
+
+        now = time.time()
+        weight = 2 ** ((now - self._ref) / self.half_life)
+        self._scores[cluster.id] = self._scores.get(cluster.id, 0.0) + weight
+        self._pending[cluster.id] = self._pending.get(cluster.id, 0.0) + weight
+        self._pending_runs[cluster.id] += 1
+        cluster.runs += 1
+        cluster.last_run = now
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        """The current top questions, best first (a slice of the last snapshot)"""
+        return self._top[:max(limit, 0)]
+
+    # Flushing
+
+    async def flush(self):
+        """Write pending increments to Redis and refresh the top-K snapshot"""
+        now = time.time()
+        top: Optional[List[Tuple[TrendingCluster, float]]] = None
+        if self._redis_available():
+            try:
+                if self._pending:
+                    await self._write(now)
+                top = await self._read(now)
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        self._rebase(now)
+        self._set_top(top if top is not None else self._local_top(now))
+
+    async def persist(self):
+        """Save the snapshot to trending_questions (one worker at a time)"""
+        if not self._top:
+            return
+        if self._redis_available():
+            try:
+                lock = await get_redis().set(self.PERSIST_LOCK_KEY, "1", nx=True, ex=max(int(settings.TRENDING_PERSIST_SECONDS), 1))
+                if not lock:
+                    return
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        rows = [
+            entities.TrendingQuestion(
+                question=entry["question"],
+                run_count=entry["run_count"],
+                last_run_at=entry["last_run"],
+                trending_score=entry["trending_score"]
+            )
+            for entry in self._top
+        ]
+        try:
+            async with SessionLocal() as db:
+                await db.execute(delete(entities.TrendingQuestion))
+                db.add_all(rows)
+                await db.commit()
+        except Exception as e:
+            print(f"Trending: failed to save {len(rows)} questions: {e}")
+
+    async def load(self):
+        """Seed scores and the snapshot from the last saved one"""
+        try:
+            async with SessionLocal() as db:
+                rows = (await db.scalars(
+                    select(entities.TrendingQuestion).order_by(entities.TrendingQuestion.trending_score.desc()).limit(self.top_k)
+                )).all()
+        except Exception as e:
+            print(f"Trending: no saved questions to start from: {e}")
+            return
+
+        now = time.time()
+        utcnow = datetime.utcnow()
+        for row in rows:
+            cluster = self._new_cluster(row.question)
+            cluster.runs = row.run_count or 0
+            cluster.last_run = row.last_run_at.replace(tzinfo=timezone.utc).timestamp() if row.last_run_at else now
+            # Saved scores were current when saved; decay them for the time since
+            age = max((utcnow - row.created_at).total_seconds(), 0.0) if row.created_at else 0.0
+            score = (row.trending_score or 0.0) * 2 ** (-age / self.half_life)
+            self._scores[cluster.id] = score * 2 ** ((now - self._ref) / self.half_life)
+        if rows:
+            self._set_top(self._local_top(now))
+
+    # Internals
+
+    def _cluster(self, question: str) -> Tuple[TrendingCluster, str]:
+        key = question_key(question)
+        cluster_id = self._cluster_id(key)
+
+        cluster = self._clusters.get(cluster_id) or self._top_clusters.get(cluster_id)
+        if cluster is not None:
+            self._track(cluster)
+            return cluster, "exact"
+
+        alias = self._aliases.get(key)
+        if alias is not None:
+            cluster = self._clusters.get(alias) or self._top_clusters.get(alias)
+            if cluster is not None:
+                self._aliases.move_to_end(key)
+                self._track(cluster)
+                return cluster, "similar"
+
+        if self.similarity_threshold > 0:
+            grams = trigrams(key)
+            best, best_score = None, self.similarity_threshold
+            recent = islice(reversed(self._clusters.values()), self.SIMILARITY_CANDIDATES)
+            for candidate in (*self._top_clusters.values(), *recent):
+                score = jaccard(grams, candidate.grams)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                self._aliases[key] = best.id
+                while len(self._aliases) > self.max_tracked:
+                    self._aliases.popitem(last=False)
+                self._track(best)
+                return best, "similar"
+
+        return self._new_cluster(question, key), "new"
+
+    def _new_cluster(self, question: str, key: Optional[str] = None) -> TrendingCluster:
+        key = key if key is not None else question_key(question)
+        cluster = TrendingCluster(self._cluster_id(key), key, question.strip())
+        self._track(cluster)
+        return cluster
+
+    def _track(self, cluster: TrendingCluster):
+        self._clusters[cluster.id] = cluster
+        self._clusters.move_to_end(cluster.id)
+
+    async def _write(self, now: float):
+        pending, self._pending = self._pending, {}
+        runs, self._pending_runs = self._pending_runs, Counter()
+        epoch = int(now // self.epoch_seconds)
+        ttl = int(3 * self.epoch_seconds)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for e in (epoch, epoch + 1):
+                    # Pending weights are relative to _ref; convert to this epoch's units
+                    scale = 2 ** ((self._ref - e * self.epoch_seconds) / self.half_life)
+                    for cluster_id, weight in pending.items():
+                        pipe.zincrby(self.PREFIX + str(e), weight * scale, cluster_id)
+                    pipe.zremrangebyrank(self.PREFIX + str(e), 0, -(self.max_tracked + 1))
+                    pipe.expire(self.PREFIX + str(e), ttl)
+                for cluster_id, count in runs.items():
+                    cluster = self._clusters.get(cluster_id)
+                    key = self.CLUSTER_PREFIX + cluster_id
+                    if cluster is not None:
+                        pipe.hsetnx(key, "question", cluster.question)
+                        pipe.hsetnx(key, "key", cluster.key)
+                        pipe.hset(key, "last_run", cluster.last_run)
+                    pipe.hincrby(key, "runs", count)
+                    pipe.expire(key, ttl)
+                await pipe.execute()
+        except Exception:
+            # Keep them for the next flush
+            for cluster_id, weight in pending.items():
+                self._pending[cluster_id] = self._pending.get(cluster_id, 0.0) + weight
+            self._pending_runs.update(runs)
+            raise
+
+    async def _read(self, now: float) -> List[Tuple[TrendingCluster, float]]:
+        epoch = int(now // self.epoch_seconds)
+        redis = get_redis()
+        ranked = await redis.zrevrange(self.PREFIX + str(epoch), 0, self.top_k - 1, withscores=True)
+        if not ranked:
+            return []
+        async with redis.pipeline(transaction=False) as pipe:
+            for cluster_id, _ in ranked:
+                pipe.hmget(self.CLUSTER_PREFIX + cluster_id, "question", "key", "runs", "last_run")
+            details = await pipe.execute()
+
+        decay = 2 ** ((epoch * self.epoch_seconds - now) / self.half_life)
+        top = []
+        for (cluster_id, score), (question, key, runs, last_run) in zip(ranked, details):
+            if question is None:
+                continue
+            cluster = TrendingCluster(cluster_id, key or question_key(question), question, int(runs or 0), float(last_run or now))
+            top.append((cluster, score * decay))
+        return top
+
+    def _local_top(self, now: float) -> List[Tuple[TrendingCluster, float]]:
+        """Top K from this worker's scores alone"""
+        decay = 2 ** ((self._ref - now) / self.half_life)
+        return [
+            (self._clusters[cluster_id], score * decay)
+            for cluster_id, score in heapq.nlargest(self.top_k, self._scores.items(), key=lambda item: item[1])
+            if cluster_id in self._clusters
+        ]
+
+    def _set_top(self, top: List[Tuple[TrendingCluster, float]]):
+        self._top_clusters = {cluster.id: cluster for cluster, _ in top}
+        self._top = [
+            {
+                "question": cluster.question,
+                "run_count": cluster.runs,
+                "trending_score": round(score, 3),
+                "last_run": datetime.fromtimestamp(cluster.last_run, timezone.utc).replace(tzinfo=None) if cluster.last_run else None
+            }
+            for cluster, score in top
+        ]
+
+    def _rebase(self, now: float):
+        """Move the local reference time up to now, and trim what's tracked"""
+        factor = 2 ** ((self._ref - now) / self.half_life)
+        self._scores = {cluster_id: score * factor for cluster_id, score in self._scores.items()}
+        self._pending = {cluster_id: weight * factor for cluster_id, weight in self._pending.items()}
+        self._ref = now
+
+        if len(self._scores) > self.max_tracked:
+            self._scores = dict(heapq.nlargest(self.max_tracked, self._scores.items(), key=lambda item: item[1]))
+            for cluster_id in [cid for cid in self._clusters if cid not in self._scores]:
+                del self._clusters[cluster_id]
+            for cluster_id in [cid for cid in self._pending if cid not in self._scores]:
+                del self._pending[cluster_id]
+                self._pending_runs.pop(cluster_id, None)
+
+    async def _run(self):
+        await self.load()
+        last_persist = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.TRENDING_FLUSH_SECONDS)
+            await self.flush()
+            if time.monotonic() - last_persist >= settings.TRENDING_PERSIST_SECONDS:
+                last_persist = time.monotonic()
+                await self.persist()
+
+    @staticmethod
+    def _cluster_id(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception):
+        print(f"Trending: Redis unavailable ({error}), ranking this worker's debates only")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+# Global index instance
+trending_index = TrendingIndex()
@@ -0,0 +1,9 @@
+from typing import Any
+import orjson
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes; datetimes, enums and dataclasses are handled natively"""
+    return orjson.dumps(value)
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data)
@@ -0,0 +1,50 @@
+from typing import FrozenSet
+import re
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Words that don't change what a question is about
+_STOPWORDS = frozenset("""
+a an the i we you my our your me us it its this that these those is are am be was were been being do does did
+should would could can will shall may might must to of for in on at by with and or but if so about into from
+what which who whom how why when where whether there their they them he she his her any some just really
+""".split())
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    text = _NON_WORD.sub(" ", question.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+def question_key(question: str) -> str:
+    """
+    Canonical form for grouping rephrasings of a question: its content
+    words, crudely singularized, deduplicated and sorted
+    """
+    words = normalize_question(question).split()
+    content = {
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in words if word not in _STOPWORDS
+    }
+    return " ".join(sorted(content)) if content else " ".join(words)
+
+def first_sentence(text: str, max_words: int = 0) -> str:
+    """The first sentence of `text`, cut to `max_words` words (0: no limit)"""
+    sentence = _SENTENCE_END.split(text.strip(), 1)[0]
+    if max_words:
+        words = sentence.split()
+        if len(words) > max_words:
+            sentence = " ".join(words[:max_words]) + "..."
+    return sentence
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Character trigrams of already-normalized text"""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
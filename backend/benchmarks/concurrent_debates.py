@@ -0,0 +1,84 @@
+"""
+Benchmark: N concurrent debates vs. one debate.
+
+Runs the real DebateOrchestrator against a mocked Anthropic endpoint
+(httpx.MockTransport with a fixed per-call latency), so no API key or
+network is needed. With a non-blocking client, N debates should finish
+in roughly the wall-clock time of a single debate.
+
+Usage:
+    python -m benchmarks.concurrent_debates --debates 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from app.core.llm_client import set_http_client, close_http_client
+from app.core.debate_orchestrator import DebateOrchestrator
+from app.services.llm_scheduler import llm_scheduler
+from app.services.response_cache import response_cache
+
+PERSONA_IDS = [
+    "gen_z_teen", "startup_founder", "the_skeptic",
+    "soccer_mom", "the_optimist", "corporate_vp"
+]
+
+def make_mock_transport(latency: float) -> httpx.MockTransport:
+    """Fake Anthropic Messages API that answers after `latency` seconds"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={
+            "id": "msg_bench",
+            "type": "message",
+            "role": "assistant",
+            "model": "bench",
+            "content": [{"type": "text", "text": "This is definitely a good idea, no cap."}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 100, "output_tokens": 20}
+        })
+
+    return httpx.MockTransport(handler)
+
+async def run_one(orchestrator: DebateOrchestrator, idx: int, mode: str) -> int:
+    count = 0
+    async for _ in orchestrator.run_debate(
+        session_id=f"bench-{idx}",
+        question="Should we add AI to our product?",
+        persona_ids=PERSONA_IDS,
+        mode=mode
+    ):
+        count += 1
+    return count
+
+async def main(debates: int, latency: float, mode: str, max_in_flight: int):
+    llm_scheduler.max_in_flight = max_in_flight
+    # Every debate asks the same question; measure the LLM path, not the cache
+    response_cache.enabled = False
+    set_http_client(httpx.AsyncClient(transport=make_mock_transport(latency)))
+    orchestrator = DebateOrchestrator()
+
+    try:
+        start = time.perf_counter()
+        await run_one(orchestrator, 0, mode)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*[run_one(orchestrator, i, mode) for i in range(debates)])
+        concurrent = time.perf_counter() - start
+    finally:
+        await close_http_client()
+
+    print(f"mode={mode} latency={latency:.2f}s max_in_flight={max_in_flight}")
+    print(f"1 debate:   {single:.2f}s")
+    print(f"{debates} debates: {concurrent:.2f}s (ratio {concurrent / single:.2f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--debates", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--mode", default="hybrid", choices=["sequential", "parallel", "hybrid"])
+    parser.add_argument("--max-in-flight", type=int, default=llm_scheduler.max_in_flight)
+    args = parser.parse_args()
+    asyncio.run(main(args.debates, args.latency, args.mode, args.max_in_flight))
@@ -0,0 +1,183 @@
+"""
+Load test: N concurrent sessions end to end, fully offline.
+
+Runs the real app (uvicorn, HTTP routes, WebSocket stream, orchestrator,
+scheduler) with LLM_BACKEND=fake, so no API key or network is needed;
+Redis and Postgres are used if reachable and skipped otherwise. Each
+session is created with POST /api/focus-groups/create, then a viewer
+opens /ws/debate/{id}, sends `start` and reads frames until the debate
+completes.
+
+The server runs in this process on its own thread and event loop, so its
+loop lag can be probed directly: a task on the server loop sleeps for
+--probe-interval and records how late it wakes up. The client shares the
+process (and the GIL), so treat absolute numbers as an upper bound.
+
+Usage:
+    python -m benchmarks.load_test --sessions 50 --stream
+    python -m benchmarks.load_test --sessions 200 --latency-ms 800 --distribution lognormal --rate-limit-rate 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+import httpx
+import websockets
+
+PERSONA_IDS = ["gen_z_teen", "startup_founder", "the_skeptic", "soccer_mom", "the_optimist", "corporate_vp"]
+
+class ServerThread(threading.Thread):
+    """uvicorn serving the app on a background thread with its own loop"""
+
+    def __init__(self, port: int):
+        super().__init__(daemon=True)
+        import uvicorn
+        from app.main import app
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+        self.loop = None
+        self.lag: List[float] = []
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.server.serve())
+
+    def wait_started(self, timeout: float = 20.0):
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.is_alive():
+                raise RuntimeError("Server did not start")
+            time.sleep(0.05)
+
+    async def probe_lag(self, interval: float):
+        """Runs on the server loop: how late does a timer fire?"""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.lag.append(time.perf_counter() - start - interval)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.join()
+
+def frames_of(message: str) -> List[Dict]:
+    frame = json.loads(message)
+    return frame["frames"] if frame["type"] == "batch" else [frame]
+
+async def run_session(client: httpx.AsyncClient, base: str, idx: int, mode: str, stream: bool, timeout: float) -> Dict:
+    result = {"outcome": "timeout", "first_frame": None, "done": None, "frames": 0}
+    question = f"Should we add AI to product #{idx}?"
+
+    response = await client.post(f"{base}/api/focus-groups/create", json={"question": question, "persona_ids": PERSONA_IDS})
+    if response.status_code != 200:
+        result["outcome"] = f"create {response.status_code}"
+        return result
+    session_id = response.json()["id"]
+
+    ws_base = base.replace("http://", "ws://")
+    try:
+        async with websockets.connect(f"{ws_base}/ws/debate/{session_id}", max_size=None) as ws:
+            started = time.perf_counter()
+            await ws.send(json.dumps({
+                "action": "start", "question": question, "persona_ids": PERSONA_IDS, "mode": mode, "stream": stream
+            }))
+            while True:
+                message = await asyncio.wait_for(ws.recv(), timeout)
+                for frame in frames_of(message):
+                    result["frames"] += 1
+                    if result["first_frame"] is None:
+                        result["first_frame"] = time.perf_counter() - started
+                    if frame["type"] in ("debate_complete", "error"):
+                        result["outcome"] = "complete" if frame["type"] == "debate_complete" else "error"
+                        result["done"] = time.perf_counter() - started
+                        return result
+    except asyncio.TimeoutError:
+        return result
+    except (OSError, websockets.ConnectionClosed):
+        result["outcome"] = "disconnected"
+        return result
+
+def pct(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+async def drive(args, server: ServerThread) -> tuple:
+    base = f"http://127.0.0.1:{args.port}"
+    probe = asyncio.run_coroutine_threadsafe(server.probe_lag(args.probe_interval), server.loop)
+    limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+    try:
+        async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                run_session(client, base, i, args.mode, args.stream, args.timeout) for i in range(args.sessions)
+            ])
+            elapsed = time.perf_counter() - start
+    finally:
+        probe.cancel()
+    return results, elapsed
+
+def main(args):
+    # Must be set before the app (and its settings) are imported
+    os.environ.update(
+        LLM_BACKEND="fake",
+        FAKE_LLM_LATENCY_MS=str(args.latency_ms),
+        FAKE_LLM_LATENCY_DISTRIBUTION=args.distribution,
+        FAKE_LLM_TOKENS_PER_SECOND=str(args.tokens_per_second),
+        FAKE_LLM_ERROR_RATE=str(args.error_rate),
+        FAKE_LLM_RATE_LIMIT_RATE=str(args.rate_limit_rate),
+        FAKE_LLM_SEED=str(args.seed),
+        # Every session asks a similar question; measure the LLM path, not the cache
+        RESPONSE_CACHE_ENABLED="false"
+    )
+
+    # The app logs with print(); keep the report readable unless asked
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        server = ServerThread(args.port)
+        server.start()
+        server.wait_started()
+        try:
+            results, elapsed = asyncio.run(drive(args, server))
+        finally:
+            server.stop()
+
+    completed = [r for r in results if r["outcome"] == "complete"]
+    failed = {}
+    for r in results:
+        if r["outcome"] != "complete":
+            failed[r["outcome"]] = failed.get(r["outcome"], 0) + 1
+    first_frames = [r["first_frame"] for r in results if r["first_frame"] is not None]
+    done_times = [r["done"] for r in completed]
+    frames = sum(r["frames"] for r in results)
+    lag_ms = [lag * 1000 for lag in server.lag]
+
+    print(f"sessions={args.sessions} mode={args.mode} stream={args.stream} "
+          f"latency={args.latency_ms:.0f}ms ({args.distribution}) tokens/s={args.tokens_per_second:.0f} "
+          f"errors={args.error_rate:.2f} 429s={args.rate_limit_rate:.2f}")
+    print(f"wall clock:            {elapsed:.2f}s")
+    print(f"completed:             {len(completed)}/{len(results)}" + (f" {failed}" if failed else ""))
+    print(f"first frame p50/95/99: {pct(first_frames, 0.5) * 1000:.0f} / {pct(first_frames, 0.95) * 1000:.0f} / {pct(first_frames, 0.99) * 1000:.0f} ms")
+    print(f"debate time p50/95/99: {pct(done_times, 0.5):.2f} / {pct(done_times, 0.95):.2f} / {pct(done_times, 0.99):.2f} s")
+    print(f"frames:                {frames} ({frames / elapsed:.0f}/s)")
+    print(f"loop lag p50/99/max:   {pct(lag_ms, 0.5):.1f} / {pct(lag_ms, 0.99):.1f} / {max(lag_ms, default=0.0):.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--mode", choices=["sequential", "parallel", "hybrid", "rounds"], default="hybrid")
+    parser.add_argument("--stream", action="store_true", help="stream token deltas")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="fake LLM time to first token (median)")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal", "exponential"], default="lognormal")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls failing with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls failing with a 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="give up on a session after this long without a frame")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="server loop lag probe period (s)")
+    parser.add_argument("--port", type=int, default=8199)
+    parser.add_argument("--verbose", action="store_true", help="show the server's log output")
+    main(parser.parse_args())
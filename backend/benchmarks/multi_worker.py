@@ -0,0 +1,198 @@
+"""
+Load test: several uvicorn workers sharing one Redis.
+
+Starts a stub LLM (benchmarks.stub_llm) and N worker processes pointed at
+it, then runs debates whose viewers are spread across the workers: each
+debate is created on one worker and watched from several, so sessions
+have to be found through the Redis registry and frames have to cross
+Redis pub/sub. With --kill-after, worker 0 is SIGKILLed mid-run; its
+debates should be resumed by another worker once their leases expire,
+and its viewers reconnect elsewhere with the last seq they saw.
+
+Needs a Redis to share (e.g. `docker run -p 6379:6379 redis:7`); use one
+with no other debates running on it. Postgres is optional.
+
+Usage:
+    python -m benchmarks.multi_worker --workers 3 --debates 20 --viewers 3
+    python -m benchmarks.multi_worker --kill-after 1.0 --lease-ttl 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+import httpx
+import uvicorn
+import websockets
+from benchmarks.stub_llm import create_app
+
+PERSONA_IDS = ["gen_z_teen", "startup_founder", "the_skeptic", "soccer_mom"]
+
+def start_worker(port: int, env: Dict[str, str], log_dir: str) -> subprocess.Popen:
+    log = open(os.path.join(log_dir, f"worker-{port}.log"), "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+async def wait_healthy(client: httpx.AsyncClient, port: int, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"http://127.0.0.1:{port}/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Worker on port {port} did not start")
+
+def frames_of(message: str) -> List[Dict]:
+    frame = json.loads(message)
+    return frame["frames"] if frame["type"] == "batch" else [frame]
+
+IDLE_TIMEOUT = 30.0
+
+async def watch(session_id: str, ports: List[int], alive: set, first_port: int, started: float, start: Dict = None) -> Dict:
+    """One viewer: read frames until the debate ends, reconnecting to another worker if ours dies"""
+    result = {"outcome": "disconnected", "first_frame": None, "done": None, "frames": 0, "reconnects": 0, "resumed": False}
+    port = first_port
+    last_seq = None
+
+    while True:
+        # After a reconnect, ask for the frames missed in between
+        resume = f"?last_seq={last_seq}" if last_seq is not None else ""
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{port}/ws/debate/{session_id}{resume}") as ws:
+                if start is not None:
+                    await ws.send(json.dumps(start))
+                    start = None
+                while True:
+                    message = await asyncio.wait_for(ws.recv(), IDLE_TIMEOUT)
+                    for frame in frames_of(message):
+                        result["frames"] += 1
+                        last_seq = frame.get("seq", last_seq)
+                        if result["first_frame"] is None:
+                            result["first_frame"] = time.perf_counter() - started
+                        if frame["type"] == "debate_resumed":
+                            result["resumed"] = True
+                        if frame["type"] in ("debate_complete", "error"):
+                            result["outcome"] = "complete" if frame["type"] == "debate_complete" else "error"
+                            result["done"] = time.perf_counter() - started
+                            return result
+        except (OSError, websockets.ConnectionClosed):
+            pass
+        except asyncio.TimeoutError:
+            result["outcome"] = "timeout"
+            return result
+
+        # Our worker went away: carry on watching from one that's still up
+        others = [p for p in ports if p in alive and p != port]
+        if not others or result["reconnects"] >= 3:
+            return result
+        result["reconnects"] += 1
+        port = others[result["reconnects"] % len(others)]
+
+async def run_debate(client: httpx.AsyncClient, idx: int, ports: List[int], alive: set, viewers: int, stream: bool) -> List[Dict]:
+    home = ports[idx % len(ports)]
+    question = f"Should we add AI to product #{idx}?"
+    response = await client.post(
+        f"http://127.0.0.1:{home}/api/focus-groups/create",
+        json={"question": question, "persona_ids": PERSONA_IDS}
+    )
+    session_id = response.json()["id"]
+
+    started = time.perf_counter()
+    watchers = [
+        asyncio.create_task(watch(session_id, ports, alive, ports[(idx + k) % len(ports)], started))
+        for k in range(1, viewers)
+    ]
+    # Let the other viewers subscribe before the debate starts on a different worker
+    await asyncio.sleep(0.2)
+    start = {"action": "start", "question": question, "persona_ids": PERSONA_IDS, "mode": "hybrid", "stream": stream}
+    watchers.append(asyncio.create_task(watch(session_id, ports, alive, home, started, start)))
+    return await asyncio.gather(*watchers)
+
+def pct(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+async def main(args):
+    log_dir = tempfile.mkdtemp(prefix="fg-load-")
+    stub_port = args.base_port - 1
+    ports = [args.base_port + i for i in range(args.workers)]
+    alive = set(ports)
+
+    stub = uvicorn.Server(uvicorn.Config(create_app(args.latency), host="127.0.0.1", port=stub_port, log_level="warning"))
+    stub_task = asyncio.create_task(stub.serve())
+
+    env = dict(
+        os.environ,
+        ANTHROPIC_API_KEY="stub",
+        ANTHROPIC_BASE_URL=f"http://127.0.0.1:{stub_port}",
+        REDIS_URL=args.redis_url,
+        DEBATE_LEASE_TTL_SECONDS=str(args.lease_ttl),
+        # Every debate asks a similar question; measure the LLM path, not the cache
+        RESPONSE_CACHE_ENABLED="false"
+    )
+    procs = [start_worker(port, env, log_dir) for port in ports]
+
+    async def kill_worker():
+        await asyncio.sleep(args.kill_after)
+        print(f"Killing worker on port {ports[0]}")
+        alive.discard(ports[0])
+        procs[0].kill()
+
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            await asyncio.gather(*[wait_healthy(client, port) for port in ports])
+            await asyncio.sleep(0.5)
+
+            killer = asyncio.create_task(kill_worker()) if args.kill_after else None
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                run_debate(client, i, ports, alive, args.viewers, args.stream) for i in range(args.debates)
+            ])
+            elapsed = time.perf_counter() - start
+            if killer is not None:
+                killer.cancel()
+
+            calls = (await client.get(f"http://127.0.0.1:{stub_port}/stats")).json()["count"]
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+        stub.should_exit = True
+        await stub_task
+
+    viewers = [v for debate in results for v in debate]
+    completed = [d for d in results if any(v["outcome"] == "complete" for v in d)]
+    done_times = [max(v["done"] for v in d if v["done"] is not None) for d in completed]
+    first_frames = [v["first_frame"] for v in viewers if v["first_frame"] is not None]
+
+    print(f"workers={args.workers} debates={args.debates} viewers/debate={args.viewers} latency={args.latency:.2f}s")
+    print(f"wall clock:         {elapsed:.2f}s")
+    print(f"debates completed:  {len(completed)}/{len(results)} ({sum(any(v['resumed'] for v in d) for d in results)} resumed)")
+    print(f"viewers completed:  {sum(v['outcome'] == 'complete' for v in viewers)}/{len(viewers)} "
+          f"({sum(v['reconnects'] > 0 for v in viewers)} reconnected)")
+    print(f"LLM calls:          {calls} ({calls / max(1, len(results)):.1f} per debate)")
+    print(f"first frame p50/95: {pct(first_frames, 0.5):.2f}s / {pct(first_frames, 0.95):.2f}s")
+    print(f"debate done p50/95: {pct(done_times, 0.5):.2f}s / {pct(done_times, 0.95):.2f}s")
+    print(f"worker logs:        {log_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--debates", type=int, default=20)
+    parser.add_argument("--viewers", type=int, default=3, help="viewers per debate, spread across workers")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub LLM latency per call (s)")
+    parser.add_argument("--stream", action="store_true", help="stream token deltas")
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--lease-ttl", type=float, default=3.0)
+    parser.add_argument("--kill-after", type=float, default=0.0, help="SIGKILL worker 0 after this many seconds")
+    parser.add_argument("--base-port", type=int, default=8101)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Benchmark: sentiment scoring accuracy and speed.
+
+Scores the labeled fixture (benchmarks/fixtures/sentiment_labeled.jsonl)
+with the lexicon scorer and with the old substring word lists, checks
+that the single-text, NumPy batch and streaming (fed in random-sized
+deltas) paths agree, then times:
+- scoring one response,
+- feeding a streaming-sized delta,
+- batch throughput.
+
+Usage:
+    python -m benchmarks.sentiment --batch 20000
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Dict, List
+from app.core.sentiment import sentiment_scorer
+from app.models.schemas import SentimentType
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "sentiment_labeled.jsonl")
+
+def legacy_sentiment(text: str) -> SentimentType:
+    """The substring word-list check this scorer replaced"""
+    positive_words = ['great', 'love', 'amazing', 'yes', 'definitely', 'excellent', 'perfect', 'good']
+    negative_words = ['bad', 'hate', 'terrible', 'no', 'never', 'awful', 'wrong', 'problem']
+    text_lower = text.lower()
+    pos_count = sum(1 for w in positive_words if w in text_lower)
+    neg_count = sum(1 for w in negative_words if w in text_lower)
+    if pos_count > neg_count:
+        return SentimentType.POSITIVE
+    if neg_count > pos_count:
+        return SentimentType.NEGATIVE
+    return SentimentType.NEUTRAL
+
+def accuracy(rows: List[Dict], predictions: List[SentimentType]) -> str:
+    per_class = {}
+    for row, predicted in zip(rows, predictions):
+        hits, total = per_class.get(row["sentiment"], (0, 0))
+        per_class[row["sentiment"]] = (hits + (predicted.value == row["sentiment"]), total + 1)
+    correct = sum(hits for hits, _ in per_class.values())
+    classes = "  ".join(f"{label} {hits}/{total}" for label, (hits, total) in sorted(per_class.items()))
+    return f"{correct}/{len(rows)} ({correct / len(rows):.0%})  {classes}"
+
+def same(a, b) -> bool:
+    return (a.sentiment, a.confidence, a.hedges, a.boosters) == (b.sentiment, b.confidence, b.hedges, b.boosters) \
+        and abs(a.positive - b.positive) <= 1e-9 and abs(a.negative - b.negative) <= 1e-9
+
+def streamed(text: str, rng: random.Random):
+    """Score `text` fed in deltas of 1-12 characters, like a token stream"""
+    accumulator = sentiment_scorer.accumulator()
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 12)
+        accumulator.feed(text[i:i + size])
+        accumulator.current()
+        i += size
+    return accumulator.finish()
+
+def per_call_us(fn, arg, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main(batch: int, repeat: int):
+    with open(FIXTURE) as f:
+        rows = [json.loads(line) for line in f]
+    texts = [row["text"] for row in rows]
+
+    scored = [sentiment_scorer.score(text) for text in texts]
+    batched = sentiment_scorer.score_batch(texts)
+    mismatches = sum(not same(a, b) for a, b in zip(scored, batched))
+    rng = random.Random(0)
+    stream_mismatches = sum(not same(a, streamed(text, rng)) for a, text in zip(scored * 20, texts * 20))
+
+    print(f"fixture:            {len(rows)} labeled responses")
+    print(f"legacy accuracy:    {accuracy(rows, [legacy_sentiment(t) for t in texts])}")
+    print(f"lexicon accuracy:   {accuracy(rows, [s.sentiment for s in scored])}")
+    print(f"scalar vs batch:    {mismatches} mismatches")
+    print(f"scalar vs stream:   {stream_mismatches} mismatches")
+
+    response = max(texts, key=len)
+    print(f"score one response: {per_call_us(sentiment_scorer.score, response, repeat):.1f} us ({len(response)} chars)")
+    accumulator = sentiment_scorer.accumulator()
+    feed = lambda delta: (accumulator.feed(delta), accumulator.current())
+    print(f"feed one delta:     {per_call_us(feed, ' really good', repeat):.1f} us")
+    print(f"legacy per response:{per_call_us(legacy_sentiment, response, repeat):.1f} us")
+
+    corpus = (texts * (batch // len(texts) + 1))[:batch]
+    start = time.perf_counter()
+    sentiment_scorer.score_batch(corpus)
+    batch_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in corpus:
+        sentiment_scorer.score(text)
+    loop_seconds = time.perf_counter() - start
+    print(f"batch of {batch}:     {batch_seconds * 1000:.0f} ms ({batch / batch_seconds:,.0f}/s) vs {loop_seconds * 1000:.0f} ms one at a time")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=20000, help="responses in the batch throughput test")
+    parser.add_argument("--repeat", type=int, default=2000, help="iterations per single-text timing")
+    args = parser.parse_args()
+    main(args.batch, args.repeat)
@@ -0,0 +1,62 @@
+"""
+Stand-in for the Anthropic Messages API, for load tests that run real workers.
+
+Answers POST /v1/messages after a fixed latency, as SSE when the request
+asks to stream and as a plain JSON message otherwise. GET /stats reports
+how many completions were served. Point workers at it with
+ANTHROPIC_BASE_URL=http://127.0.0.1:<port>.
+"""
+import asyncio
+import json
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+REPLY = ["This ", "is ", "definitely ", "a ", "good ", "idea, ", "no ", "cap."]
+
+def create_app(latency: float, token_interval: float = 0.02) -> Starlette:
+    calls = {"count": 0}
+
+    async def messages(request: Request):
+        body = await request.json()
+        calls["count"] += 1
+        await asyncio.sleep(latency)
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": "msg_stub",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "stub"),
+                "content": [{"type": "text", "text": "".join(REPLY)}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 100, "output_tokens": len(REPLY)}
+            })
+
+        return StreamingResponse(_stream(body.get("model", "stub"), token_interval), media_type="text/event-stream")
+
+    async def stats(request: Request):
+        return JSONResponse(calls)
+
+    return Starlette(routes=[
+        Route("/v1/messages", messages, methods=["POST"]),
+        Route("/stats", stats)
+    ])
+
+async def _stream(model: str, token_interval: float):
+    yield _event("message_start", {"type": "message_start", "message": {
+        "id": "msg_stub", "type": "message", "role": "assistant", "model": model, "content": [],
+        "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": 100, "output_tokens": 1}
+    }})
+    yield _event("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+    for word in REPLY:
+        await asyncio.sleep(token_interval)
+        yield _event("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": word}})
+    yield _event("content_block_stop", {"type": "content_block_stop", "index": 0})
+    yield _event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": len(REPLY)}})
+    yield _event("message_stop", {"type": "message_stop"})
+
+def _event(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,59 @@
+"""
+Shared test setup
+
+Debates run on the deterministic fake LLM backend, Redis is fakeredis,
+and the stores that query the DB get a throwaway SQLite database per test.
+"""
+import asyncio
+import os
+import tempfile
+
+# Read by app.config at import, so set before anything imports the app
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "5")
+os.environ.setdefault("FAKE_LLM_LATENCY_DISTRIBUTION", "fixed")
+os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "2000")
+os.environ.setdefault("REPLAY_DIR", tempfile.mkdtemp(prefix="fg-replays-"))
+
+import fakeredis.aioredis
+import pytest
+from sqlalchemy import ARRAY, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from app.models import database, entities
+from app.services import persona_store, platform_stats, redis_client, session_store, trending
+
+# SQLite has no UUID or ARRAY types: store UUIDs as text and arrays as JSON
+compiles(UUID, "sqlite")(lambda type_, compiler, **kw: "CHAR(36)")
+for table in entities.Base.metadata.tables.values():
+    for column in table.c:
+        if isinstance(column.type, ARRAY):
+            column.type = JSON()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    """A fresh fakeredis server per test, behind the shared client"""
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_client, "_redis", redis)
+    return redis
+
+@pytest.fixture
+def sqlite_db(monkeypatch, tmp_path):
+    """A throwaway SQLite database in place of PostgreSQL (tables are created by init_db)
+
+    A file rather than :memory: so each session gets its own connection,
+    and background tasks' transactions can't roll back a request's.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    factory = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    monkeypatch.setattr(database, "engine", engine)
+    for module in (session_store, trending, persona_store, platform_stats):
+        monkeypatch.setattr(module, "SessionLocal", factory)
+    yield engine
+    # aiosqlite runs each connection on a non-daemon thread
+    asyncio.run(engine.dispose())
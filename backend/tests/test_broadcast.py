@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.services import broadcast
+from app.services.broadcast import BroadcastHub, HISTORY_PREFIX, SEQ_PREFIX
+from app.utils.serialization import loads
+
+pytestmark = pytest.mark.anyio
+
+def response(text: str) -> dict:
+    return {"type": "debate_response", "data": {"text": text}}
+
+def delta(text: str) -> dict:
+    return {"type": "debate_delta", "data": {"persona_id": "a", "wave": 1, "is_rebuttal": False, "delta": text}}
+
+async def test_publish_never_waits_on_redis(fake_redis, monkeypatch):
+    hub = BroadcastHub()
+    monkeypatch.setattr(broadcast, "get_redis", lambda: pytest.fail("publish touched Redis"))
+    # The session's first frame looks up where numbering left off; after that nothing waits
+    hub._next_seq["s"] = 0
+
+    for i in range(20):
+        await hub.publish("s", response(str(i)))
+    assert len(hub._outbox) == 20
+    hub._relayer.cancel()
+
+async def test_relay_pipelines_frames_and_keeps_deltas_out_of_history(fake_redis):
+    hub = BroadcastHub()
+    frames = [response("a"), delta("b"), delta("c"), response("bc"), {"type": "debate_complete", "data": {}}]
+    for frame in frames:
+        await hub.publish("s", frame)
+    await hub.close()
+
+    stored = [loads(item) for item in await fake_redis.zrange(HISTORY_PREFIX + "s", 0, -1)]
+    assert [frame["seq"] for frame in stored] == [0, 3, 4]
+    assert int(await fake_redis.get(SEQ_PREFIX + "s")) == 4
+    assert [frame["seq"] for frame, _ in hub._history["s"]] == [0, 3, 4]
+
+async def test_resume_reads_only_the_frames_after_last_seq(fake_redis):
+    publisher = BroadcastHub()
+    for i in range(10):
+        await publisher.publish("s", response(str(i)))
+    await publisher.close()
+
+    # Another worker has no local history and reads the Redis index
+    missed = await BroadcastHub()._history_after("s", 6)
+    assert [frame["seq"] for frame, _ in missed] == [7, 8, 9]
+    assert [encoded for _, encoded in missed] == [item.encode() for item in await fake_redis.zrange(HISTORY_PREFIX + "s", 7, 9)]
+
+async def test_history_is_capped(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "WS_RESUME_BUFFER_FRAMES", 5)
+    hub = BroadcastHub()
+    for i in range(12):
+        await hub.publish("s", response(str(i)))
+        await asyncio.sleep(0)
+    await hub.close()
+
+    assert [frame["seq"] for frame, _ in await BroadcastHub()._history_after("s", -1)] == [7, 8, 9, 10, 11]
+
+async def test_a_worker_taking_over_numbers_past_unrelayed_frames(fake_redis):
+    first = BroadcastHub()
+    for i in range(3):
+        await first.publish("s", response(str(i)))
+    await first.close()
+
+    frame = response("resumed")
+    await BroadcastHub().publish("s", frame)
+    assert frame["seq"] == 2 + 1 + settings.WS_RELAY_MAX_PENDING
+
+async def test_deltas_are_shed_when_the_relay_falls_behind(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "WS_RELAY_MAX_PENDING", 2)
+    hub = BroadcastHub()
+    hub._next_seq["s"] = 0
+    monkeypatch.setattr(hub, "_relay_loop", lambda: asyncio.sleep(3600))
+
+    for frame in (delta("a"), delta("b"), delta("c"), response("abc")):
+        await hub.publish("s", frame)
+    assert [loads(encoded)["type"] for _, _, encoded, _ in hub._outbox] == ["debate_delta", "debate_delta", "debate_response"]
+    hub._relayer.cancel()
+
+async def test_resume_after_a_takeover_spans_both_workers(fake_redis):
+    first = BroadcastHub()
+    for i in range(3):
+        await first.publish("s", response(str(i)))
+    await first.close()
+
+    second = BroadcastHub()
+    for i in range(2):
+        await second.publish("s", response(f"resumed {i}"))
+    # Frames from before the takeover come from Redis, this worker's from memory (relayed or not)
+    start = 3 + settings.WS_RELAY_MAX_PENDING
+    assert [frame["seq"] for frame, _ in await second._history_after("s", 0)] == [1, 2, start, start + 1]
+    assert [frame["seq"] for frame, _ in await second._history_after("s", start)] == [start + 1]
+    await second.close()
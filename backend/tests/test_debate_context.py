@@ -0,0 +1,39 @@
+from app.core.debate_context import CONTEXT_HEADER, DebateContext, estimate_tokens
+from app.models.schemas import SentimentType
+
+def text(i: int) -> str:
+    return f"Persona {i} opens with a point. Then a second, longer sentence that goes on about details {i} at length."
+
+def context(count: int, token_budget: int, recent_turns: int = 2) -> DebateContext:
+    built = DebateContext(token_budget=token_budget, recent_turns=recent_turns)
+    for i in range(count):
+        built.add(f"k{i}", f"P{i}", text(i), SentimentType.POSITIVE)
+    return built
+
+def parts(rendered: str) -> list:
+    assert rendered.startswith(CONTEXT_HEADER + "\n\n") and rendered.endswith("\n\n")
+    return rendered[len(CONTEXT_HEADER) + 2:-2].split("\n\n")
+
+def test_everything_verbatim_within_budget():
+    rendered = context(3, token_budget=1000).render(["k0", "k1", "k2"])
+    assert parts(rendered) == [f"P{i}: {text(i)}" for i in range(3)]
+
+def test_over_budget_keeps_recent_turns_and_compacts_older_ones():
+    built = context(8, token_budget=120)
+    rendered = built.render([f"k{i}" for i in range(8)])
+    shown = parts(rendered)
+
+    # Newest verbatim, then key points with the stance, then a note for what didn't fit
+    omitted = 8 - len(shown) + 1
+    assert shown[0] == f"({omitted} earlier responses not shown)"
+    assert shown[1:-2] == [f"P{i} (positive), in short: Persona {i} opens with a point." for i in range(omitted, 6)]
+    assert shown[-2:] == [f"P6: {text(6)}", f"P7: {text(7)}"]
+    assert 0 < omitted < 6
+    # Only the note can go past the budget
+    assert sum(estimate_tokens(part) for part in [CONTEXT_HEADER, *shown[1:]]) <= 120
+
+def test_a_wave_shares_one_rendered_context():
+    built = context(4, token_budget=120)
+    keys = ["k0", "k1", "k2", "k3"]
+    assert built.render(keys) is built.render(list(keys))
+    assert built.render([]) == ""
@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+from datetime import datetime
+import pytest
+from app.api.websocket.debate_stream import DebateStreamManager
+from app.config import settings
+from app.models.database import init_db
+from app.models.schemas import FocusGroupSession, SessionStatus
+from app.services import debate_registry as registry_module
+from app.services.broadcast import broadcast_hub
+from app.services.debate_registry import DebateRegistry
+from app.services.redis_client import get_redis
+from app.services.session_store import session_store
+from app.utils.serialization import dumps
+
+pytestmark = pytest.mark.anyio
+
+PERSONAS = ["the_skeptic", "soccer_mom", "gen_z_teen"]
+
+@pytest.fixture
+def worker(monkeypatch):
+    """Switch which worker the registry acts as"""
+    return lambda name: monkeypatch.setattr(registry_module, "WORKER_ID", name)
+
+async def test_only_one_worker_holds_a_debate(worker):
+    registry = DebateRegistry()
+    worker("a")
+    assert await registry.claim("s", {"question": "q"})
+    worker("b")
+    assert not await registry.claim("s", {"question": "q"})
+    assert await registry.orphans() == []
+
+    # Releasing someone else's lease does nothing
+    await DebateRegistry().release("s")
+    worker("a")
+    assert await registry.renew() == []
+
+async def test_an_expired_lease_is_taken_over(worker):
+    dead, alive = DebateRegistry(lease_ttl=0.05), DebateRegistry()
+    worker("dead")
+    assert await dead.claim("s", {"question": "q", "resumes": 0})
+    await asyncio.sleep(0.1)
+
+    worker("alive")
+    assert await alive.orphans() == [("s", {"question": "q", "resumes": 0})]
+    assert await alive.claim("s", {"question": "q", "resumes": 1})
+    assert await alive.orphans() == []
+
+    # The old owner finds out its lease is gone when it next renews
+    worker("dead")
+    assert await dead.renew() == ["s"]
+
+async def test_abandoned_debates_are_orphaned_at_once(worker):
+    registry = DebateRegistry()
+    worker("a")
+    await registry.claim("s", {"question": "q"})
+    assert await registry.abandon("s")
+    worker("b")
+    assert [session_id for session_id, _ in await registry.orphans()] == ["s"]
+
+async def running_session() -> str:
+    session_id = str(uuid.uuid4())
+    await session_store.create(FocusGroupSession(
+        id=session_id, session_key="k", question="Should we add AI?", selected_persona_ids=PERSONAS,
+        status=SessionStatus.RUNNING, created_at=datetime.utcnow()
+    ), mode="hybrid")
+    return session_id
+
+async def orphan(session_id: str, resumes: int):
+    """Leave a debate in the registry as a dead worker would"""
+    spec = {"question": "Should we add AI?", "persona_ids": PERSONAS, "mode": "hybrid", "stream": False, "rounds": None, "resumes": resumes, "tenant": "t"}
+    await get_redis().hset(DebateRegistry.RUNNING_KEY, session_id, dumps(spec))
+    return spec
+
+async def test_a_surviving_worker_resumes_the_debate(sqlite_db):
+    await init_db()
+    session_id = await running_session()
+    manager = DebateStreamManager()
+
+    await manager._take_over(session_id, await orphan(session_id, resumes=0))
+    await manager.running[session_id]
+
+    history = [frame["type"] for frame, _ in await broadcast_hub._history_after(session_id, -1)]
+    assert history[0] == "debate_resumed" and history[-1] == "debate_complete"
+    assert (await session_store.get(session_id)).status == SessionStatus.COMPLETED
+    assert await registry_module.debate_registry.orphans() == []
+    await session_store.flush()
+    await broadcast_hub.close()
+
+async def test_a_debate_that_keeps_losing_its_worker_is_failed(sqlite_db):
+    await init_db()
+    session_id = await running_session()
+    manager = DebateStreamManager()
+
+    await manager._take_over(session_id, await orphan(session_id, resumes=settings.DEBATE_MAX_RESUMES))
+
+    assert session_id not in manager.running
+    history = [frame for frame, _ in await broadcast_hub._history_after(session_id, -1)]
+    assert history[-1] == {"type": "error", "message": "Debate was interrupted", "seq": history[-1]["seq"]}
+    assert (await session_store.get(session_id)).status == SessionStatus.FAILED
+    assert await registry_module.debate_registry.orphans() == []
+    await session_store.flush()
+    await broadcast_hub.close()
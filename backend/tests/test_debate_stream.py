@@ -0,0 +1,156 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.websockets import WebSocketDisconnect
+from app.api.websocket.debate_stream import manager
+from app.main import app
+from app.models import entities
+from app.services.session_store import session_store
+
+PERSONAS = ["the_skeptic", "soccer_mom", "gen_z_teen", "boomer_dad"]
+QUESTION = "Should we add AI to our product?"
+
+@pytest.fixture
+def client(sqlite_db):
+    with TestClient(app) as client:
+        yield client
+
+def create(client: TestClient, is_public: bool = True) -> dict:
+    response = client.post("/api/focus-groups/create", json={"question": QUESTION, "persona_ids": PERSONAS, "is_public": is_public})
+    assert response.status_code == 200
+    return response.json()
+
+def frames(ws) -> list:
+    message = ws.receive_json()
+    return message["frames"] if message["type"] == "batch" else [message]
+
+def until_complete(ws, seen: list) -> list:
+    while not seen or seen[-1]["type"] != "debate_complete":
+        seen += frames(ws)
+        assert seen[-1]["type"] != "error", seen[-1]
+    return seen
+
+def start(ws):
+    ws.send_json({"action": "start", "question": QUESTION, "persona_ids": PERSONAS, "mode": "hybrid"})
+
+def test_private_debate_needs_the_session_key(client):
+    session = create(client, is_public=False)
+
+    for query in ("", "?key=wrong"):
+        with client.websocket_connect(f"/ws/debate/{session['id']}{query}") as ws:
+            assert ws.receive_json() == {"type": "error", "message": "This debate is private"}
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 1008
+
+    with client.websocket_connect(f"/ws/debate/{session['id']}?key={session['session_key']}") as ws:
+        start(ws)
+        assert until_complete(ws, [])[-1]["type"] == "debate_complete"
+
+def test_public_debate_and_new_sessions_are_open(client):
+    session = create(client)
+    with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+        start(ws)
+        until_complete(ws, [])
+
+    # Not created yet: whoever connects starts it
+    with client.websocket_connect(f"/ws/debate/{uuid.uuid4()}") as ws:
+        start(ws)
+        until_complete(ws, [])
+
+def test_every_viewer_gets_the_same_frames(client):
+    session = create(client)
+    with client.websocket_connect(f"/ws/debate/{session['id']}") as a, client.websocket_connect(f"/ws/debate/{session['id']}") as b:
+        start(a)
+        start(b)  # already running: ignored
+        seen_a, seen_b = until_complete(a, []), until_complete(b, [])
+
+    assert [frame["seq"] for frame in seen_a] == [frame["seq"] for frame in seen_b]
+    assert sum(frame["type"] == "debate_complete" for frame in seen_a) == 1
+
+def test_reconnect_with_last_seq_resumes_without_gaps(client):
+    session = create(client)
+    seen = []
+    with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+        start(ws)
+        while len(seen) < 2:
+            seen += frames(ws)
+
+    # The debate keeps running without viewers
+    last_seq = seen[-1]["seq"]
+    with client.websocket_connect(f"/ws/debate/{session['id']}?last_seq={last_seq}") as ws:
+        until_complete(ws, seen)
+
+    assert [frame["seq"] for frame in seen] == list(range(len(seen)))
+
+def test_last_seq_minus_one_replays_a_finished_debate(client):
+    session = create(client)
+    with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+        start(ws)
+        live = until_complete(ws, [])
+
+    with client.websocket_connect(f"/ws/debate/{session['id']}?last_seq=-1") as ws:
+        replayed = until_complete(ws, [])
+
+    assert replayed == live
+
+def test_a_session_runs_once_as_it_was_created(client):
+    session = create(client)
+    with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+        ws.send_json({"action": "start", "question": "Something else?", "persona_ids": ["the_optimist", "startup_founder"]})
+        live = until_complete(ws, [])
+
+    # Finished: starting it again is refused
+    assert not client.portal.call(manager.start_debate, session["id"], QUESTION, PERSONAS)
+    assert session["id"] not in manager.running
+
+    speakers = {frame["data"]["persona_id"] for frame in live if frame["type"] == "debate_response" and not frame["data"]["is_complete"]}
+    assert speakers == set(PERSONAS)
+    with client.websocket_connect(f"/ws/debate/{session['id']}?last_seq=-1") as ws:
+        assert until_complete(ws, []) == live
+
+@pytest.mark.parametrize("command", [
+    {"question": "Too short", "persona_ids": PERSONAS},
+    {"question": QUESTION * 40, "persona_ids": PERSONAS},
+    {"question": QUESTION, "persona_ids": PERSONAS[:1]},
+    {"question": QUESTION, "persona_ids": PERSONAS + ["the_optimist", "startup_founder", "corporate_vp"]},
+    {"question": QUESTION, "persona_ids": PERSONAS, "mode": "rounds", "rounds": {"persona_ids": [["the_skeptic"], ["the_optimist"]]}},
+    {"question": QUESTION, "persona_ids": PERSONAS, "mode": "rounds", "rounds": {"persona_ids": [[]]}},
+    # Valid on its own, but the session was created with other personas
+    {"question": QUESTION, "persona_ids": ["the_optimist", "startup_founder"], "mode": "rounds", "rounds": {"persona_ids": [["the_optimist"]]}}
+])
+def test_bad_start_commands_are_refused_before_any_llm_call(client, command):
+    session = create(client)
+    with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+        ws.send_json({"action": "start", **command})
+        error = ws.receive_json()
+
+    assert error["type"] == "error" and error["message"].startswith("Invalid start command")
+    assert session["id"] not in manager.running
+    assert client.get(f"/api/focus-groups/{session['id']}").json()["status"] == "pending"
+
+def test_finished_debate_is_stored(client, sqlite_db):
+    session = create(client)
+    with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+        start(ws)
+        live = until_complete(ws, [])
+
+    async def stored():
+        await session_store.flush()
+        async with async_sessionmaker(sqlite_db)() as db:
+            row = await db.get(entities.FocusGroupSession, uuid.UUID(session["id"]))
+            responses = (await db.scalars(
+                select(entities.PersonaResponse)
+                .where(entities.PersonaResponse.session_id == row.id)
+                .order_by(entities.PersonaResponse.response_order)
+            )).all()
+            return row, responses
+
+    # On the app's loop: the debate's last writes may still be queued
+    row, responses = client.portal.call(stored)
+    spoken = [frame["data"] for frame in live if frame["type"] == "debate_response" and not frame["data"]["is_complete"]]
+    assert row.status == "completed"
+    assert row.summary and row.transcript == spoken
+    assert [response.response_text for response in responses] == [data["text"] for data in spoken]
@@ -0,0 +1,120 @@
+import asyncio
+import time
+import anthropic
+import httpx
+import pytest
+from app.core.debate_orchestrator import DebateOrchestrator
+from app.core.fake_llm import FakeLLMBackend
+from app.services.llm_scheduler import LLMScheduler
+
+pytestmark = pytest.mark.anyio
+
+def fake_backend(**kwargs) -> FakeLLMBackend:
+    """Instant replies; failures only where asked for"""
+    return FakeLLMBackend(latency_ms=0, distribution="fixed", tokens_per_second=0, **kwargs)
+
+def status_error(cls, status: int):
+    response = httpx.Response(status, request=httpx.Request("POST", "http://fake-llm.local/v1/messages"))
+    return cls("error", response=response, body=None)
+
+async def test_tenants_take_turns():
+    scheduler = LLMScheduler(max_in_flight=1, tokens_per_minute=10**6, max_retries=0)
+    order = []
+    gate = asyncio.Event()
+
+    def call(tenant: str, i: int):
+        async def run():
+            order.append((tenant, i))
+            await gate.wait()
+        return run
+
+    # busy queues four calls before quiet queues two, while the only slot is held
+    busy = [asyncio.create_task(scheduler.run("busy", call("busy", i))) for i in range(4)]
+    await asyncio.sleep(0.01)
+    quiet = [asyncio.create_task(scheduler.run("quiet", call("quiet", i))) for i in range(2)]
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.gather(*busy, *quiet)
+
+    assert order == [
+        ("busy", 0), ("busy", 1), ("quiet", 0), ("busy", 2), ("quiet", 1), ("busy", 3)
+    ]
+
+async def test_in_flight_cap():
+    scheduler = LLMScheduler(max_in_flight=2, tokens_per_minute=10**6)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(scheduler.run(f"tenant-{i % 3}", call) for i in range(9)))
+    assert peak == 2
+    assert scheduler.stats()["completed"] == 9
+
+async def test_retries_transient_errors():
+    backend = fake_backend(error_rate=0.5, seed=3)
+    scheduler = LLMScheduler(max_in_flight=4, tokens_per_minute=10**6, max_retries=10, backoff_base=0.001, backoff_max=0.005)
+
+    replies = await asyncio.gather(*(
+        scheduler.run("tenant", lambda i=i: backend.complete("system", f"question {i}", 50, 5))
+        for i in range(10)
+    ))
+
+    assert all(replies)
+    stats = scheduler.stats()
+    assert stats["retries"] > 0
+    assert backend.calls == 10 + stats["retries"]
+    assert stats["in_flight"] == 0
+
+async def test_rate_limit_honours_retry_after_then_gives_up():
+    backend = fake_backend(rate_limit_rate=1.0, retry_after=0.05)
+    scheduler = LLMScheduler(max_in_flight=4, tokens_per_minute=10**6, max_retries=1)
+
+    start = time.monotonic()
+    with pytest.raises(anthropic.RateLimitError):
+        await scheduler.run("tenant", lambda: backend.complete("system", "question", 50, 5))
+
+    assert time.monotonic() - start >= 0.05
+    assert backend.calls == 2
+    assert scheduler.stats()["rate_limited"] == 2
+    assert scheduler.stats()["in_flight"] == 0
+
+async def test_client_errors_are_not_retried():
+    scheduler = LLMScheduler(max_retries=5)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise status_error(anthropic.BadRequestError, 400)
+
+    with pytest.raises(anthropic.BadRequestError):
+        await scheduler.run("tenant", call)
+    assert calls == 1
+
+def test_backoff_doubles_up_to_the_cap():
+    scheduler = LLMScheduler(backoff_base=1.0, backoff_max=8.0)
+    error = status_error(anthropic.InternalServerError, 500)
+    for attempt, ceiling in enumerate([1, 2, 4, 8, 8]):
+        for _ in range(20):
+            assert ceiling / 2 <= scheduler._retry_delay(error, attempt) <= ceiling
+
+async def test_debate_calls_are_queued_under_its_tenant(monkeypatch):
+    tenants = []
+
+    class RecordingScheduler(LLMScheduler):
+        async def run(self, tenant, call, estimated_tokens=0):
+            tenants.append(tenant)
+            return await super().run(tenant, call, estimated_tokens)
+
+    orchestrator = DebateOrchestrator()
+    orchestrator.scheduler = RecordingScheduler()
+    monkeypatch.setattr(orchestrator.cache, "enabled", False)
+    async for _ in orchestrator.run_debate("session-1", "Should we add AI?", ["the_skeptic", "soccer_mom"], mode="parallel", tenant="user-1"):
+        pass
+
+    assert tenants and set(tenants) == {"user-1"}
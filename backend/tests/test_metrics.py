@@ -0,0 +1,80 @@
+import re
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.metrics import MetricsRegistry
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+def until_complete(ws):
+    while True:
+        message = ws.receive_json()
+        if any(frame["type"] == "debate_complete" for frame in message.get("frames", [message])):
+            return
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("fg_test_requests_total", "Requests by outcome", ["outcome"])
+    depth = registry.gauge("fg_test_depth", "Queue depth")
+    lag = registry.gauge("fg_test_lag", "Read at scrape time", fn=lambda: 0.25)
+    seconds = registry.histogram("fg_test_seconds", "Call time", ["kind"], buckets=(0.1, 1.0))
+
+    requests.inc(outcome="ok")
+    requests.inc(2, outcome='say "hi"\n')
+    depth.inc(3)
+    depth.dec()
+    for value in (0.05, 0.1, 0.5, 7.0):
+        seconds.observe(value, kind="stream")
+
+    assert requests.value(outcome="ok") == 1
+    assert registry.render() == "\n".join([
+        "# HELP fg_test_requests_total Requests by outcome",
+        "# TYPE fg_test_requests_total counter",
+        'fg_test_requests_total{outcome="ok"} 1',
+        'fg_test_requests_total{outcome="say \\"hi\\"\\n"} 2',
+        "# HELP fg_test_depth Queue depth",
+        "# TYPE fg_test_depth gauge",
+        "fg_test_depth 2",
+        "# HELP fg_test_lag Read at scrape time",
+        "# TYPE fg_test_lag gauge",
+        "fg_test_lag 0.25",
+        "# HELP fg_test_seconds Call time",
+        "# TYPE fg_test_seconds histogram",
+        # Buckets are cumulative and inclusive of their upper bound
+        'fg_test_seconds_bucket{kind="stream",le="0.1"} 2',
+        'fg_test_seconds_bucket{kind="stream",le="1"} 3',
+        'fg_test_seconds_bucket{kind="stream",le="+Inf"} 4',
+        'fg_test_seconds_sum{kind="stream"} 7.65',
+        'fg_test_seconds_count{kind="stream"} 4',
+    ]) + "\n"
+
+def test_names_are_registered_once():
+    registry = MetricsRegistry()
+    registry.counter("fg_test_total", "Once")
+    with pytest.raises(ValueError):
+        registry.gauge("fg_test_total", "Twice")
+
+def test_scrape_after_a_debate(sqlite_db):
+    question, personas = "Should we add AI to our product?", ["the_skeptic", "soccer_mom"]
+    with TestClient(app) as client:
+        session = client.post("/api/focus-groups/create", json={"question": question, "persona_ids": personas}).json()
+        with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+            ws.send_json({"action": "start", "question": question, "persona_ids": personas, "mode": "parallel"})
+            until_complete(ws)
+        response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    values = {}
+    for line in response.text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        values[line.rsplit(" ", 1)[0]] = float(match.group(4))
+
+    assert values['fg_debates_total{mode="parallel",outcome="completed"}'] >= 1
+    assert values['fg_llm_requests_total{backend="FakeLLMBackend",kind="complete",outcome="ok"}'] >= 2
+    assert values['fg_debate_step_seconds_count{cached="false"}'] >= 2
+    assert values['fg_debate_duration_seconds_count{mode="parallel",outcome="completed"}'] == values[
+        'fg_debate_duration_seconds_bucket{mode="parallel",outcome="completed",le="+Inf"}'
+    ]
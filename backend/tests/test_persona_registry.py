@@ -0,0 +1,93 @@
+import json
+import os
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+from app.core.persona_engine import PersonaEngine, persona_registry
+from app.core.persona_registry import PersonaRegistry
+from app.main import app
+
+PIRATE = {"name": "Pete", "category": "fun", "description": "A pirate", "speaking_style": "Arr", "system_prompt": "You are Pete."}
+
+def write(path, templates):
+    with open(path, "w") as f:
+        json.dump(templates, f)
+    # Make sure the edit registers even within the filesystem's mtime granularity
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+@pytest.fixture
+def templates_file(tmp_path):
+    return str(tmp_path / "personas.json")
+
+def test_builtins_compile_once_into_immutable_records():
+    registry = PersonaRegistry(PersonaEngine.PERSONA_TEMPLATES, path="")
+    record = registry.get("the_skeptic")
+    assert registry.version == 1 and set(registry.ids()) == set(PersonaEngine.PERSONA_TEMPLATES)
+    with pytest.raises(AttributeError):
+        record.name = "Someone else"
+    assert record in registry.by_category(record.category)
+
+def test_reload_swaps_in_a_new_version(templates_file):
+    registry = PersonaRegistry(PersonaEngine.PERSONA_TEMPLATES, path=templates_file)
+    before = registry.current
+    skeptic = registry.get("the_skeptic")
+
+    write(templates_file, {"the_skeptic": {**PIRATE, "name": "Sam", "category": "personality"}, "pirate": PIRATE})
+    assert registry.reload()
+
+    assert registry.version == 2
+    assert registry.get("the_skeptic").name == "Sam" and registry.get("pirate").name == "Pete"
+    # Edited prompt, new fingerprint and tags; the old snapshot is untouched for debates still using it
+    assert registry.get("the_skeptic").fingerprint != skeptic.fingerprint
+    assert registry.current.etag != before.etag
+    assert before.by_id["the_skeptic"] is skeptic and "pirate" not in before.by_id
+
+def test_a_bad_file_keeps_the_current_version(templates_file):
+    registry = PersonaRegistry(PersonaEngine.PERSONA_TEMPLATES, path=templates_file)
+    write(templates_file, {"pirate": PIRATE})
+    registry.reload()
+
+    with open(templates_file, "w") as f:
+        f.write("{not json")
+    assert not registry.reload()
+    assert registry.version == 2 and registry.get("pirate") is not None
+
+    write(templates_file, ["not", "an", "object"])
+    assert not registry.reload()
+    assert registry.version == 2
+
+@pytest.mark.anyio
+async def test_edits_to_the_file_are_picked_up(templates_file):
+    registry = PersonaRegistry(PersonaEngine.PERSONA_TEMPLATES, path=templates_file)
+    registry.start(interval=0.01)
+    try:
+        write(templates_file, {"pirate": PIRATE})
+        with anyio.fail_after(2):
+            while registry.get("pirate") is None:
+                await anyio.sleep(0.01)
+        version = registry.version
+
+        # Unchanged file: no reload
+        await anyio.sleep(0.05)
+        assert registry.version == version
+    finally:
+        await registry.stop()
+
+def test_routes_serve_the_reloaded_version(templates_file, monkeypatch, sqlite_db):
+    # Put the shared registry back as it was afterwards
+    monkeypatch.setattr(persona_registry, "current", persona_registry.current)
+    monkeypatch.setattr(persona_registry, "path", templates_file)
+
+    with TestClient(app) as client:
+        before = client.get("/api/personas/")
+        assert client.get("/api/personas/", headers={"If-None-Match": before.headers["etag"]}).status_code == 304
+
+        write(templates_file, {"pirate": PIRATE})
+        persona_registry.reload()
+
+        after = client.get("/api/personas/", headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200
+        assert int(after.headers["x-persona-registry-version"]) == int(before.headers["x-persona-registry-version"]) + 1
+        assert after.json()["total"] == before.json()["total"] + 1
+        assert client.get("/api/personas/pirate").json()["system_prompt"] == "You are Pete."
@@ -0,0 +1,136 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.main import app
+from app.models import entities
+from app.models.database import init_db
+from app.models.schemas import PersonaCreate
+from app.services import persona_store as persona_store_module
+from app.services.persona_store import PersonaStore, persona_store
+
+PIRATE = {
+    "name": "Pete",
+    "slug": "pirate",
+    "category": "fun",
+    "description": "Salty",
+    "speaking_style": "Arr",
+    "system_prompt_template": "You are a pirate."
+}
+
+def persona(**fields) -> PersonaCreate:
+    return PersonaCreate(**{**PIRATE, **fields})
+
+@pytest.fixture
+async def store(sqlite_db):
+    await init_db()
+    return PersonaStore()
+
+@pytest.fixture
+def selects(sqlite_db) -> list:
+    statements = []
+    event.listen(
+        sqlite_db.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement) if statement.startswith("SELECT") else None
+    )
+    return statements
+
+@pytest.mark.anyio
+async def test_missing_slugs_are_loaded_in_one_query_then_cached(store, selects):
+    await store.create(persona())
+    await store.create(persona(slug="ninja", name="Nin"))
+    store._cache.clear()
+
+    found = await store.get_many(["pirate", "ninja", "ghost", "pirate"])
+    assert sorted(found) == ["ninja", "pirate"]
+    assert len(selects) == 1
+
+    # Hits, including the remembered miss
+    assert sorted(await store.get_many(["pirate", "ninja", "ghost"])) == ["ninja", "pirate"]
+    assert len(selects) == 1
+
+@pytest.mark.anyio
+async def test_unknown_slugs_are_only_remembered_briefly(store, selects, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(persona_store_module.time, "monotonic", lambda: now[0])
+
+    assert await store.get("ghost") is None
+    assert await store.get("ghost") is None
+    assert len(selects) == 1
+
+    now[0] += PersonaStore.NEGATIVE_TTL_SECONDS + 1
+    await store.create(persona(slug="ghost"))
+    store.invalidate("ghost")
+    assert (await store.get("ghost")).slug == "ghost"
+
+@pytest.mark.anyio
+async def test_update_replaces_fields_and_the_cached_record(store):
+    await store.create(persona())
+    assert (await store.get("pirate")).name == "Pete"
+
+    updated = await store.update("pirate", persona(name="Captain", slug="ignored"))
+    assert updated.slug == "pirate" and updated.name == "Captain"
+    assert (await store.get("pirate")).name == "Captain"
+    assert await store.update("nobody", persona()) is None
+
+@pytest.mark.anyio
+async def test_usage_is_flushed_as_one_batched_update(store, sqlite_db):
+    pirate = await store.create(persona())
+    ninja = await store.create(persona(slug="ninja"))
+    for _ in range(3):
+        store.record_usage([pirate, ninja])
+    store.record_usage([pirate])
+
+    updates = []
+    event.listen(
+        sqlite_db.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: updates.append(statement) if statement.startswith("UPDATE") else None
+    )
+    await store.flush_usage()
+    await store.flush_usage()  # nothing pending
+
+    assert len(updates) == 1
+    async with async_sessionmaker(sqlite_db)() as db:
+        counts = {row.slug: row.usage_count for row in await db.scalars(select(entities.Persona))}
+    assert counts == {"pirate": 4, "ninja": 3}
+
+@pytest.mark.anyio
+async def test_failed_usage_flush_keeps_the_counts(store, monkeypatch):
+    pirate = await store.create(persona())
+    store.record_usage([pirate, pirate])
+
+    def broken():
+        raise OperationalError("UPDATE", {}, Exception("database is down"))
+    monkeypatch.setattr(persona_store_module, "SessionLocal", broken)
+    await store.flush_usage()
+
+    assert store._usage == {"pirate": 2}
+
+def test_routes(sqlite_db, monkeypatch):
+    persona_store._cache.clear()
+    with TestClient(app) as client:
+        created = client.post("/api/personas/", json=PIRATE)
+        assert created.status_code == 200 and created.json()["id"] == "pirate"
+
+        assert client.post("/api/personas/", json=PIRATE).status_code == 409
+        assert client.post("/api/personas/", json={**PIRATE, "slug": "the_skeptic"}).status_code == 409
+
+        fetched = client.get("/api/personas/pirate")
+        assert fetched.json()["name"] == "Pete"
+        assert client.get("/api/personas/pirate", headers={"If-None-Match": fetched.headers["etag"]}).status_code == 304
+
+        edited = client.put("/api/personas/pirate", json={**PIRATE, "name": "Captain"})
+        assert edited.json()["name"] == "Captain"
+        assert edited.headers["etag"] != fetched.headers["etag"]
+        assert client.get("/api/personas/pirate").json()["name"] == "Captain"
+
+        assert client.get("/api/personas/ghost").status_code == 404
+        assert client.put("/api/personas/the_skeptic", json=PIRATE).status_code == 404
+
+        def broken():
+            raise ConnectionError("database is down")
+        monkeypatch.setattr(persona_store_module, "SessionLocal", broken)
+        assert client.post("/api/personas/", json={**PIRATE, "slug": "ninja"}).status_code == 503
+        assert client.put("/api/personas/pirate", json=PIRATE).status_code == 503
+    persona_store._cache.clear()
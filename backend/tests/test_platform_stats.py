@@ -0,0 +1,132 @@
+import random
+from collections import Counter
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.models import entities
+from app.models.database import init_db
+from app.models.schemas import SessionStatus
+from app.services import platform_stats
+from app.services.platform_stats import PlatformStats
+
+pytestmark = pytest.mark.anyio
+
+HOUR = 3600.0
+
+class Clock:
+    def __init__(self):
+        # 2027-01-15 08:00 UTC
+        self.now = 1_800_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(platform_stats, "time", clock)
+    return clock
+
+async def test_unique_users_are_within_the_hyperloglog_error(clock):
+    stats = PlatformStats()
+    for batch in range(10):
+        for i in range(2000):
+            # Every client starts a few debates, spread over several flushes
+            stats.record_debate(["the_skeptic"], f"client-{(batch * 2000 + i) % 5000}")
+        await stats.flush()
+
+    # Redis HLLs have a 0.81% standard error; allow for three of them
+    assert stats.snapshot()["total_users"] == pytest.approx(5000, rel=0.025)
+    assert stats.snapshot()["total_debates"] == 20000
+
+async def test_persona_sketch_stays_within_the_space_saving_bound(clock, fake_redis):
+    stats = PlatformStats()
+    stats.sketch_size = 20
+    rng = random.Random(7)
+    personas = [f"persona_{i}" for i in range(200)]
+    weights = [1 / (rank + 1) for rank in range(len(personas))]
+
+    true = Counter()
+    for _ in range(10):
+        for _ in range(300):
+            picked = set(rng.choices(personas, weights, k=3))
+            true.update(picked)
+            stats.record_debate(picked)
+        await stats.flush()
+
+    sketch = dict(await fake_redis.zrange(PlatformStats.PREFIX + "personas", 0, -1, withscores=True))
+    picks = sum(true.values())
+    error = picks / stats.sketch_size
+    assert len(sketch) == stats.sketch_size
+    # Never under, and over by at most picks / capacity
+    for persona_id, estimate in sketch.items():
+        assert true[persona_id] <= estimate <= true[persona_id] + error
+    # Anything picked more than that often is kept
+    assert {persona_id for persona_id, count in true.items() if count > error} <= set(sketch)
+    assert stats.snapshot()["most_popular_persona"] == true.most_common(1)[0][0]
+
+async def test_workers_add_up_and_windows_roll(clock):
+    a, b = PlatformStats(), PlatformStats()
+    for _ in range(3):
+        a.record_debate(["the_skeptic"], "alice")
+    b.record_debate(["soccer_mom"], "bob")
+    await a.flush()
+    await b.flush()
+    await a.flush()
+    assert a.snapshot() == b.snapshot()
+    assert (a.snapshot()["total_debates"], a.snapshot()["debates_today"], a.snapshot()["debates_last_24h"]) == (4, 4, 4)
+    assert a.snapshot()["total_users"] == 2
+
+    # Next day, still inside 24 hours
+    clock.now += 18 * HOUR
+    a.record_debate(["the_skeptic"], "alice")
+    await a.flush()
+    assert (a.snapshot()["total_debates"], a.snapshot()["debates_today"], a.snapshot()["debates_last_24h"]) == (5, 1, 5)
+
+    # Same day; the first four are more than 24 hours old
+    clock.now += 12 * HOUR
+    await a.flush()
+    assert (a.snapshot()["total_debates"], a.snapshot()["debates_today"], a.snapshot()["debates_last_24h"]) == (5, 1, 1)
+
+    clock.now += 24 * HOUR
+    await a.flush()
+    assert (a.snapshot()["total_debates"], a.snapshot()["debates_today"], a.snapshot()["debates_last_24h"]) == (5, 0, 0)
+
+async def test_without_redis_each_worker_serves_its_own_counts(clock):
+    stats = PlatformStats()
+    stats._redis_down_until = float("inf")
+    stats.record_debate(["the_skeptic", "soccer_mom"], "alice")
+    stats.record_debate(["the_skeptic"], "bob")
+    await stats.flush()
+
+    snapshot = stats.snapshot()
+    assert (snapshot["total_debates"], snapshot["total_users"], snapshot["debates_today"]) == (2, 2, 2)
+    assert snapshot["popular_personas"] == [{"persona_id": "the_skeptic", "debates": 2}, {"persona_id": "soccer_mom", "debates": 1}]
+
+async def test_reconcile_raises_counters_but_never_lowers_them(sqlite_db, clock, fake_redis):
+    await init_db()
+    async with async_sessionmaker(sqlite_db)() as db:
+        db.add_all([
+            entities.FocusGroupSession(
+                session_key=f"key{i}",
+                question="Should we add AI to our product?",
+                selected_persona_ids=["the_skeptic"],
+                status=SessionStatus.COMPLETED.value if i < 6 else SessionStatus.PENDING.value
+            )
+            for i in range(8)
+        ])
+        await db.commit()
+
+    stats = PlatformStats()
+    stats.record_debate(["the_skeptic"], "alice")
+    await stats.flush()
+    await stats.reconcile()
+    assert stats.snapshot()["total_debates"] == 6
+
+    # Redis is ahead of the (written-behind) DB: left alone
+    await fake_redis.delete(PlatformStats.RECONCILE_LOCK_KEY)
+    await fake_redis.set(PlatformStats.PREFIX + "debates", 50)
+    await stats.reconcile()
+    assert stats.snapshot()["total_debates"] == 50
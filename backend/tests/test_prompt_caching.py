@@ -0,0 +1,49 @@
+import pytest
+from app.core.debate_orchestrator import DebateOrchestrator
+from app.core.fake_llm import FakeLLMBackend
+from app.core.llm_client import ClaudeClient, TokenUsage
+from app.core.persona_engine import PersonaEngine, persona_registry
+
+pytestmark = pytest.mark.anyio
+
+def test_static_prefix_is_one_cached_block():
+    engine = PersonaEngine()
+    persona = persona_registry.get("the_skeptic")
+
+    first = engine.build_system_blocks(persona, "Should we add AI?")
+    second = engine.build_system_blocks(persona, "Is remote work here to stay?", context="Earlier: it depends.")
+
+    assert first[0] is second[0] is persona.prefix_block
+    assert first[0]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in first[1]
+    # Same prompt text as the single-string form
+    assert first[0]["text"] + first[1]["text"] == engine.build_prompt(persona, "Should we add AI?")
+
+async def test_repeat_calls_read_the_prefix_from_cache():
+    engine = PersonaEngine()
+    persona = persona_registry.get("the_skeptic")
+    client = ClaudeClient(backend=FakeLLMBackend(latency_ms=0, distribution="fixed", tokens_per_second=0))
+
+    first, second = TokenUsage(), TokenUsage()
+    await client.get_completion(engine.build_system_blocks(persona, "Should we add AI?"), "Go", usage=first)
+    await client.get_completion(engine.build_system_blocks(persona, "Is remote work here to stay?"), "Go", usage=second)
+
+    assert first.cache_creation_input_tokens > 0 and first.cache_read_input_tokens == 0
+    assert second.cache_read_input_tokens == first.cache_creation_input_tokens
+    assert second.cache_creation_input_tokens == 0
+
+async def test_debate_stats_report_cache_reads(monkeypatch):
+    orchestrator = DebateOrchestrator()
+    monkeypatch.setattr(orchestrator.cache, "enabled", False)
+
+    responses = [
+        response async for response in orchestrator.run_debate(
+            "session-1", "Should we add AI?", ["the_skeptic", "soccer_mom", "gen_z_teen", "boomer_dad"], mode="hybrid"
+        )
+    ]
+
+    tokens = responses[-1].stats["tokens"]
+    assert responses[-1].is_complete
+    # Rebuttals reuse their persona's prefix, so it's read back from cache
+    assert tokens["cache_read_input_tokens"] > 0
+    assert tokens["cache_creation_input_tokens"] > 0
@@ -0,0 +1,118 @@
+import json
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.api.websocket.debate_stream import manager
+from app.main import app
+from app.services import event_log
+from app.services.event_log import event_log_store
+
+PERSONAS = ["the_skeptic", "soccer_mom", "gen_z_teen"]
+QUESTION = "Should we add AI to our product?"
+
+@pytest.fixture
+def client(sqlite_db):
+    with TestClient(app) as client:
+        yield client
+
+def debated(client: TestClient, is_public: bool = True) -> dict:
+    """A created session whose debate has run to the end"""
+    session = client.post("/api/focus-groups/create", json={"question": QUESTION, "persona_ids": PERSONAS, "is_public": is_public}).json()
+    client.portal.call(manager.stream_debate, session["id"], QUESTION, PERSONAS)
+    return session
+
+def test_private_replay_needs_the_session_key(client):
+    session = debated(client, is_public=False)
+
+    for query in ("", "?key=wrong"):
+        assert client.get(f"/api/replays/{session['id']}{query}").status_code == 403
+
+    response = client.get(f"/api/replays/{session['id']}?key={session['session_key']}")
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("private,")
+
+def test_public_replay_is_open_and_shared_cacheable(client):
+    session = debated(client)
+    response = client.get(f"/api/replays/{session['id']}")
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public,")
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+def write_log(client: TestClient, monkeypatch, events: int = 50, close: bool = True) -> str:
+    """A log with one event every 100ms"""
+    clock = Clock()
+    monkeypatch.setattr(event_log, "time", clock)
+    session_id = uuid.uuid4().hex
+
+    async def write():
+        log = event_log_store.open(session_id)
+        for i in range(events):
+            log.append("response", {"text": f"event {i}"})
+            clock.now += 0.1
+        if close:
+            await log.close()
+        else:
+            await log.flush()
+
+    client.portal.call(write)
+    return session_id
+
+def lines(body: bytes) -> list:
+    return [json.loads(line) for line in body.splitlines()]
+
+def test_finished_replay_is_cacheable_by_etag(client, monkeypatch):
+    session_id = write_log(client, monkeypatch)
+    response = client.get(f"/api/replays/{session_id}")
+    assert response.status_code == 200
+    assert [event["seq"] for event in lines(response.content)] == list(range(50))
+    assert response.headers["accept-ranges"] == "bytes"
+
+    etag = response.headers["etag"]
+    cached = client.get(f"/api/replays/{session_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    # A different starting point is a different representation
+    assert client.get(f"/api/replays/{session_id}?from_ms=1000").headers["etag"] != etag
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=100-", 100, None),
+    ("bytes=-50", -50, None),
+    ("bytes=10-99999999", 10, None)
+])
+def test_byte_ranges(client, monkeypatch, header, start, end):
+    session_id = write_log(client, monkeypatch)
+    full = client.get(f"/api/replays/{session_id}").content
+    expected = full[start:end + 1 if end is not None else None]
+
+    response = client.get(f"/api/replays/{session_id}", headers={"Range": header})
+    assert response.status_code == 206
+    assert response.content == expected
+    first = start if start >= 0 else len(full) + start
+    assert response.headers["content-range"] == f"bytes {first}-{first + len(expected) - 1}/{len(full)}"
+
+@pytest.mark.parametrize("header", ["bytes=5-2", "bytes=999999-", "items=0-1", "bytes=-"])
+def test_unsatisfiable_ranges(client, monkeypatch, header):
+    session_id = write_log(client, monkeypatch)
+    assert client.get(f"/api/replays/{session_id}", headers={"Range": header}).status_code == 416
+
+def test_from_ms_seeks_into_the_log(client, monkeypatch):
+    session_id = write_log(client, monkeypatch)
+    events = lines(client.get(f"/api/replays/{session_id}?from_ms=2050").content)
+    assert [event["seq"] for event in events] == list(range(21, 50))
+    assert event_log_store.seek_offset(session_id, 2050) > 0
+
+def test_running_debate_is_streamed_uncached(client, monkeypatch):
+    session_id = write_log(client, monkeypatch, events=10, close=False)
+    response = client.get(f"/api/replays/{session_id}?from_ms=500")
+    assert response.headers["cache-control"] == "no-cache" and "etag" not in response.headers
+    assert [event["seq"] for event in lines(response.content)] == list(range(5, 10))
+
+def test_unknown_replay(client):
+    assert client.get(f"/api/replays/{uuid.uuid4().hex}").status_code == 404
+    assert client.get("/api/replays/not..safe").status_code == 404
@@ -0,0 +1,80 @@
+import pytest
+from app.services.response_cache import RedisCacheBackend, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+QUESTION = "Should we add AI to our product?"
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache()
+    cache.enabled = True
+    cache.similarity_threshold = 0.0
+    cache.redis = RedisCacheBackend(60)
+    return cache
+
+async def test_exact_hit(cache, fake_redis):
+    key = cache.make_key("the_skeptic", QUESTION, "", 300)
+    assert await cache.get(key) == (None, False)
+
+    await cache.set(key, "Prove it works first.", 812.0)
+
+    assert await cache.get(key) == ({"text": "Prove it works first.", "latency_ms": 812.0}, False)
+    assert await fake_redis.exists(RedisCacheBackend.PREFIX + key.digest)
+
+async def test_question_is_normalized(cache):
+    await cache.set(cache.make_key("the_skeptic", QUESTION, "", 300), "Prove it works first.", 812.0)
+
+    entry, similar = await cache.get(cache.make_key("the_skeptic", "  should we add ai to our PRODUCT ", "", 300))
+    assert entry["text"] == "Prove it works first."
+    assert not similar
+
+@pytest.mark.parametrize("persona_id, context, max_tokens, kind", [
+    ("soccer_mom", "", 300, "response"),
+    ("the_skeptic", "Earlier: prices went up.", 300, "response"),
+    ("the_skeptic", "", 150, "response"),
+    ("the_skeptic", "", 300, "rebuttal"),
+])
+async def test_rest_of_the_key_must_match(cache, persona_id, context, max_tokens, kind):
+    await cache.set(cache.make_key("the_skeptic", QUESTION, "", 300), "Prove it works first.", 812.0)
+
+    assert await cache.get(cache.make_key(persona_id, QUESTION, context, max_tokens, kind)) == (None, False)
+
+async def test_similarity_tier_is_off_by_default(cache):
+    await cache.set(cache.make_key("the_skeptic", QUESTION, "", 300), "Prove it works first.", 812.0)
+
+    assert await cache.get(cache.make_key("the_skeptic", "Should we add AI to our products?", "", 300)) == (None, False)
+
+async def test_similar_question_above_threshold(cache):
+    cache.similarity_threshold = 0.85
+    await cache.set(cache.make_key("the_skeptic", QUESTION, "", 300), "Prove it works first.", 812.0)
+
+    # ~0.91 trigram similarity
+    entry, similar = await cache.get(cache.make_key("the_skeptic", "Should we add AI to our products?", "", 300))
+    assert entry["text"] == "Prove it works first."
+    assert similar
+
+    # ~0.73, below the threshold
+    assert await cache.get(cache.make_key("the_skeptic", "should we add ai to the product", "", 300)) == (None, False)
+    # Similar question, but another persona's bucket
+    assert await cache.get(cache.make_key("soccer_mom", "Should we add AI to our products?", "", 300)) == (None, False)
+
+async def test_falls_back_to_memory_without_redis(cache, monkeypatch):
+    async def unreachable(*args, **kwargs):
+        raise ConnectionError("redis down")
+    monkeypatch.setattr(cache.redis, "get", unreachable)
+    monkeypatch.setattr(cache.redis, "set", unreachable)
+
+    key = cache.make_key("the_skeptic", QUESTION, "", 300)
+    await cache.set(key, "Prove it works first.", 812.0)
+
+    assert (await cache.get(key))[0]["text"] == "Prove it works first."
+    assert await cache.memory.get(key.digest) is not None
+
+async def test_disabled_cache_stores_nothing(cache):
+    cache.enabled = False
+    key = cache.make_key("the_skeptic", QUESTION, "", 300)
+    await cache.set(key, "Prove it works first.", 812.0)
+
+    cache.enabled = True
+    assert await cache.get(key) == (None, False)
@@ -0,0 +1,39 @@
+import json
+import random
+from collections import Counter
+import pytest
+from benchmarks.sentiment import FIXTURE, legacy_sentiment, same, streamed
+from app.core.sentiment import sentiment_scorer
+
+@pytest.fixture(scope="module")
+def labeled():
+    with open(FIXTURE) as f:
+        return [json.loads(line) for line in f]
+
+def test_accuracy_on_labeled_fixture(labeled):
+    predicted = [sentiment_scorer.score(row["text"]).sentiment.value for row in labeled]
+    correct = Counter(row["sentiment"] for row, label in zip(labeled, predicted) if label == row["sentiment"])
+    totals = Counter(row["sentiment"] for row in labeled)
+
+    assert sum(correct.values()) / len(labeled) >= 0.9
+    for label, total in totals.items():
+        assert correct[label] / total >= 0.85, label
+
+def test_beats_the_word_lists_it_replaced(labeled):
+    lexicon = sum(sentiment_scorer.score(row["text"]).sentiment.value == row["sentiment"] for row in labeled)
+    legacy = sum(legacy_sentiment(row["text"]).value == row["sentiment"] for row in labeled)
+    assert lexicon > legacy
+
+def test_batch_matches_one_at_a_time(labeled):
+    texts = [row["text"] for row in labeled]
+    for single, batched in zip((sentiment_scorer.score(text) for text in texts), sentiment_scorer.score_batch(texts)):
+        assert same(single, batched)
+
+def test_streamed_deltas_match_the_full_text(labeled):
+    rng = random.Random(0)
+    for row in labeled:
+        assert same(sentiment_scorer.score(row["text"]), streamed(row["text"], rng)), row["text"]
+
+def test_confidence_is_a_probability(labeled):
+    for row in labeled:
+        assert 0.0 <= sentiment_scorer.score(row["text"]).confidence <= 1.0
@@ -0,0 +1,122 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.main import app
+from app.models import entities
+from app.models.database import init_db
+from app.models.schemas import FocusGroupSession, SessionStatus
+from app.services.session_store import SessionStore, decode_cursor, encode_cursor
+
+BASE = datetime(2026, 1, 1, 12, 0, 0, 123456)
+
+@pytest.fixture
+async def sessions(sqlite_db):
+    """25 stored sessions, three to each created_at so pages split ties"""
+    await init_db()
+    rows = [
+        entities.FocusGroupSession(
+            id=uuid.uuid4(),
+            session_key=f"key{i}",
+            question=f"Question {i}?",
+            selected_persona_ids=["the_skeptic"],
+            status=SessionStatus.COMPLETED.value if i % 2 else SessionStatus.PENDING.value,
+            is_public=i % 4 != 0,
+            created_at=BASE + timedelta(minutes=i // 3)
+        )
+        for i in range(25)
+    ]
+    async with async_sessionmaker(sqlite_db, expire_on_commit=False)() as db:
+        db.add_all(rows)
+        await db.commit()
+    return sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)
+
+async def all_pages(store: SessionStore, limit: int, filters=(None, None, None, None)) -> list:
+    listed, after = [], None
+    while True:
+        page, next_cursor, _, _ = await store.list_recent(limit, after, filters)
+        listed += page
+        if next_cursor is None:
+            return listed
+        after = decode_cursor(next_cursor)
+
+def make_session(created_at: datetime, **fields) -> FocusGroupSession:
+    return FocusGroupSession(
+        id=str(uuid.uuid4()),
+        session_key="k",
+        question="New question?",
+        selected_persona_ids=["the_skeptic"],
+        status=SessionStatus.PENDING,
+        created_at=created_at,
+        **fields
+    )
+
+def test_cursor_round_trip():
+    session = make_session(BASE)
+    assert decode_cursor(encode_cursor(session)) == (BASE, uuid.UUID(session.id))
+
+@pytest.mark.parametrize("cursor", ["", "garbage", "bm90LWEtY3Vyc29y"])
+def test_bad_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 25, 100])
+async def test_pages_cover_every_session_once_in_order(sessions, limit):
+    listed = await all_pages(SessionStore(), limit)
+    assert [session.id for session in listed] == [str(row.id) for row in sessions]
+
+@pytest.mark.anyio
+async def test_filtered_pages_and_total(sessions):
+    store = SessionStore()
+    filters = (True, None, None, SessionStatus.COMPLETED)
+    expected = [str(row.id) for row in sessions if row.is_public and row.status == "completed"]
+
+    assert [session.id for session in await all_pages(store, 2, filters)] == expected
+    _, _, total, estimated = await store.list_recent(2, None, filters)
+    assert (total, estimated) == (len(expected), False)
+
+@pytest.mark.anyio
+async def test_unflushed_sessions_are_merged_in(sessions):
+    store = SessionStore()
+    newest = make_session(sessions[0].created_at + timedelta(minutes=1))
+    tied = make_session(sessions[4].created_at)
+    await store.create(newest, mode="hybrid")
+    await store.create(tied, mode="hybrid")
+
+    page, _, total, _ = await store.list_recent(3)
+    assert page[0].id == newest.id
+    assert total == len(sessions) + 2
+
+    before_flush = [session.id for session in await all_pages(store, 4)]
+    await store.flush()
+    after_flush = [session.id for session in await all_pages(store, 4)]
+    assert before_flush == after_flush
+    assert len(set(after_flush)) == len(sessions) + 2
+
+def test_listing_route_rejects_bad_input(sqlite_db):
+    with TestClient(app) as client:
+        assert client.get("/api/focus-groups/?cursor=garbage").status_code == 400
+        assert client.get("/api/focus-groups/?user_id=nope").status_code == 400
+        assert client.get("/api/focus-groups/?limit=0").status_code == 422
+        assert client.get("/api/focus-groups/?limit=5").status_code == 200
+
+def test_routes_never_show_session_keys_or_private_sessions(sqlite_db):
+    with TestClient(app) as client:
+        created = [
+            client.post("/api/focus-groups/create", json={
+                "question": f"Question number {i}?", "persona_ids": ["the_skeptic", "soccer_mom"], "is_public": i % 2 == 0
+            }).json()
+            for i in range(4)
+        ]
+        assert all("session_key" in session for session in created)
+
+        listed = client.get("/api/focus-groups/?limit=10&is_public=false").json()
+        assert [session["id"] for session in listed["sessions"]] == [created[2]["id"], created[0]["id"]]
+        assert listed["total"] == 2
+        assert not any("session_key" in session for session in listed["sessions"])
+
+        for session in created:
+            detail = client.get(f"/api/focus-groups/{session['id']}").json()
+            assert detail["id"] == session["id"] and "session_key" not in detail
@@ -0,0 +1,132 @@
+import uuid
+from datetime import datetime
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.models import entities
+from app.models.database import init_db
+from app.models.schemas import DebateResponse, FocusGroupSession, SentimentType, SessionStatus
+from app.services.session_store import SessionStore
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def db(sqlite_db):
+    await init_db()
+    return async_sessionmaker(sqlite_db, expire_on_commit=False)
+
+def new_session(session_key: str = None) -> FocusGroupSession:
+    return FocusGroupSession(
+        id=str(uuid.uuid4()),
+        session_key=session_key or str(uuid.uuid4())[:12],
+        question="Should we add AI?",
+        selected_persona_ids=["the_skeptic", "soccer_mom"],
+        status=SessionStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+def response(session: FocusGroupSession, persona_id: str = "the_skeptic", text: str = "No.") -> DebateResponse:
+    return DebateResponse(
+        session_id=session.id, persona_id=persona_id, persona_name=persona_id, text=text,
+        sentiment=SentimentType.NEGATIVE, confidence_score=0.8, timestamp=datetime.utcnow()
+    )
+
+async def stored(db, session: FocusGroupSession):
+    """(session row or None, its response texts)"""
+    async with db() as conn:
+        row = await conn.get(entities.FocusGroupSession, uuid.UUID(session.id))
+        texts = (await conn.scalars(
+            select(entities.PersonaResponse.response_text)
+            .where(entities.PersonaResponse.session_id == uuid.UUID(session.id))
+            .order_by(entities.PersonaResponse.response_order)
+        )).all()
+    return row, list(texts)
+
+async def test_writes_are_queued_until_flushed(db):
+    store = SessionStore()
+    session = new_session()
+    await store.create(session, mode="hybrid")
+    store.mark_running(session.id, "hybrid")
+    store.record_response(response(session), order=0)
+    store.record_response(response(session, "soccer_mom", "Yes."), order=1)
+    store.complete(session.id, [{"text": "No."}, {"text": "Yes."}], extra={"token_usage": 42})
+
+    assert await stored(db, session) == (None, [])
+    # Readable everywhere meanwhile: from this worker's cache, and other workers via Redis
+    assert (await store.get(session.id)).status == SessionStatus.COMPLETED
+    assert (await SessionStore().get(session.id)).status == SessionStatus.COMPLETED
+
+    await store.flush()
+    row, texts = await stored(db, session)
+    assert (row.status, row.debate_mode, row.token_usage) == ("completed", "hybrid", 42)
+    assert row.transcript == [{"text": "No."}, {"text": "Yes."}]
+    assert texts == ["No.", "Yes."]
+
+async def test_a_transient_failure_loses_nothing(db, monkeypatch):
+    store = SessionStore()
+    session = new_session()
+    await store.create(session, mode="hybrid")
+    store.record_response(response(session), order=0)
+
+    write = store._write
+    calls = []
+
+    async def flaky(batch):
+        calls.append(len(batch))
+        if len(calls) <= 3:
+            raise ConnectionError("database went away")
+        await write(batch)
+
+    monkeypatch.setattr(store, "_write", flaky)
+    await store.flush()
+    # Batch, then the first op alone; the response waits behind its session
+    assert calls == [2, 1] and len(store._pending) == 2
+
+    # Fails as a batch again, then goes through one at a time
+    await store.flush()
+    assert calls == [2, 1, 2, 1, 1]
+    _, texts = await stored(db, session)
+    assert texts == ["No."] and not store._pending and not store.dead_letters
+
+async def test_a_bad_write_is_dead_lettered_alone(db):
+    store = SessionStore()
+    good, bad = new_session(), new_session()
+    await store.create(good, mode="hybrid")
+    await store.create(bad, mode="hybrid")
+    store.record_response(response(good), order=0)
+    # Violates NOT NULL on response_text
+    store.record_response(response(bad, text="No."), order=0)
+    store._pending[-1][1]["response_text"] = None
+    store.record_response(response(good, "soccer_mom", "Yes."), order=1)
+
+    await store.flush()
+    assert (await stored(db, good))[1] == ["No.", "Yes."]
+    assert (await stored(db, bad))[0] is not None
+
+    for _ in range(SessionStore.MAX_FLUSH_ATTEMPTS - 1):
+        assert len(store._pending) == 1
+        await store.flush()
+    assert not store._pending
+    assert [kind for kind, _ in store.dead_letters] == ["insert_response"]
+
+async def test_later_writes_wait_behind_a_failed_insert(db):
+    store = SessionStore()
+    taken = new_session("samekey")
+    await store.create(taken, mode="hybrid")
+    await store.flush()
+
+    # Same session_key: its insert fails, and its update must not run before it
+    clash, other = new_session("samekey"), new_session()
+    await store.create(clash, mode="hybrid")
+    store.mark_running(clash.id, "hybrid")
+    await store.create(other, mode="hybrid")
+
+    for _ in range(SessionStore.MAX_FLUSH_ATTEMPTS):
+        await store.flush()
+    assert (await stored(db, other))[0] is not None
+    assert [kind for kind, _ in store.dead_letters] == ["insert_session"]
+    # The update had nothing to apply to
+    await store.flush()
+    assert (await stored(db, clash))[0] is None and not store._pending
+    async with db() as conn:
+        assert await conn.scalar(select(func.count()).select_from(entities.FocusGroupSession)) == 2
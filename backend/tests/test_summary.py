@@ -0,0 +1,74 @@
+import pytest
+from app.core.debate_orchestrator import DebateOrchestrator
+from app.core.summary import SummaryBuilder, summary_outcomes
+from app.models.schemas import DebateRounds, SentimentType
+
+pytestmark = pytest.mark.anyio
+
+PERSONAS = ["the_skeptic", "soccer_mom", "gen_z_teen", "boomer_dad"]
+
+async def moderator(system_prompt, user_message, max_tokens):
+    return '{"summary": "A split panel."}'
+
+def counting(orchestrator: DebateOrchestrator, monkeypatch) -> list:
+    """Record every summary LLM call the orchestrator makes (answered with usable JSON)"""
+    calls = []
+
+    async def summary_completion(run, system_prompt, user_message, max_tokens):
+        calls.append(user_message)
+        return await moderator(system_prompt, user_message, max_tokens)
+
+    monkeypatch.setattr(orchestrator, "_summary_completion", summary_completion)
+    return calls
+
+def outcomes() -> dict:
+    return {outcome: summary_outcomes.value(outcome=outcome) for outcome in ("speculative", "regenerated", "direct", "fallback")}
+
+@pytest.mark.parametrize("mode, persona_ids", [
+    ("parallel", PERSONAS),
+    ("sequential", PERSONAS),
+    ("hybrid", PERSONAS[:3]),
+    ("rounds", PERSONAS[:2])
+])
+async def test_debates_whose_last_wave_adds_a_voice_summarize_once(monkeypatch, mode, persona_ids):
+    orchestrator = DebateOrchestrator()
+    calls = counting(orchestrator, monkeypatch)
+    before = outcomes()
+
+    async for response in orchestrator.run_debate("s", "Should we add AI?", persona_ids, mode=mode, rounds=DebateRounds(count=1)):
+        pass
+
+    assert len(calls) == 1
+    assert outcomes()["direct"] == before["direct"] + 1
+
+async def test_rebuttal_wave_is_summarized_speculatively(monkeypatch):
+    orchestrator = DebateOrchestrator()
+    calls = counting(orchestrator, monkeypatch)
+    before = outcomes()
+
+    async for response in orchestrator.run_debate("s", "Should we add AI?", PERSONAS, mode="hybrid"):
+        pass
+
+    after = outcomes()
+    assert after["speculative"] + after["regenerated"] == before["speculative"] + before["regenerated"] + 1
+    # Regenerated only if a rebuttal changed someone's stance
+    assert len(calls) == 1 + after["regenerated"] - before["regenerated"]
+
+async def test_speculation_is_kept_only_if_no_stance_changed():
+    calls = []
+
+    async def generate(system_prompt, user_message, max_tokens):
+        calls.append(user_message)
+        return await moderator(system_prompt, user_message, max_tokens)
+
+    for rebuttal, expected_calls in ((SentimentType.POSITIVE, 1), (SentimentType.NEGATIVE, 2)):
+        calls.clear()
+        builder = SummaryBuilder("s", "Should we add AI?", generate)
+        builder.add("a", "A", "Yes.", SentimentType.POSITIVE, 0.9)
+        builder.add("b", "B", "No.", SentimentType.NEGATIVE, 0.9)
+        builder.speculate()
+        builder.add("a", "A", "Still yes." if rebuttal == SentimentType.POSITIVE else "Actually no.", rebuttal, 0.9, is_rebuttal=True)
+
+        summary = await builder.finish()
+        assert len(calls) == expected_calls
+        assert summary.summary_text == "A split panel."
@@ -0,0 +1,105 @@
+import json
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.core import llm_client
+from app.main import app
+from app.services.tracing import Tracer
+
+pytestmark = pytest.mark.anyio
+
+def spans_of(export: dict) -> list:
+    [resource] = export["resourceSpans"]
+    assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "focus-group-api"}}]
+    [scope] = resource["scopeSpans"]
+    return scope["spans"]
+
+def attributes(span: dict) -> dict:
+    return {attribute["key"]: attribute["value"] for attribute in span["attributes"]}
+
+def test_spans_nest_into_one_trace():
+    tracer = Tracer(endpoint="")
+    with tracer.span("debate", {"debate.mode": "hybrid"}, key="session-1") as root:
+        with tracer.span("debate.step", {"persona.id": "the_skeptic", "cached": False}) as step:
+            call = tracer.start_span("llm.complete", {"tokens": 12, "cost": 0.5})
+            tracer.end(call)
+        with pytest.raises(ValueError):
+            with tracer.span("debate.summary"):
+                raise ValueError("no JSON")
+    assert tracer.current_span() is None
+
+    spans = {span["name"]: span for span in spans_of(tracer.trace("session-1"))}
+    assert set(spans) == {"debate", "debate.step", "llm.complete", "debate.summary"}
+    assert {span["traceId"] for span in spans.values()} == {root.trace_id}
+    assert "parentSpanId" not in spans["debate"]
+    assert spans["debate.step"]["parentSpanId"] == root.span_id
+    assert spans["llm.complete"]["parentSpanId"] == step.span_id
+    assert spans["debate.summary"]["status"] == {"code": 2, "message": "ValueError: no JSON"}
+    assert spans["debate"]["status"] == {"code": 1}
+    assert attributes(spans["llm.complete"]) == {"tokens": {"intValue": "12"}, "cost": {"doubleValue": 0.5}}
+    assert attributes(spans["debate.step"])["cached"] == {"boolValue": False}
+    for span in spans.values():
+        assert int(span["startTimeUnixNano"]) <= int(span["endTimeUnixNano"])
+
+def test_only_the_latest_traces_are_kept():
+    tracer = Tracer(max_traces=2, endpoint="")
+    for key in ("a", "b", "c"):
+        with tracer.span("debate", key=key):
+            pass
+    assert tracer.trace("a") is None
+    assert tracer.trace("b") is not None and tracer.trace("c") is not None
+    assert tracer.trace("unknown") is None
+
+async def test_finished_traces_are_posted_to_the_collector(monkeypatch):
+    posted = []
+
+    def collector(request: httpx.Request) -> httpx.Response:
+        posted.append((str(request.url), request.read()))
+        return httpx.Response(200)
+
+    monkeypatch.setattr(llm_client, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(collector)))
+    tracer = Tracer(endpoint="http://collector:4318/v1/traces")
+    with tracer.span("debate", key="session-1"):
+        with tracer.span("debate.step"):
+            pass
+    # Only the root span ending exports, as a background task
+    assert len(tracer._exports) == 1
+    for task in list(tracer._exports):
+        await task
+
+    [(url, body)] = posted
+    assert url == "http://collector:4318/v1/traces"
+    assert json.loads(body) == tracer.trace("session-1")
+
+async def test_collector_errors_are_not_raised(monkeypatch):
+    monkeypatch.setattr(llm_client, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503))))
+    tracer = Tracer(endpoint="http://collector:4318/v1/traces")
+    with tracer.span("debate", key="session-1"):
+        pass
+    for task in list(tracer._exports):
+        await task
+    assert tracer.trace("session-1") is not None
+
+def test_trace_route_after_a_debate(sqlite_db):
+    question, personas = "Should we add AI to our product?", ["the_skeptic", "soccer_mom"]
+    with TestClient(app) as client:
+        session = client.post("/api/focus-groups/create", json={"question": question, "persona_ids": personas}).json()
+        with client.websocket_connect(f"/ws/debate/{session['id']}") as ws:
+            ws.send_json({"action": "start", "question": question, "persona_ids": personas, "mode": "parallel"})
+            while True:
+                message = ws.receive_json()
+                if any(frame["type"] == "debate_complete" for frame in message.get("frames", [message])):
+                    break
+
+        trace = client.get(f"/api/analytics/traces/{session['id']}")
+        missing = client.get("/api/analytics/traces/nope")
+
+    assert missing.status_code == 404
+    spans = spans_of(trace.json())
+    [root] = [span for span in spans if "parentSpanId" not in span]
+    assert root["name"] == "debate"
+    # Every span hangs off one that's in the trace
+    ids = {span["spanId"] for span in spans}
+    assert all(span["parentSpanId"] in ids for span in spans if span is not root)
+    assert sum(span["name"] == "debate.step" for span in spans) >= len(personas)
+    assert any(span["name"].startswith("llm.") for span in spans)
@@ -0,0 +1,144 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.api.routes import analytics
+from app.api.websocket import debate_stream
+from app.config import settings
+from app.main import app
+from app.models.database import init_db
+from app.services import trending
+from app.services.trending import TrendingIndex
+
+pytestmark = pytest.mark.anyio
+
+HOUR = 3600.0
+
+class Clock:
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(trending, "time", clock)
+    return clock
+
+@pytest.fixture(params=["redis", "local"])
+def index(request, clock) -> TrendingIndex:
+    index = TrendingIndex()
+    if request.param == "local":
+        index._redis_down_until = float("inf")
+    return index
+
+def scores(index: TrendingIndex) -> dict:
+    return {entry["question"]: entry["trending_score"] for entry in index.top(10)}
+
+async def test_runs_decay_by_half_each_half_life(index, clock):
+    for _ in range(8):
+        index.record("Should we add AI to our product?")
+    clock.now += 2 * settings.TRENDING_HALF_LIFE_HOURS * HOUR
+    for _ in range(3):
+        index.record("Is remote work here to stay?")
+    await index.flush()
+
+    assert scores(index) == pytest.approx({"Is remote work here to stay?": 3.0, "Should we add AI to our product?": 2.0}, rel=1e-3)
+    assert [entry["question"] for entry in index.top(10)] == ["Is remote work here to stay?", "Should we add AI to our product?"]
+
+    clock.now += settings.TRENDING_HALF_LIFE_HOURS * HOUR
+    await index.flush()
+    assert scores(index) == pytest.approx({"Is remote work here to stay?": 1.5, "Should we add AI to our product?": 1.0}, rel=1e-3)
+
+async def test_scores_survive_epoch_rollover(index, clock):
+    for _ in range(8):
+        index.record("Should we add AI to our product?")
+    await index.flush()
+    clock.now += index.epoch_seconds
+    await index.flush()
+
+    assert scores(index) == pytest.approx({"Should we add AI to our product?": 0.5}, rel=1e-3)
+
+async def test_rephrasings_are_counted_together(index):
+    for question in [
+        "Should I quit my 9-5 to start a business?",
+        "should i quit my 9 5 and start a business",
+        "Should I quit my 9-5 job to start my own business?",
+        "Is this product idea worth pursuing?"
+    ]:
+        index.record(question)
+    await index.flush()
+
+    top = index.top(10)
+    assert [(entry["question"], entry["run_count"]) for entry in top] == [
+        ("Should I quit my 9-5 to start a business?", 3),
+        ("Is this product idea worth pursuing?", 1)
+    ]
+
+TOPICS = [
+    "pricing", "hiring", "remote work", "electric cars", "crypto", "four day weeks", "office pets",
+    "open plan desks", "loyalty cards", "podcasts", "tiny homes", "meal kits", "smart rings", "drones"
+]
+
+async def test_top_is_cut_to_k_and_the_limit(index, monkeypatch):
+    monkeypatch.setattr(index, "top_k", 5)
+    for i, topic in enumerate(TOPICS):
+        for _ in range(i + 1):
+            index.record(f"What do people think about {topic}?")
+    await index.flush()
+
+    assert len(index.top(100)) == 5
+    assert [entry["run_count"] for entry in index.top(3)] == [14, 13, 12]
+    assert index.top(-1) == []
+
+async def test_workers_share_scores_through_redis():
+    a, b = TrendingIndex(), TrendingIndex()
+    for _ in range(3):
+        a.record("Should we add AI to our product?")
+    b.record("Should we add AI to our products?")
+    b.record("Is remote work here to stay?")
+    await a.flush()
+    await b.flush()
+    await a.flush()
+
+    assert a.top(10) == b.top(10)
+    assert [(entry["question"], entry["run_count"]) for entry in a.top(10)] == [
+        ("Should we add AI to our product?", 4), ("Is remote work here to stay?", 1)
+    ]
+
+async def test_saved_ranking_seeds_a_restart(sqlite_db, clock):
+    await init_db()
+    before = TrendingIndex()
+    for _ in range(4):
+        before.record("Should we add AI to our product?")
+    await before.flush()
+    await before.persist()
+
+    after = TrendingIndex()
+    after._redis_down_until = float("inf")
+    await after.load()
+    assert [(entry["question"], entry["run_count"]) for entry in after.top(10)] == [("Should we add AI to our product?", 4)]
+
+    # A rephrasing lands in the restored group
+    after.record("Should we add AI to our products?")
+    await after.flush()
+    assert after.top(1)[0]["run_count"] == 5
+
+def test_private_debates_stay_off_trending(sqlite_db, monkeypatch):
+    index = TrendingIndex()
+    monkeypatch.setattr(debate_stream, "trending_index", index)
+    monkeypatch.setattr(analytics, "trending_index", index)
+
+    with TestClient(app) as client:
+        for question, is_public in [("Should we add AI to our product?", True), ("Should I fire my cofounder Dave?", False)]:
+            session = client.post("/api/focus-groups/create", json={
+                "question": question, "persona_ids": ["the_skeptic", "soccer_mom"], "is_public": is_public
+            }).json()
+            assert client.portal.call(debate_stream.manager.start_debate, session["id"], question, ["the_skeptic", "soccer_mom"])
+        client.portal.call(index.flush)
+
+        trending_now = client.get("/api/analytics/trending").json()["trending"]
+    assert [entry["question"] for entry in trending_now] == ["Should we add AI to our product?"]
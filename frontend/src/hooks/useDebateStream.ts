@@ -1,8 +1,8 @@
 import { useEffect, useRef, useState } from 'react';
 import { useDebateStore } from '@/store/debate-store';
-import { DebateResponse } from '@/types/debate';
+import { DebateMode, DebateResponse, DebateRounds, WSMessage } from '@/types/debate';
 
-export function useDebateStream(sessionId: string) {
+export function useDebateStream(sessionId: string, sessionKey?: string) {
   const ws = useRef<WebSocket | null>(null);
   const [isConnected, setIsConnected] = useState(false);
   const [error, setError] = useState<string | null>(null);
@@ -12,23 +12,23 @@ export function useDebateStream(sessionId: string) {
   useEffect(() => {
     if (!sessionId) return;
     
-    // Connect to WebSocket
-    const wsUrl = `${process.env.NEXT_PUBLIC_WS_URL}/ws/debate/${sessionId}`;
-    console.log('Connecting to WebSocket:', wsUrl);
+    // Seq of the last frame received, so a reconnect can pick up from there
+    let lastSeq: number | null = null;
+    let retries = 0;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let closedByUs = false;
     
-    ws.current = new WebSocket(wsUrl);
-    
-    ws.current.onopen = () => {
-      console.log('WebSocket connected');
-      setIsConnected(true);
-      setError(null);
-    };
-    
-    ws.current.onmessage = (event) => {
-      const message = JSON.parse(event.data);
-      console.log('WebSocket message:', message);
+    const handleMessage = (message: WSMessage) => {
+      if (message.seq !== undefined) {
+        lastSeq = message.seq;
+      }
       
       switch (message.type) {
+        case 'batch':
+          // Frames the server coalesced into one message
+          message.frames?.forEach(handleMessage);
+          break;
+          
         case 'debate_response':
           const response: DebateResponse = message.data;
           if (!response.is_complete) {
@@ -44,38 +44,79 @@ export function useDebateStream(sessionId: string) {
           break;
           
         case 'error':
-          setError(message.message);
+          setError(message.message ?? null);
           console.error('WebSocket error:', message.message);
           break;
       }
     };
     
-    ws.current.onerror = (error) => {
-      console.error('WebSocket error:', error);
-      setError('Connection error');
+    const connect = () => {
+      // Private debates need the session key on every (re)connect; the debate
+      // keeps running server-side, so resume after the last frame we saw
+      const params = new URLSearchParams();
+      if (sessionKey) {
+        params.set('key', sessionKey);
+      }
+      if (lastSeq !== null) {
+        params.set('last_seq', String(lastSeq));
+      }
+      const query = params.toString();
+      const wsUrl = `${process.env.NEXT_PUBLIC_WS_URL}/ws/debate/${sessionId}${query ? `?${query}` : ''}`;
+      console.log('Connecting to WebSocket:', wsUrl);
+      
+      ws.current = new WebSocket(wsUrl);
+      
+      ws.current.onopen = () => {
+        console.log('WebSocket connected');
+        retries = 0;
+        setIsConnected(true);
+        setError(null);
+      };
+      
+      ws.current.onmessage = (event) => {
+        const message: WSMessage = JSON.parse(event.data);
+        console.log('WebSocket message:', message);
+        handleMessage(message);
+      };
+      
+      ws.current.onerror = (error) => {
+        console.error('WebSocket error:', error);
+        setError('Connection error');
+      };
+      
+      ws.current.onclose = () => {
+        console.log('WebSocket closed');
+        setIsConnected(false);
+        if (!closedByUs && retries < 5) {
+          retryTimer = setTimeout(connect, Math.min(1000 * 2 ** retries, 10000));
+          retries += 1;
+        }
+      };
     };
     
-    ws.current.onclose = () => {
-      console.log('WebSocket closed');
-      setIsConnected(false);
-    };
+    connect();
     
     // Cleanup
     return () => {
+      closedByUs = true;
+      if (retryTimer) {
+        clearTimeout(retryTimer);
+      }
       if (ws.current) {
         ws.current.close();
       }
     };
-  }, [sessionId]);
+  }, [sessionId, sessionKey]);
   
-  const startDebate = (question: string, personaIds: string[], mode: string = 'hybrid') => {
+  const startDebate = (question: string, personaIds: string[], mode: DebateMode = 'hybrid', rounds?: DebateRounds) => {
     if (ws.current && ws.current.readyState === WebSocket.OPEN) {
-      console.log('Starting debate:', { question, personaIds, mode });
+      console.log('Starting debate:', { question, personaIds, mode, rounds });
       ws.current.send(JSON.stringify({
         action: 'start',
         question,
         persona_ids: personaIds,
-        mode
+        mode,
+        rounds
       }));
     } else {
       console.error('WebSocket not connected');
@@ -1,7 +1,14 @@
 export type SentimentType = 'positive' | 'negative' | 'neutral' | 'mixed';
-export type DebateMode = 'sequential' | 'parallel' | 'hybrid';
+export type DebateMode = 'sequential' | 'parallel' | 'hybrid' | 'rounds';
 export type SessionStatus = 'pending' | 'running' | 'completed' | 'failed';
 
+export interface DebateRounds {
+  count?: number;
+  persona_ids?: string[][];
+  max_tokens?: number;
+  stop_on_convergence?: boolean;
+}
+
 export interface Persona {
   id: string;
   name: string;
@@ -29,12 +36,27 @@ export interface DebateResponse {
   confidence_score?: number;
   is_rebuttal: boolean;
   is_complete: boolean;
+  time_to_first_token_ms?: number;
+  timestamp: string;
+}
+
+export interface DebateDelta {
+  session_id: string;
+  persona_id: string;
+  persona_name: string;
+  delta: string;
+  wave: number;
+  // Provisional: scored from the text streamed so far
+  sentiment?: SentimentType;
+  confidence_score?: number;
+  is_rebuttal: boolean;
   timestamp: string;
 }
 
 export interface DebateSession {
   id: string;
-  session_key: string;
+  // Only returned to the creator, by create
+  session_key?: string;
   question: string;
   selected_persona_ids: string[];
   status: SessionStatus;
@@ -60,13 +82,15 @@ export interface DebateSummary {
 
 export interface TrendingQuestion {
   question: string;
-  category?: string;
   run_count: number;
   trending_score: number;
+  last_run?: string;
 }
 
 export interface WSMessage {
-  type: 'debate_response' | 'debate_complete' | 'error';
+  type: 'debate_response' | 'debate_delta' | 'debate_complete' | 'debate_resumed' | 'error' | 'batch';
   data?: any;
   message?: string;
+  seq?: number;
+  frames?: WSMessage[];
 }